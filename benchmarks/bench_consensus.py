@@ -0,0 +1,284 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.13"
+# dependencies = ["numpy", "defusedxml"]
+# ///
+"""Benchmark get_weather consensus over seeded synthetic multi-source data.
+
+The generator produces ``DailyData`` for N sources x D days x L locations
+with configurable missing-value and outlier rates. Each (engine, scenario)
+case reports records/sec, per-location latency percentiles and allocations
+(tracemalloc peak and blocks still held afterwards, from a separate untimed
+pass).
+``--json`` stores the results; ``--baseline`` compares against a stored
+run and exits 1 when throughput regresses by more than ``--tolerance``.
+"""
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any
+
+SCRIPT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(SCRIPT_DIR))
+
+import get_weather
+
+START = date(2025, 12, 25)
+DIRECTIONS = ("N", "NE", "E", "SE", "S", "SW", "W", "NW")
+PROGNOSES = tuple(get_weather.WeatherCode)
+PERCENTILES = (50, 90, 99)
+DEFAULT_TOLERANCE = 0.2
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """Shape of one synthetic data set."""
+
+    name: str
+    sources: int
+    days: int
+    locations: int
+    missing_rate: float = 0.1
+    outlier_rate: float = 0.05
+
+
+SCENARIOS = (
+    Scenario("typical", sources=4, days=14, locations=50),
+    Scenario("ensemble", sources=16, days=14, locations=50),
+    Scenario("sparse", sources=4, days=14, locations=50, missing_rate=0.5),
+    Scenario("noisy", sources=8, days=14, locations=50, outlier_rate=0.25),
+    Scenario("fleet", sources=4, days=7, locations=500),
+)
+
+
+def _maybe(rng: random.Random, rate: float, value: float) -> float | None:
+    """Return None with probability rate, else value."""
+    return None if rng.random() < rate else value
+
+
+def _temperature(rng: random.Random, scenario: Scenario, centre: float) -> float | None:
+    """Return a temperature near centre, an outlier at outlier_rate, or None."""
+    value = centre + rng.gauss(0, 1.5)
+    if rng.random() < scenario.outlier_rate:
+        value += rng.choice((-1, 1)) * rng.uniform(10, 25)
+    return _maybe(rng, scenario.missing_rate, round(value, 1))
+
+
+def synthetic_location(
+    scenario: Scenario, rng: random.Random
+) -> list[get_weather.DailyData]:
+    """Return every source's records for one location's window."""
+    records = []
+    for day in range(scenario.days):
+        low = rng.uniform(8, 18)
+        high = low + rng.uniform(5, 15)
+        for source in range(scenario.sources):
+            min_wind = rng.uniform(0, 20)
+            records.append(
+                get_weather.DailyData(
+                    date=START + timedelta(days=day),
+                    source=f"Source{source}",
+                    min_temp=_temperature(rng, scenario, low),
+                    max_temp=_temperature(rng, scenario, high),
+                    min_wind=_maybe(rng, scenario.missing_rate, min_wind),
+                    max_wind=_maybe(rng, scenario.missing_rate, min_wind + 15),
+                    direction=(
+                        None
+                        if rng.random() < scenario.missing_rate
+                        else rng.choice(DIRECTIONS)
+                    ),
+                    prognosis=(
+                        None
+                        if rng.random() < scenario.missing_rate
+                        else rng.choice(PROGNOSES)
+                    ),
+                    rain_prob=_maybe(rng, scenario.missing_rate, rng.uniform(0, 100)),
+                )
+            )
+    return records
+
+
+def synthetic_locations(
+    scenario: Scenario, seed: int = 0
+) -> dict[str, list[get_weather.DailyData]]:
+    """Return seeded records for every location in the scenario."""
+    rng = random.Random(seed)
+    return {
+        f"Location{n}": synthetic_location(scenario, rng)
+        for n in range(scenario.locations)
+    }
+
+
+def window_for(scenario: Scenario) -> get_weather.ForecastWindow:
+    """Return the forecast window covering the scenario's days."""
+    return get_weather.ForecastWindow(
+        tuple(START + timedelta(days=d) for d in range(scenario.days))
+    )
+
+
+def _consensus_all(
+    data: dict[str, list[get_weather.DailyData]],
+    window: get_weather.ForecastWindow,
+    policy: get_weather.ConsensusPolicy,
+    engine: get_weather.ConsensusEngine,
+) -> list[float]:
+    """Run consensus for each location and return per-location seconds."""
+    latencies = []
+    for name, records in data.items():
+        started = time.perf_counter()
+        get_weather.calculate_consensus(window, records, policy, name, engine=engine)
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def _allocations(
+    data: dict[str, list[get_weather.DailyData]],
+    window: get_weather.ForecastWindow,
+    policy: get_weather.ConsensusPolicy,
+    engine: get_weather.ConsensusEngine,
+) -> tuple[int, int]:
+    """Return peak traced bytes and net new blocks for one full run."""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        _consensus_all(data, window, policy, engine)
+        after = tracemalloc.take_snapshot()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    blocks = sum(
+        max(stat.count_diff, 0) for stat in after.compare_to(before, "filename")
+    )
+    return peak, blocks
+
+
+def run_case(
+    scenario: Scenario,
+    engine: get_weather.ConsensusEngine,
+    repeats: int,
+    seed: int,
+) -> dict[str, Any]:
+    """Measure one engine on one scenario and return its result record."""
+    data = synthetic_locations(scenario, seed)
+    window = window_for(scenario)
+    policy = get_weather.ConsensusPolicy()
+    records = sum(len(r) for r in data.values())
+    runs = [_consensus_all(data, window, policy, engine) for _ in range(repeats)]
+    best = min(runs, key=sum)
+    cuts = statistics.quantiles(best, n=100, method="inclusive")
+    peak, blocks = _allocations(data, window, policy, engine)
+    return {
+        "scenario": scenario.name,
+        "engine": str(engine),
+        "sources": scenario.sources,
+        "days": scenario.days,
+        "locations": scenario.locations,
+        "missing_rate": scenario.missing_rate,
+        "outlier_rate": scenario.outlier_rate,
+        "records": records,
+        "records_per_sec": records / sum(best),
+        **{f"p{pct}_ms": cuts[pct - 1] * 1_000 for pct in PERCENTILES},
+        "peak_kib": peak / 1024,
+        "retained_blocks": blocks,
+    }
+
+
+def regressions(
+    results: list[dict[str, Any]],
+    baseline: list[dict[str, Any]],
+    tolerance: float,
+) -> list[str]:
+    """Return a line for each case whose throughput fell beyond tolerance."""
+    previous = {(r["scenario"], r["engine"]): r for r in baseline}
+    lines = []
+    for r in results:
+        old = previous.get((r["scenario"], r["engine"]))
+        if old is None:
+            continue
+        ratio = float(r["records_per_sec"]) / float(old["records_per_sec"])
+        if ratio < 1 - tolerance:
+            lines.append(
+                f"{r['scenario']}/{r['engine']}: {ratio:.0%} of baseline records/sec"
+            )
+    return lines
+
+
+def _parse_args(argv: list[str]) -> argparse.Namespace:
+    """Parse command-line options."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeats", type=int, default=3, help="timed runs per case")
+    parser.add_argument("--seed", type=int, default=0, help="generator seed")
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=[s.name for s in SCENARIOS],
+        help="scenarios to run (default: all)",
+    )
+    parser.add_argument(
+        "--engine",
+        action="append",
+        choices=[str(e) for e in get_weather.ConsensusEngine],
+        help="engines to run (default: all)",
+    )
+    parser.add_argument("--json", type=Path, help="write the results to this file")
+    parser.add_argument(
+        "--baseline", type=Path, help="compare throughput with a previous --json file"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help="allowed fractional throughput drop against --baseline",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str]) -> int:
+    """Print a result table, optionally write JSON and check a baseline."""
+    args = _parse_args(argv)
+    names = args.scenario or [s.name for s in SCENARIOS]
+    engines = args.engine or list(get_weather.ConsensusEngine)
+    results = [
+        run_case(scenario, get_weather.ConsensusEngine(engine), args.repeats, args.seed)
+        for scenario in SCENARIOS
+        if scenario.name in names
+        for engine in engines
+    ]
+    print(
+        f"{'scenario':>9} {'engine':>8} {'records':>8} {'rec/s':>10} "
+        f"{'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'peak KiB':>9} {'blocks':>8}"
+    )
+    for r in results:
+        print(
+            f"{r['scenario']:>9} {r['engine']:>8} {r['records']:>8} "
+            f"{r['records_per_sec']:>10.0f} {r['p50_ms']:>8.2f} {r['p90_ms']:>8.2f} "
+            f"{r['p99_ms']:>8.2f} {r['peak_kib']:>9.1f} {r['retained_blocks']:>8}"
+        )
+    if args.json is not None:
+        report = {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "seed": args.seed,
+            "results": results,
+        }
+        args.json.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))["results"]
+        slower = regressions(results, baseline, args.tolerance)
+        for line in slower:
+            print(f"regression: {line}", file=sys.stderr)
+        return 1 if slower else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,169 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.13"
+# dependencies = []
+# ///
+"""Benchmark the browse.py render path over a small/medium/large HTML corpus.
+
+Each (renderer, path, document) case runs in a fresh process so its peak
+RSS is its own. Results are printed as a table and, with ``--json``,
+written as JSON for comparison between runs.
+"""
+
+import argparse
+import json
+import multiprocessing
+import platform
+import resource
+import shutil
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(SCRIPT_DIR))
+
+import browse
+
+DEFAULT_PAGES = 50
+DEFAULT_SECTIONS = 40
+CORPUS = {"small": 4, "medium": DEFAULT_SECTIONS, "large": 2_000}
+PATHS = ("render", "browse")
+PERCENTILES = (50, 90, 99)
+
+
+def _section(index: int) -> str:
+    """Return one synthetic article section with text, a list and links."""
+    prose = "enough prose to wrap across several dump lines in the output. " * 3
+    return (
+        f"<h2>Section {index}</h2>"
+        f"<p>Paragraph {index} with <a href='/page/{index}'>a link</a> and {prose}</p>"
+        "<ul><li>item one</li>"
+        f"<li><a href='https://example.com/{index}'>two</a></li></ul>"
+    )
+
+
+def synthetic_page(sections: int = DEFAULT_SECTIONS) -> bytes:
+    """Return a synthetic HTML document with the given number of sections."""
+    body = "".join(_section(index) for index in range(sections))
+    return f"<html><head><title>Bench</title></head><body>{body}</body></html>".encode()
+
+
+def _available_renderers() -> dict[str, browse.Render]:
+    """Return the renderers whose external binaries are installed."""
+    return {
+        name: render
+        for name, render in browse.RENDERERS.items()
+        if all(shutil.which(b) for b in browse.RENDERER_BINARIES[name])
+    }
+
+
+def _render_latencies(render: browse.Render, payload: bytes, pages: int) -> list[float]:
+    """Return per-page seconds for calling the renderer directly."""
+    latencies = []
+    for _ in range(pages):
+        started = time.perf_counter()
+        render(payload)
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def _browse_latencies(render: browse.Render, payload: bytes, pages: int) -> list[float]:
+    """Return per-page seconds through browse_outcomes with a stub fetch."""
+    page = browse.Payload(payload, "text/html; charset=utf-8")
+    urls = [f"https://bench.example/{n}" for n in range(pages)]
+    outcomes = browse.browse_outcomes(urls, fetch=lambda _: page, render=render)
+    latencies = []
+    started = time.perf_counter()
+    for outcome in outcomes:
+        if outcome.is_error:
+            raise RuntimeError(outcome.error)
+        finished = time.perf_counter()
+        latencies.append(finished - started)
+        started = finished
+    return latencies
+
+
+def _peak_rss_kib() -> int:
+    """Return the peak RSS of this process or its children, in KiB."""
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return max(own, children)
+
+
+def run_case(renderer: str, path: str, document: str, pages: int) -> dict[str, object]:
+    """Measure one case and return its result record."""
+    render = browse.RENDERERS[renderer]
+    payload = synthetic_page(CORPUS[document])
+    measure = _render_latencies if path == "render" else _browse_latencies
+    latencies = measure(render, payload, pages)
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "renderer": renderer,
+        "path": path,
+        "document": document,
+        "payload_bytes": len(payload),
+        "pages": pages,
+        "pages_per_sec": pages / sum(latencies),
+        **{f"p{pct}_ms": cuts[pct - 1] * 1_000 for pct in PERCENTILES},
+        "peak_rss_kib": _peak_rss_kib(),
+    }
+
+
+def _isolated(renderer: str, path: str, document: str, pages: int) -> dict[str, object]:
+    """Run a case in a fresh process so peak RSS is not shared between cases."""
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+        return pool.submit(run_case, renderer, path, document, pages).result()
+
+
+def _parse_args(argv: list[str]) -> argparse.Namespace:
+    """Parse command-line options."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "pages", nargs="?", type=int, default=DEFAULT_PAGES, help="pages per case"
+    )
+    parser.add_argument("--json", type=Path, help="write the results to this file")
+    parser.add_argument(
+        "--document",
+        action="append",
+        choices=sorted(CORPUS),
+        help="corpus documents to run (default: all)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str]) -> int:
+    """Print a result table for every case and optionally write JSON."""
+    args = _parse_args(argv)
+    documents = args.document or list(CORPUS)
+    results = [
+        _isolated(renderer, path, document, args.pages)
+        for renderer in _available_renderers()
+        for path in PATHS
+        for document in documents
+    ]
+    print(
+        f"{'renderer':>8} {'path':>6} {'document':>8} {'bytes':>9} "
+        f"{'pages/s':>9} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'rss KiB':>9}"
+    )
+    for r in results:
+        print(
+            f"{r['renderer']:>8} {r['path']:>6} {r['document']:>8} "
+            f"{r['payload_bytes']:>9} {r['pages_per_sec']:>9.1f} {r['p50_ms']:>8.2f} "
+            f"{r['p90_ms']:>8.2f} {r['p99_ms']:>8.2f} {r['peak_rss_kib']:>9}"
+        )
+    if args.json is not None:
+        report = {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "results": results,
+        }
+        args.json.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,135 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.13"
+# dependencies = ["numpy", "defusedxml"]
+# ///
+"""Microbenchmark the consensus robust-mean kernels against statistics.mean/stdev.
+
+Each source count gets a fixed set of seeded temperature samples with one
+outlier. The baseline is the previous implementation (exact
+``statistics.mean``/``stdev`` plus a filter pass); every estimator is timed
+through ``get_weather._compute_robust_mean``. Results are printed as a
+table and, with ``--json``, written as JSON for comparison between runs.
+"""
+
+import argparse
+import json
+import platform
+import random
+import sys
+import timeit
+from collections.abc import Callable
+from pathlib import Path
+from statistics import mean, stdev
+
+SCRIPT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(SCRIPT_DIR))
+
+import get_weather
+
+SOURCE_COUNTS = (3, 4, 8, 16)
+SAMPLES = 200
+DEFAULT_REPEATS = 5
+
+
+def statistics_robust_mean(
+    values: tuple[float, ...], policy: get_weather.ConsensusPolicy
+) -> float | None:
+    """Return the sigma-clipped mean as the statistics-based implementation did."""
+    if not values:
+        return None
+    base = mean(values)
+    if len(values) < policy.min_count_for_outlier:
+        return base
+    if (sigma := stdev(values)) == 0:
+        return base
+    kept = [v for v in values if abs(v - base) <= policy.sigma_threshold * sigma]
+    return mean(kept) if kept else base
+
+
+def samples(sources: int, seed: int = 0) -> list[tuple[float, ...]]:
+    """Return seeded per-date temperature samples with one outlier each."""
+    rng = random.Random(seed)
+    return [
+        tuple(
+            [round(rng.gauss(24, 2), 1) for _ in range(sources - 1)]
+            + [round(rng.uniform(35, 45), 1)]
+        )
+        for _ in range(SAMPLES)
+    ]
+
+
+Kernel = Callable[[tuple[float, ...], get_weather.ConsensusPolicy], float | None]
+
+
+def _per_call_us(
+    kernel: Kernel,
+    data: list[tuple[float, ...]],
+    policy: get_weather.ConsensusPolicy,
+    repeats: int,
+) -> float:
+    """Return the best-of-repeats time per kernel call in microseconds."""
+    timer = timeit.Timer(lambda: [kernel(v, policy) for v in data])
+    return min(timer.repeat(repeat=repeats, number=1)) / len(data) * 1e6
+
+
+def run_case(sources: int, repeats: int) -> list[dict[str, object]]:
+    """Measure the baseline and every estimator at one source count."""
+    data = samples(sources)
+    baseline = _per_call_us(
+        statistics_robust_mean, data, get_weather.ConsensusPolicy(), repeats
+    )
+    results: list[dict[str, object]] = [
+        {
+            "kernel": "statistics",
+            "sources": sources,
+            "us_per_call": baseline,
+            "speedup": 1.0,
+        }
+    ]
+    for estimator in get_weather.RobustEstimator:
+        policy = get_weather.ConsensusPolicy(estimator=estimator)
+        elapsed = _per_call_us(get_weather._compute_robust_mean, data, policy, repeats)
+        results.append(
+            {
+                "kernel": str(estimator),
+                "sources": sources,
+                "us_per_call": elapsed,
+                "speedup": baseline / elapsed,
+            }
+        )
+    return results
+
+
+def _parse_args(argv: list[str]) -> argparse.Namespace:
+    """Parse command-line options."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--repeats", type=int, default=DEFAULT_REPEATS, help="timing repeats per case"
+    )
+    parser.add_argument("--json", type=Path, help="write the results to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str]) -> int:
+    """Print a result table for every source count and optionally write JSON."""
+    args = _parse_args(argv)
+    results = [r for n in SOURCE_COUNTS for r in run_case(n, args.repeats)]
+    print(f"{'kernel':>13} {'sources':>7} {'us/call':>9} {'speedup':>8}")
+    for r in results:
+        print(
+            f"{r['kernel']:>13} {r['sources']:>7} "
+            f"{r['us_per_call']:>9.2f} {r['speedup']:>7.1f}x"
+        )
+    if args.json is not None:
+        report = {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "results": results,
+        }
+        args.json.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -3,18 +3,197 @@
 # requires-python = ">=3.13"
 # dependencies = []
 # ///
+import argparse
+import asyncio
+import codecs
+import difflib
+import gzip
+import hashlib
+import html
+import json
+import math
+import mmap
+import multiprocessing
+import os
+import re
 import shutil
 import subprocess
 import sys
-from dataclasses import dataclass
-from typing import Callable, Iterable, Iterator, TextIO
-from urllib import error, parse, request
+import tempfile
+import textwrap
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from contextlib import (
+    AbstractAsyncContextManager,
+    asynccontextmanager,
+    nullcontext,
+    suppress,
+)
+from dataclasses import asdict, dataclass, field, replace
+from datetime import UTC, datetime
+from email.message import Message
+from enum import StrEnum
+from functools import partial
+from html.parser import HTMLParser
+from http.client import HTTPException, HTTPMessage, HTTPResponse, IncompleteRead
+from itertools import chain, count
+from pathlib import Path
+from typing import (
+    IO,
+    AsyncIterator,
+    Callable,
+    Iterable,
+    Iterator,
+    ParamSpec,
+    Self,
+    Sequence,
+    TextIO,
+    TypeVar,
+)
+from urllib import error, parse, request, robotparser
 
 DEFAULT_TIMEOUT = 15.0
+DEFAULT_CONCURRENCY = 8
+DEFAULT_HOST_CONCURRENCY = 2
+ROBOTS_TIMEOUT = 5.0
+DEFAULT_CRAWL_DEPTH = 2
+DEFAULT_CRAWL_PAGES = 100
+BLOOM_MIN_PAGES = 10_000
+BLOOM_LINKS_PER_PAGE = 100
+BLOOM_ERROR_RATE = 0.001
 URL_SCHEMES = {"http", "https"}
+DUMP_WIDTH = 78
+DUMP_INDENT = 3
+_CHARSET_PATTERN = re.compile(rb"""charset=["']?([A-Za-z0-9_.:-]+)""", re.IGNORECASE)
+_SKIPPED_TAGS = frozenset({"script", "style", "head", "title", "template"})
+_PARAGRAPH_TAGS = frozenset(
+    {
+        "p",
+        "ul",
+        "ol",
+        "dl",
+        "blockquote",
+        "pre",
+        "table",
+        "hr",
+        "form",
+        "figure",
+        "address",
+        *(f"h{level}" for level in range(1, 7)),
+    }
+)
+_LINE_TAGS = frozenset(
+    {
+        "div",
+        "li",
+        "dt",
+        "dd",
+        "tr",
+        "section",
+        "article",
+        "header",
+        "footer",
+        "nav",
+        "main",
+        "aside",
+        "figcaption",
+    }
+)
+_HEADING_TAGS = frozenset(f"h{level}" for level in range(1, 7))
+_BULLETS = ("*", "+", "o", "#", "@", "-")
+DEFAULT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_RENDER_CACHE_ENTRIES = 256
+DEFAULT_CHUNK_SIZE = 64 * 1024
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+DEFAULT_RESUME_ATTEMPTS = 4
+RESUME_BACKOFF = 0.5
+_CHARSET_SNIFF_BYTES = 2048
+_CONTENT_SNIFF_BYTES = 512
+_HTML_TYPES = frozenset({"text/html", "application/xhtml+xml"})
+_JSON_TYPES = frozenset({"application/json", "text/json"})
+_BINARY_TYPES = frozenset(
+    {
+        "application/pdf",
+        "application/zip",
+        "application/gzip",
+        "application/x-gzip",
+        "application/x-tar",
+        "application/msword",
+        "application/wasm",
+    }
+)
+_BINARY_TYPE_PREFIXES = ("image/", "audio/", "video/", "font/", "application/vnd.")
+_TRACKING_PARAMS = frozenset(
+    {
+        "fbclid",
+        "gclid",
+        "dclid",
+        "msclkid",
+        "yclid",
+        "igshid",
+        "mc_cid",
+        "mc_eid",
+        "_ga",
+        "_hsenc",
+        "_hsmi",
+    }
+)
+_TRACKING_PREFIXES = ("utm_",)
+_BINARY_MAGIC = (
+    b"%PDF-",
+    b"\x89PNG",
+    b"GIF8",
+    b"\xff\xd8\xff",
+    b"PK\x03\x04",
+    b"\x1f\x8b",
+    b"RIFF",
+    b"OggS",
+    b"\x00asm",
+    b"wOFF",
+)
+_MAX_AGE_PATTERN = re.compile(r"(?:^|,)\s*max-age\s*=\s*\"?(\d+)", re.IGNORECASE)
 
 Fetch = Callable[[str], bytes]
 Render = Callable[[bytes], str]
+FetchStream = Callable[[str], Iterator[bytes]]
+RenderStream = Callable[[Iterable[bytes]], Iterator[str]]
+
+
+class ContentKind(StrEnum):
+    """How a response body is turned into text."""
+
+    HTML = "html"
+    TEXT = "text"
+    JSON = "json"
+    BINARY = "binary"
+
+
+Headers = tuple[tuple[str, str], ...]
+
+
+class Payload(bytes):
+    """Response body bytes tagged with the Content-Type they were served as."""
+
+    content_type: str
+    final_url: str
+    headers: Headers
+
+    def __new__(
+        cls,
+        data: bytes,
+        content_type: str = "",
+        final_url: str = "",
+        headers: Headers = (),
+    ) -> Self:
+        """Create the payload from raw bytes, Content-Type and post-redirect URL."""
+        payload = super().__new__(cls, data)
+        payload.content_type = content_type
+        payload.final_url = final_url
+        payload.headers = headers
+        return payload
 
 
 @dataclass(frozen=True)
@@ -48,15 +227,526 @@ def _validate_url(raw: str) -> str:
     return raw
 
 
-def _default_fetch(url: str) -> bytes:
-    """Fetch URL content using urllib."""
-    with request.urlopen(url, timeout=DEFAULT_TIMEOUT) as response:  # nosec B310
-        status = getattr(response, "status", 200)
-        if 200 <= status < 300:
-            return response.read()
+def _media_type(content_type: str) -> str:
+    """Return the lower-cased media type without parameters."""
+    return content_type.split(";", 1)[0].strip().lower()
+
+
+def _declared_kind(media_type: str) -> ContentKind | None:
+    """Classify a media type, or return None when it says nothing useful."""
+    if media_type in _HTML_TYPES:
+        return ContentKind.HTML
+    if media_type in _JSON_TYPES or media_type.endswith("+json"):
+        return ContentKind.JSON
+    if media_type.startswith("text/"):
+        return ContentKind.TEXT
+    if media_type in _BINARY_TYPES or media_type.startswith(_BINARY_TYPE_PREFIXES):
+        return ContentKind.BINARY
+    return None
+
+
+def _sniffed_kind(head: bytes) -> ContentKind:
+    """Guess HTML or JSON from the first bytes of an unlabelled body."""
+    start = head.lstrip(b"\xef\xbb\xbf \t\r\n")[:1]
+    return ContentKind.JSON if start in (b"{", b"[") else ContentKind.HTML
+
+
+def content_kind(content_type: str, head: bytes) -> ContentKind:
+    """Classify a body by magic bytes first, then Content-Type, then sniffing."""
+    if head.startswith(_BINARY_MAGIC) or b"\x00" in head:
+        return ContentKind.BINARY
+    return _declared_kind(_media_type(content_type)) or _sniffed_kind(head)
+
+
+def _payload_kind(payload: bytes) -> ContentKind:
+    """Classify a fetched payload using its Content-Type when known."""
+    return content_kind(_content_type(payload), payload[:_CONTENT_SNIFF_BYTES])
+
+
+def _content_type(payload: bytes) -> str:
+    """Return the Content-Type a payload was served with, if recorded."""
+    return getattr(payload, "content_type", "")
+
+
+def _unsupported_message(url: str, content_type: str) -> str:
+    """Return the error reported for bodies that cannot be rendered as text."""
+    media_type = _media_type(content_type)
+    if _declared_kind(media_type) is ContentKind.BINARY:
+        return f"Error: unsupported content type '{media_type}' for '{url}'"
+    served_as = media_type or "no content type"
+    return f"Error: unsupported binary content (served as {served_as}) for '{url}'"
+
+
+def _check_content(url: str, content_type: str, head: bytes) -> None:
+    """Raise ValueError when a response is a binary type browse cannot render."""
+    if content_kind(content_type, head) is ContentKind.BINARY:
+        raise ValueError(_unsupported_message(url, content_type))
+
+
+def _check_status(url: str, response: HTTPResponse) -> None:
+    """Raise HTTPError for non-2xx responses."""
+    status = getattr(response, "status", 200)
+    if not 200 <= status < 300:
         raise error.HTTPError(url, status, response.reason, response.headers, None)
 
 
+def _read_body(url: str, response: HTTPResponse) -> Payload:
+    """Read a response body, aborting binary types before the full download."""
+    _check_status(url, response)
+    content_type = response.headers.get("Content-Type", "") or ""
+    _check_content(url, content_type, b"")
+    head = response.read(_CONTENT_SNIFF_BYTES)
+    _check_content(url, content_type, head)
+    body = head + response.read()
+    headers = tuple(response.headers.items())
+    return Payload(body, content_type, response.geturl(), headers)
+
+
+def _default_fetch(
+    url: str,
+    timeout: float = DEFAULT_TIMEOUT,
+    opener: request.OpenerDirector | None = None,
+) -> bytes:
+    """Fetch URL content using urllib."""
+    open_url = opener.open if opener is not None else request.urlopen
+    with open_url(url, timeout=timeout) as response:  # nosec B310
+        return _read_body(url, response)
+
+
+def _default_fetch_stream(
+    url: str, timeout: float = DEFAULT_TIMEOUT
+) -> Iterator[bytes]:
+    """Yield URL content in chunks using urllib."""
+    with request.urlopen(url, timeout=timeout) as response:  # nosec B310
+        _check_status(url, response)
+        content_type = response.headers.get("Content-Type", "") or ""
+        _check_content(url, content_type, b"")
+        head = response.read(DEFAULT_CHUNK_SIZE)
+        _check_content(url, content_type, head[:_CONTENT_SNIFF_BYTES])
+        yield Payload(head, content_type)
+        while chunk := response.read(DEFAULT_CHUNK_SIZE):
+            yield chunk
+
+
+_CONTENT_RANGE_START = re.compile(r"bytes\s+(\d+)-")
+
+
+def _strong_validator(headers: Message) -> str:
+    """Return a validator usable in If-Range: a strong ETag or Last-Modified."""
+    etag = headers.get("ETag", "") or ""
+    if etag and not etag.startswith("W/"):
+        return etag
+    return headers.get("Last-Modified", "") or ""
+
+
+def _range_offset(response: HTTPResponse) -> int | None:
+    """Return the first byte of a 206 response, or None for a full response."""
+    if getattr(response, "status", 200) != 206:
+        return None
+    match = _CONTENT_RANGE_START.match(response.headers.get("Content-Range", ""))
+    return int(match.group(1)) if match else None
+
+
+def _discard(spool: IO[bytes]) -> None:
+    """Empty a spool file so the next transfer starts from byte zero."""
+    spool.seek(0)
+    spool.truncate()
+
+
+class ResumableFetchStream:
+    """Stream fetch that spools to a temp file and resumes with Range requests.
+
+    A transfer cut short is retried from the spooled length with ``Range``
+    and ``If-Range``, so an unchanged resource continues where it stopped
+    and a changed one is served (and spooled) in full. Once complete the
+    spool is memory-mapped and yielded in chunks, so the body is never
+    held in memory as a whole.
+    """
+
+    def __init__(
+        self,
+        timeout: float = DEFAULT_TIMEOUT,
+        attempts: int = DEFAULT_RESUME_ATTEMPTS,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        backoff: float = RESUME_BACKOFF,
+    ) -> None:
+        """Initialize with the socket timeout, attempt limit and spool cap."""
+        self._timeout = timeout
+        self._attempts = max(1, attempts)
+        self._max_bytes = max_bytes
+        self._backoff = backoff
+        self.resumed = 0
+
+    def __call__(self, url: str) -> Iterator[bytes]:
+        """Download the URL to a spool, then yield it from a memory map."""
+        with tempfile.TemporaryFile(prefix="browse-spool-") as spool:
+            content_type, final_url = self._download(url, spool)
+            spool.flush()
+            size = spool.tell()
+            if not size:
+                yield Payload(b"", content_type, final_url)
+                return
+            with mmap.mmap(spool.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                yield Payload(view[:DEFAULT_CHUNK_SIZE], content_type, final_url)
+                for start in range(DEFAULT_CHUNK_SIZE, size, DEFAULT_CHUNK_SIZE):
+                    yield view[start : start + DEFAULT_CHUNK_SIZE]
+
+    def _download(self, url: str, spool: IO[bytes]) -> tuple[str, str]:
+        """Spool the body, resuming after failures; return type and final URL."""
+        validator = content_type = final_url = ""
+        for attempt in range(self._attempts):
+            offset = spool.tell()
+            headers = {"Range": f"bytes={offset}-", "If-Range": validator}
+            req = request.Request(url, headers=headers if offset else {})
+            try:
+                with request.urlopen(req, timeout=self._timeout) as response:  # nosec B310
+                    start = _range_offset(response)
+                    if offset and start == offset:
+                        self.resumed += 1
+                    else:
+                        _discard(spool)
+                        content_type, final_url = self._check_full(url, response)
+                        validator = _strong_validator(response.headers)
+                    if start in (None, offset):
+                        self._copy(url, response, spool, content_type)
+                        return content_type, final_url
+                    validator = ""
+            except error.HTTPError:
+                raise
+            except (error.URLError, IncompleteRead, OSError):
+                if attempt + 1 == self._attempts:
+                    raise
+                if not validator:
+                    _discard(spool)
+                time.sleep(self._backoff * 2**attempt)
+        msg = f"unexpected Content-Range resuming '{url}'"
+        raise error.URLError(msg)
+
+    @staticmethod
+    def _check_full(url: str, response: HTTPResponse) -> tuple[str, str]:
+        """Validate a full response and return its type and final URL."""
+        _check_status(url, response)
+        content_type = response.headers.get("Content-Type", "") or ""
+        _check_content(url, content_type, b"")
+        return content_type, response.geturl()
+
+    def _copy(
+        self, url: str, response: HTTPResponse, spool: IO[bytes], content_type: str
+    ) -> None:
+        """Append the response body to the spool up to one byte past the cap.
+
+        urllib returns a short body without error when the connection drops,
+        so a body shorter than its Content-Length raises IncompleteRead.
+        """
+        limit = self._max_bytes + 1
+        start = spool.tell()
+        length = int(response.headers.get("Content-Length") or -1)
+        while spool.tell() < limit:
+            chunk = response.read(min(DEFAULT_CHUNK_SIZE, limit - spool.tell()))
+            if not chunk:
+                received = spool.tell() - start
+                if received < length:
+                    raise IncompleteRead(b"", length - received)
+                return
+            if spool.tell() == 0:
+                _check_content(url, content_type, chunk[:_CONTENT_SNIFF_BYTES])
+            spool.write(chunk)
+
+
+@dataclass(frozen=True)
+class CacheEntry:
+    """Metadata for a cached response body: validators and freshness."""
+
+    url: str
+    etag: str | None
+    last_modified: str | None
+    stored_at: float
+    max_age: float
+    size: int
+    content_type: str = ""
+
+    def is_fresh(self, now: float) -> bool:
+        """Return True while the entry is within its Cache-Control max-age."""
+        return now - self.stored_at < self.max_age
+
+    def validators(self) -> dict[str, str]:
+        """Return conditional request headers for revalidating the entry."""
+        headers: dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+def _freshness_lifetime(headers: Message) -> float | None:
+    """Return max-age seconds, 0 to always revalidate, or None for no-store."""
+    cache_control = headers.get("Cache-Control", "") or ""
+    directives = {part.strip().lower() for part in cache_control.split(",")}
+    if "no-store" in directives:
+        return None
+    if "no-cache" in directives:
+        return 0.0
+    match = _MAX_AGE_PATTERN.search(cache_control)
+    return float(match.group(1)) if match else 0.0
+
+
+class HttpCache:
+    """Size-bounded on-disk store of response bodies and their validators."""
+
+    def __init__(
+        self,
+        root: Path,
+        max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """Initialize the cache rooted at a directory."""
+        self.root = root
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._evict_lock = threading.Lock()
+
+    def _paths(self, url: str) -> tuple[Path, Path]:
+        """Return the metadata and body paths for a URL."""
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.root / f"{key}.json", self.root / f"{key}.body"
+
+    def lookup(self, url: str) -> CacheEntry | None:
+        """Return the cached entry for a URL, if both files are present."""
+        meta_path, body_path = self._paths(url)
+        try:
+            entry = CacheEntry(**json.loads(meta_path.read_text("utf-8")))
+        except (OSError, ValueError, TypeError):
+            return None
+        return entry if body_path.exists() else None
+
+    def body(self, url: str) -> bytes:
+        """Return the cached body and mark it recently used."""
+        _, body_path = self._paths(url)
+        payload = body_path.read_bytes()
+        os.utime(body_path)
+        return payload
+
+    def store(self, url: str, payload: bytes, headers: Message) -> None:
+        """Store a 200 response unless it is no-store or carries no way to reuse it."""
+        entry = self._entry(url, headers, len(payload))
+        if entry is None or len(payload) > self.max_bytes:
+            return
+        meta_path, body_path = self._paths(url)
+        _write_atomic(body_path, payload)
+        _write_atomic(meta_path, json.dumps(asdict(entry)).encode("utf-8"))
+        self._evict()
+
+    def refresh(self, entry: CacheEntry, headers: Message) -> None:
+        """Restart an entry's freshness after a 304 Not Modified."""
+        max_age = _freshness_lifetime(headers)
+        updated = replace(
+            entry,
+            etag=headers.get("ETag") or entry.etag,
+            last_modified=headers.get("Last-Modified") or entry.last_modified,
+            stored_at=self.clock(),
+            max_age=entry.max_age if max_age is None else max_age,
+        )
+        meta_path, _ = self._paths(entry.url)
+        _write_atomic(meta_path, json.dumps(asdict(updated)).encode("utf-8"))
+
+    def _entry(self, url: str, headers: Message, size: int) -> CacheEntry | None:
+        """Build an entry from response headers, or None if not cacheable."""
+        max_age = _freshness_lifetime(headers)
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        if max_age is None or not (max_age or etag or last_modified):
+            return None
+        content_type = headers.get("Content-Type", "") or ""
+        return CacheEntry(
+            url, etag, last_modified, self.clock(), max_age, size, content_type
+        )
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until the cache fits its bound."""
+        with self._evict_lock:
+            bodies = sorted(_body_stats(self.root), key=lambda item: item[1])
+            total = sum(size for _, _, size in bodies)
+            for body_path, _, size in bodies:
+                if total <= self.max_bytes:
+                    return
+                total -= size
+                body_path.unlink(missing_ok=True)
+                body_path.with_suffix(".json").unlink(missing_ok=True)
+
+
+def _body_stats(root: Path) -> Iterator[tuple[Path, float, int]]:
+    """Yield (path, mtime, size) for cached bodies that still exist."""
+    for body_path in root.glob("*.body"):
+        with suppress(FileNotFoundError):
+            stat = body_path.stat()
+            yield body_path, stat.st_mtime, stat.st_size
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    """Write data to a path via a uniquely named temporary file and rename."""
+    with tempfile.NamedTemporaryFile(
+        dir=path.parent, prefix=f"{path.name}.", suffix=".tmp", delete=False
+    ) as tmp:
+        tmp.write(data)
+    os.replace(tmp.name, path)
+
+
+class CachingFetch:
+    """Fetch implementation that serves fresh hits and revalidates stale ones."""
+
+    def __init__(self, cache: HttpCache, timeout: float = DEFAULT_TIMEOUT) -> None:
+        """Initialize with the backing cache."""
+        self._cache = cache
+        self._timeout = timeout
+
+    def __call__(self, url: str) -> bytes:
+        """Return the body for a URL, using the network only when required."""
+        entry = self._cache.lookup(url)
+        if entry is not None and entry.is_fresh(self._cache.clock()):
+            return Payload(self._cache.body(url), entry.content_type)
+        headers = entry.validators() if entry is not None else {}
+        try:
+            return self._download(request.Request(url, headers=headers))
+        except error.HTTPError as exc:
+            if exc.code != 304 or entry is None:
+                raise
+            self._cache.refresh(entry, exc.headers)
+            return Payload(self._cache.body(url), entry.content_type)
+
+    def _download(self, req: request.Request) -> bytes:
+        """Download a full response and store it in the cache."""
+        with request.urlopen(req, timeout=self._timeout) as response:  # nosec B310
+            payload = _read_body(req.full_url, response)
+            self._cache.store(req.full_url, payload, response.headers)
+            return payload
+
+
+def _header_lines(block: bytes) -> list[tuple[str, str]]:
+    """Parse CRLF-separated ``Name: value`` lines, skipping the first line."""
+    lines = block.decode("latin-1").split("\r\n")[1:]
+    return [
+        (name.strip(), value.strip())
+        for name, sep, value in (line.partition(":") for line in lines)
+        if sep
+    ]
+
+
+def _archive_record(url: str, payload: bytes) -> bytes:
+    """Return one WARC-style response record for a fetched payload."""
+    final_url = getattr(payload, "final_url", "") or url
+    headers = list(getattr(payload, "headers", ()))
+    if not headers and _content_type(payload):
+        headers = [("Content-Type", _content_type(payload))]
+    http_head = "".join(f"{name}: {value}\r\n" for name, value in headers)
+    block = f"HTTP/1.1 200 OK\r\n{http_head}\r\n".encode("latin-1") + payload
+    warc_head = (
+        "WARC/1.1\r\n"
+        "WARC-Type: response\r\n"
+        f"WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>\r\n"
+        f"WARC-Date: {datetime.now(UTC).strftime('%Y-%m-%dT%H:%M:%SZ')}\r\n"
+        f"WARC-Target-URI: {final_url}\r\n"
+        "Content-Type: application/http; msgtype=response\r\n"
+        f"Content-Length: {len(block)}\r\n\r\n"
+    )
+    return warc_head.encode("utf-8") + block + b"\r\n\r\n"
+
+
+class ArchiveWriter:
+    """Append-only archive of gzip-member response records with an offset index.
+
+    Each record is compressed as its own gzip member, so the archive is a
+    valid ``.warc.gz`` stream and any record can be inflated on its own.
+    The ``.idx`` sidecar holds one JSON line per canonical URL.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Initialize with the archive path; the index sits beside it."""
+        self.path = path
+        self.index_path = _index_path(path)
+        self.records = 0
+        self._lock = threading.Lock()
+
+    def append(self, url: str, payload: bytes) -> None:
+        """Append a response record, indexed by its requested and final URL."""
+        member = gzip.compress(_archive_record(url, payload))
+        final_url = getattr(payload, "final_url", "") or url
+        keys = dict.fromkeys([canonical_url(url), canonical_url(final_url)])
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("ab") as archive:
+                offset = archive.tell()
+                archive.write(member)
+            entries = (
+                json.dumps({"key": key, "offset": offset, "length": len(member)})
+                for key in keys
+            )
+            with self.index_path.open("a", encoding="utf-8") as index:
+                index.writelines(f"{entry}\n" for entry in entries)
+            self.records += 1
+
+
+def _index_path(path: Path) -> Path:
+    """Return the offset index path for an archive."""
+    return path.with_name(f"{path.name}.idx")
+
+
+class ArchivingFetch:
+    """Fetch implementation that appends every fetched payload to an archive."""
+
+    def __init__(self, writer: ArchiveWriter, fetch: Fetch | None = None) -> None:
+        """Initialize with the archive writer and the fetch to record."""
+        self.writer = writer
+        self._fetch = fetch or _default_fetch
+
+    def __call__(self, url: str) -> bytes:
+        """Fetch a URL and archive the payload before returning it."""
+        payload = self._fetch(url)
+        self.writer.append(url, payload)
+        return payload
+
+
+class ArchiveFetch:
+    """Fetch implementation that replays payloads from an archive without I/O.
+
+    The index is loaded once; records are read by slicing a read-only
+    memory map of the archive, so only the requested member is inflated.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Load the offset index and map the archive."""
+        self.path = path
+        self._offsets: dict[str, tuple[int, int]] = {}
+        with _index_path(path).open(encoding="utf-8") as index:
+            for line in index:
+                entry = json.loads(line)
+                self._offsets[entry["key"]] = (entry["offset"], entry["length"])
+        with path.open("rb") as archive:
+            size = os.fstat(archive.fileno()).st_size
+            self._map = (
+                mmap.mmap(archive.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+            )
+
+    def __call__(self, url: str) -> bytes:
+        """Return the archived payload for a URL."""
+        location = self._offsets.get(canonical_url(url))
+        if location is None:
+            msg = f"Error: '{url}' is not in archive '{self.path}'"
+            raise FileNotFoundError(msg)
+        offset, length = location
+        record = gzip.decompress(self._map[offset : offset + length])
+        warc_head, _, rest = record.partition(b"\r\n\r\n")
+        warc_headers = dict(_header_lines(warc_head))
+        block = rest[: int(warc_headers["Content-Length"])]
+        http_head, _, body = block.partition(b"\r\n\r\n")
+        headers = tuple(_header_lines(http_head))
+        content_type = next(
+            (value for name, value in headers if name.lower() == "content-type"), ""
+        )
+        return Payload(body, content_type, warc_headers["WARC-Target-URI"], headers)
+
+
 def _default_render(payload: bytes) -> str:
     """Render HTML payload to plain text using lynx."""
     result = subprocess.run(
@@ -69,6 +759,944 @@ def _default_render(payload: bytes) -> str:
     return result.stdout.decode("utf-8", errors="replace")
 
 
+def _payload_charset(payload: bytes) -> str:
+    """Return the declared charset of an HTML payload, defaulting to UTF-8."""
+    match = _CHARSET_PATTERN.search(payload[:_CHARSET_SNIFF_BYTES])
+    if match is None:
+        return "utf-8"
+    name = match.group(1).decode("ascii")
+    try:
+        return codecs.lookup(name).name
+    except LookupError:
+        return "utf-8"
+
+
+@dataclass
+class _ListState:
+    """Bullet or counter state for one level of list nesting."""
+
+    ordered: bool
+    counter: int = 0
+
+
+@dataclass
+class _DumpState:
+    """Accumulated output of the in-process dump renderer."""
+
+    lines: list[str] = field(default_factory=list)
+    inline: list[str] = field(default_factory=list)
+    links: list[str] = field(default_factory=list)
+    lists: list[_ListState] = field(default_factory=list)
+    marker: str | None = None
+    want_blank: bool = False
+    last_line: str | None = None
+
+
+class _DumpParser(HTMLParser):
+    """HTML parser that lays text out like ``lynx -dump``."""
+
+    def __init__(self) -> None:
+        """Initialize the parser state."""
+        super().__init__()
+        self._state = _DumpState()
+        self._skip_depth = 0
+        self._pre_depth = 0
+        self._heading = False
+        self._base_href = ""
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        attr_map = {key: value or "" for key, value in attrs}
+        if tag == "base":
+            self._base_href = attr_map.get("href", "")
+        if tag in _SKIPPED_TAGS:
+            self._skip_depth += 1
+        if self._skip_depth:
+            return
+        self._open_block(tag)
+        self._open_inline(tag, attr_map)
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in _SKIPPED_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+            return
+        if self._skip_depth:
+            return
+        self._close_block(tag)
+
+    def handle_data(self, data: str) -> None:
+        if not self._skip_depth:
+            self._state.inline.append(data)
+
+    def _separates_paragraph(self, tag: str, enclosing_lists: int) -> bool:
+        """Return True if the tag is set off by blank lines (nested lists are not)."""
+        if tag in ("ul", "ol"):
+            return enclosing_lists == 0
+        return tag in _PARAGRAPH_TAGS
+
+    def _open_block(self, tag: str) -> None:
+        """Flush pending text and update layout state for a block start."""
+        if tag in _PARAGRAPH_TAGS or tag in _LINE_TAGS or tag == "br":
+            self._flush(blank=self._separates_paragraph(tag, len(self._state.lists)))
+        if tag in ("ul", "ol"):
+            self._state.lists.append(_ListState(ordered=tag == "ol"))
+        elif tag == "li":
+            self._state.marker = self._next_marker()
+        elif tag == "pre":
+            self._pre_depth += 1
+        elif tag == "hr":
+            self._state.inline.append("_" * (DUMP_WIDTH - DUMP_INDENT))
+            self._flush(blank=True)
+        self._heading = self._heading or tag in _HEADING_TAGS
+
+    def _open_inline(self, tag: str, attr_map: dict[str, str]) -> None:
+        """Emit inline markers for links, images and table cells."""
+        if tag == "a" and attr_map.get("href"):
+            href = parse.urljoin(self._base_href, attr_map["href"])
+            self._state.links.append(href)
+            self._state.inline.append(f"[{len(self._state.links)}]")
+        elif tag == "img" and attr_map.get("alt"):
+            self._state.inline.append(f"[{attr_map['alt']}]")
+        elif tag in ("td", "th"):
+            self._state.inline.append(" ")
+
+    def _close_block(self, tag: str) -> None:
+        """Flush pending text and unwind layout state for a block end."""
+        if tag in _PARAGRAPH_TAGS or tag in _LINE_TAGS:
+            enclosing = max(0, len(self._state.lists) - 1)
+            self._flush(blank=self._separates_paragraph(tag, enclosing))
+        if tag in ("ul", "ol") and self._state.lists:
+            self._state.lists.pop()
+        elif tag == "pre":
+            self._pre_depth = max(0, self._pre_depth - 1)
+        if tag in _HEADING_TAGS:
+            self._heading = False
+
+    def _next_marker(self) -> str:
+        """Return the bullet or number for the next list item."""
+        if not self._state.lists:
+            return _BULLETS[0]
+        current = self._state.lists[-1]
+        current.counter += 1
+        if current.ordered:
+            return f"{current.counter}."
+        return _BULLETS[(len(self._state.lists) - 1) % len(_BULLETS)]
+
+    def _indent(self) -> int:
+        """Return the text column for the current nesting level."""
+        if self._heading:
+            return 0
+        return DUMP_INDENT + 4 * len(self._state.lists)
+
+    def _flush(self, *, blank: bool) -> None:
+        """Lay out the pending inline text and request a separator."""
+        text = "".join(self._state.inline)
+        self._state.inline.clear()
+        lines = self._pre_lines(text) if self._pre_depth else self._wrapped(text)
+        if lines:
+            self._emit(lines)
+        self._state.want_blank = self._state.want_blank or blank
+
+    def _wrapped(self, text: str) -> list[str]:
+        """Collapse whitespace and wrap text at the current indent."""
+        collapsed = " ".join(text.split())
+        if not collapsed:
+            return []
+        indent = " " * self._indent()
+        first = indent
+        if self._state.marker is not None:
+            first = f"{self._state.marker} ".rjust(len(indent))
+            self._state.marker = None
+        return textwrap.wrap(
+            collapsed,
+            width=DUMP_WIDTH,
+            initial_indent=first,
+            subsequent_indent=indent,
+            break_long_words=False,
+            break_on_hyphens=False,
+        )
+
+    def _pre_lines(self, text: str) -> list[str]:
+        """Return preformatted lines indented but otherwise untouched."""
+        indent = " " * self._indent()
+        stripped = text.strip("\n")
+        return [f"{indent}{line}".rstrip() for line in stripped.split("\n")]
+
+    def _emit(self, lines: list[str]) -> None:
+        """Append lines to the output, honouring a pending blank line."""
+        output = self._state.lines
+        if self._state.want_blank and self._state.last_line:
+            output.append("")
+        self._state.want_blank = False
+        output.extend(lines)
+        self._state.last_line = lines[-1]
+
+    def _references(self) -> list[str]:
+        """Return the numbered link reference section."""
+        if not self._state.links:
+            return []
+        numbered = (
+            f"{index:>4}. {href}"
+            for index, href in enumerate(self._state.links, start=1)
+        )
+        return ["", "References", "", *numbered]
+
+    def drain(self) -> list[str]:
+        """Return and forget the lines laid out since the last drain."""
+        lines, self._state.lines = self._state.lines, []
+        return lines
+
+    def finish(self) -> list[str]:
+        """Return the remaining lines, including references, after the last feed."""
+        self._flush(blank=False)
+        return [*self.drain(), *self._references()]
+
+    def dump(self) -> str:
+        """Return the rendered text once all input has been fed."""
+        lines = self.finish()
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+def _builtin_render(payload: bytes) -> str:
+    """Render HTML payload to plain text in-process, in lynx dump layout."""
+    parser = _DumpParser()
+    parser.feed(payload.decode(_payload_charset(payload), errors="replace"))
+    parser.close()
+    return parser.dump()
+
+
+def _iter_decoded(chunks: Iterable[bytes]) -> Iterator[str]:
+    """Decode chunks incrementally using the charset declared near the start."""
+    iterator = iter(chunks)
+    head = b""
+    for chunk in iterator:
+        head += chunk
+        if len(head) >= _CHARSET_SNIFF_BYTES:
+            break
+    decoder = codecs.getincrementaldecoder(_payload_charset(head))(errors="replace")
+    yield decoder.decode(head)
+    for chunk in iterator:
+        yield decoder.decode(chunk)
+    yield decoder.decode(b"", final=True)
+
+
+def _builtin_render_stream(chunks: Iterable[bytes]) -> Iterator[str]:
+    """Yield dump lines in-process as soon as each block is laid out."""
+    parser = _DumpParser()
+    for text in _iter_decoded(chunks):
+        parser.feed(text)
+        yield from parser.drain()
+    parser.close()
+    yield from parser.finish()
+
+
+def _feed_pipe(
+    pipe: IO[bytes], chunks: Iterable[bytes], failure: list[BaseException]
+) -> None:
+    """Write chunks to a subprocess pipe, recording any fetch failure."""
+    try:
+        for chunk in chunks:
+            pipe.write(chunk)
+    except BrokenPipeError:
+        pass
+    except Exception as exc:  # noqa: BLE001 - re-raised by the reading side
+        failure.append(exc)
+    finally:
+        with suppress(BrokenPipeError):
+            pipe.close()
+
+
+def _lynx_render_stream(chunks: Iterable[bytes]) -> Iterator[str]:
+    """Yield lynx dump lines while a feeder thread pipes chunks into lynx."""
+    failure: list[BaseException] = []
+    with subprocess.Popen(
+        ["lynx", "-dump", "-stdin"],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    ) as proc:
+        assert proc.stdin and proc.stdout and proc.stderr
+        feeder = threading.Thread(
+            target=_feed_pipe, args=(proc.stdin, chunks, failure), daemon=True
+        )
+        feeder.start()
+        for raw in proc.stdout:
+            yield raw.decode("utf-8", errors="replace").rstrip("\n")
+        feeder.join()
+        stderr = proc.stderr.read()
+        if failure:
+            raise failure[0]
+        if proc.wait() != 0:
+            raise subprocess.CalledProcessError(
+                proc.returncode, proc.args, stderr=stderr
+            )
+
+
+RENDERERS: dict[str, Render] = {
+    "lynx": _default_render,
+    "builtin": _builtin_render,
+}
+RENDER_STREAMS: dict[str, RenderStream] = {
+    "lynx": _lynx_render_stream,
+    "builtin": _builtin_render_stream,
+}
+RENDERER_BINARIES: dict[str, tuple[str, ...]] = {
+    "lynx": ("lynx",),
+    "builtin": (),
+}
+
+
+_BOILERPLATE_TAGS = frozenset(
+    {
+        "nav",
+        "aside",
+        "form",
+        "button",
+        "select",
+        "iframe",
+        "svg",
+        "noscript",
+        "script",
+        "style",
+        "template",
+    }
+)
+_PAGE_CHROME_TAGS = frozenset({"header", "footer"})
+# Never judged by role/class/id: dropping one of these drops the content itself.
+_CONTENT_ROOT_TAGS = frozenset({"html", "body", "main", "article"})
+# Elements without an end tag, so they can never open a skipped subtree.
+_VOID_TAGS = frozenset(
+    {
+        "area",
+        "base",
+        "br",
+        "col",
+        "embed",
+        "hr",
+        "img",
+        "input",
+        "link",
+        "meta",
+        "param",
+        "source",
+        "track",
+        "wbr",
+    }
+)
+# Start tags that implicitly close an open element of the listed names, searching
+# no further up than the nearest of the listed containers.
+_IMPLIED_ENDS: dict[str, tuple[frozenset[str], frozenset[str]]] = {
+    "li": (frozenset({"li"}), frozenset({"ul", "ol", "menu"})),
+    "dt": (frozenset({"dt", "dd"}), frozenset({"dl"})),
+    "dd": (frozenset({"dt", "dd"}), frozenset({"dl"})),
+    "tr": (frozenset({"tr", "td", "th"}), frozenset({"table"})),
+    "td": (frozenset({"td", "th"}), frozenset({"tr", "table"})),
+    "th": (frozenset({"td", "th"}), frozenset({"tr", "table"})),
+    "option": (frozenset({"option"}), frozenset({"select", "datalist"})),
+}
+# Start tags that implicitly close an open <p>.
+_CLOSES_P = frozenset(
+    {
+        "address",
+        "article",
+        "aside",
+        "blockquote",
+        "details",
+        "div",
+        "dl",
+        "fieldset",
+        "figcaption",
+        "figure",
+        "footer",
+        "form",
+        "h1",
+        "h2",
+        "h3",
+        "h4",
+        "h5",
+        "h6",
+        "header",
+        "hr",
+        "main",
+        "menu",
+        "nav",
+        "ol",
+        "p",
+        "pre",
+        "section",
+        "table",
+        "ul",
+    }
+)
+_P_SCOPE = frozenset({"html", "body", "table", "td", "th", "button", "template"})
+_BOILERPLATE_ROLES = frozenset(
+    {"navigation", "banner", "contentinfo", "complementary", "search"}
+)
+_BOILERPLATE_NAMES = re.compile(
+    r"(?:^|[\s_-])(?:nav|navbar|menu|sidebar|footer|breadcrumbs?|cookies?|"
+    r"banner|share|social|related|comments?|advert|ads|promo|newsletter)(?:$|[\s_-])",
+    re.IGNORECASE,
+)
+_REFERENCE_LINE = re.compile(r"^\s*(\d+)\. (\S+)$")
+_LINK_MARKER = re.compile(r"\[(\d+)\]")
+
+
+class _MainContentFilter(HTMLParser):
+    """HTML re-serializer that drops page chrome and isolates the main content.
+
+    Boilerplate subtrees (navigation, sidebars, forms, scripts, elements
+    whose role, class or id marks them as chrome) are skipped. Open
+    elements are tracked as a stack, so a skipped subtree also ends when
+    an enclosing element closes or a start tag implies its end tag
+    (``<li>``, ``<p>``). Output is kept three ways so the caller can
+    prefer ``<main>``, then ``<article>``, then the whole filtered page.
+    """
+
+    def __init__(self) -> None:
+        """Initialize empty outputs and region trackers."""
+        super().__init__(convert_charrefs=True)
+        self.page: list[str] = []
+        self.main: list[str] = []
+        self.articles: list[str] = []
+        self._open: list[str] = []
+        self._skip_at: int | None = None
+        self._main_at: int | None = None
+        self._main_done = False
+        self._article_depth = 0
+
+    def _is_boilerplate(self, tag: str, attrs: dict[str, str]) -> bool:
+        """Return True if an element is page chrome rather than content."""
+        if tag in _BOILERPLATE_TAGS:
+            return True
+        in_content = self._main_at is not None or self._article_depth > 0
+        if tag in _PAGE_CHROME_TAGS and not in_content:
+            return True
+        role = attrs.get("role", "").lower()
+        if tag in _CONTENT_ROOT_TAGS or role == "main":
+            return False
+        if role in _BOILERPLATE_ROLES:
+            return True
+        names = f"{attrs.get('class', '')} {attrs.get('id', '')}"
+        return bool(_BOILERPLATE_NAMES.search(names))
+
+    def _write(self, text: str) -> None:
+        """Append markup to every region currently open."""
+        self.page.append(text)
+        if self._main_at is not None:
+            self.main.append(text)
+        if self._article_depth:
+            self.articles.append(text)
+
+    def _find_open(self, names: frozenset[str], scope: frozenset[str]) -> int | None:
+        """Return the index of the innermost open element in names, within scope."""
+        for index in range(len(self._open) - 1, -1, -1):
+            if self._open[index] in names:
+                return index
+            if self._open[index] in scope:
+                return None
+        return None
+
+    def _close_to(self, index: int) -> None:
+        """Close the open elements from the innermost down to index."""
+        while len(self._open) > index:
+            tag = self._open.pop()
+            depth = len(self._open)
+            if self._skip_at is not None:
+                self._skip_at = None if depth == self._skip_at else self._skip_at
+                continue
+            self._write(f"</{tag}>")
+            if tag == "article" and self._article_depth:
+                self._article_depth -= 1
+            if depth == self._main_at:
+                self._main_at = None
+                self._main_done = True
+
+    def _close_implied(self, tag: str) -> None:
+        """Close the open elements whose end tag this start tag implies."""
+        if tag in _CLOSES_P:
+            index = self._find_open(frozenset({"p"}), _P_SCOPE)
+            if index is not None:
+                self._close_to(index)
+        if tag in _IMPLIED_ENDS:
+            index = self._find_open(*_IMPLIED_ENDS[tag])
+            if index is not None:
+                self._close_to(index)
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        self._close_implied(tag)
+        if tag in _VOID_TAGS:
+            self.handle_startendtag(tag, attrs)
+            return
+        self._open.append(tag)
+        if self._skip_at is not None:
+            return
+        attr_map = {key: value or "" for key, value in attrs}
+        if self._is_boilerplate(tag, attr_map):
+            self._skip_at = len(self._open) - 1
+            return
+        is_main = tag == "main" or attr_map.get("role", "").lower() == "main"
+        if self._main_at is None and not self._main_done and is_main:
+            self._main_at = len(self._open) - 1
+        self._write(self.get_starttag_text() or "")
+        if tag == "article":
+            self._article_depth += 1
+
+    def handle_startendtag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        attr_map = {key: value or "" for key, value in attrs}
+        if self._skip_at is None and not self._is_boilerplate(tag, attr_map):
+            self._write(self.get_starttag_text() or "")
+
+    def handle_endtag(self, tag: str) -> None:
+        index = self._find_open(frozenset({tag}), frozenset())
+        if index is not None:
+            self._close_to(index)
+
+    def handle_data(self, data: str) -> None:
+        if self._skip_at is None:
+            self._write(html.escape(data, quote=False))
+
+
+def extract_main_content(payload: bytes) -> bytes:
+    """Return the main content of an HTML payload as UTF-8 HTML."""
+    parser = _MainContentFilter()
+    parser.feed(payload.decode(_payload_charset(payload), errors="replace"))
+    parser.close()
+    parts = parser.main or parser.articles or parser.page
+    return ('<meta charset="utf-8">' + "".join(parts)).encode("utf-8")
+
+
+@dataclass(frozen=True)
+class OutputBudget:
+    """Per-page cap on rendered output in bytes and/or lines."""
+
+    max_bytes: int | None = None
+    max_lines: int | None = None
+
+    def fits(self, lines: Sequence[str]) -> bool:
+        """Return True if the lines, newline-terminated, are within budget."""
+        if self.max_lines is not None and len(lines) > self.max_lines:
+            return False
+        size = sum(len(line.encode("utf-8")) + 1 for line in lines)
+        return self.max_bytes is None or size <= self.max_bytes
+
+
+def _split_references(lines: list[str]) -> tuple[list[str], list[tuple[int, str]]]:
+    """Split dump lines into the body and its numbered link references."""
+    for index in range(len(lines) - 1, -1, -1):
+        if lines[index].strip() == "References":
+            numbered = (_REFERENCE_LINE.match(line) for line in lines[index + 1 :])
+            refs = [(int(m.group(1)), m.group(2)) for m in numbered if m]
+            return lines[:index], refs
+    return lines, []
+
+
+def _dedupe_references(
+    body: list[str], refs: list[tuple[int, str]]
+) -> tuple[list[str], list[tuple[int, str]]]:
+    """Merge references to the same URL and renumber the body's link markers."""
+    first_number: dict[str, int] = {}
+    renumber: dict[int, int] = {}
+    for number, url in refs:
+        renumber[number] = first_number.setdefault(url, len(first_number) + 1)
+
+    def remap(match: re.Match[str]) -> str:
+        number = int(match.group(1))
+        return f"[{renumber.get(number, number)}]"
+
+    body = [_LINK_MARKER.sub(remap, line) for line in body]
+    return body, [(number, url) for url, number in first_number.items()]
+
+
+def _squeeze_blank_lines(lines: list[str]) -> list[str]:
+    """Collapse runs of blank lines and trim them from both ends."""
+    squeezed: list[str] = []
+    for line in lines:
+        if line.strip() or (squeezed and squeezed[-1]):
+            squeezed.append(line.rstrip())
+    while squeezed and not squeezed[-1]:
+        squeezed.pop()
+    return squeezed
+
+
+def _cut_line(line: str, max_bytes: int) -> str:
+    """Return the line cut to fit max_bytes with its newline, at a space if possible."""
+    cut = line.encode("utf-8")[: max(0, max_bytes - 1)].decode("utf-8", "ignore")
+    return cut.rsplit(" ", 1)[0].rstrip() if " " in cut.strip() else cut
+
+
+def _fit_body(body: list[str], budget: OutputBudget) -> tuple[list[str], int]:
+    """Return the longest body prefix that fits and how many whole lines it keeps.
+
+    The prefix is cut at a paragraph if possible, then at a line; a line
+    is only cut inside when even the first one exceeds the byte limit.
+    """
+    kept: list[str] = []
+    paragraph: list[str] = []
+    for line in [*body, ""]:
+        if line:
+            paragraph.append(line)
+            continue
+        candidate = [*kept, "", *paragraph] if kept else paragraph
+        if not budget.fits(candidate):
+            break
+        kept, paragraph = candidate, []
+    if kept or not paragraph:
+        return kept, len(kept)
+    fitted = [
+        line
+        for index, line in enumerate(paragraph)
+        if budget.fits(paragraph[: index + 1])
+    ]
+    if fitted or budget.max_bytes is None or not budget.fits([""]):
+        return fitted, len(fitted)
+    cut = _cut_line(paragraph[0], budget.max_bytes)
+    return ([cut], 0) if cut else ([], 0)
+
+
+def condense_text(text: str, budget: OutputBudget | None = None) -> str:
+    """Return dump text without duplicate references, cut to the budget.
+
+    The body is cut at the last paragraph that fits, followed by a note
+    of how much was omitted; the note counts against the budget.
+    References are kept only for links cited in the kept body, and only
+    while they still fit.
+    """
+    budget = budget if budget is not None else OutputBudget()
+    body, refs = _split_references(text.splitlines())
+    body, refs = _dedupe_references(body, refs)
+    body = _squeeze_blank_lines(body)
+    reference_lines = [f"{number:>4}. {url}" for number, url in refs]
+    full = [*body, "", "References", "", *reference_lines] if refs else body
+    if budget.fits(full):
+        return "\n".join(full) + "\n" if full else ""
+    note = "[condensed: {} more lines omitted]"
+    probe = note.format(len(body))
+    if budget.fits(["", probe]):
+        reserve = OutputBudget(
+            None if budget.max_bytes is None else budget.max_bytes - len(probe) - 2,
+            None if budget.max_lines is None else budget.max_lines - 2,
+        )
+        kept, whole = _fit_body(body, reserve)
+    elif budget.fits([probe]):
+        return f"{probe}\n"
+    else:
+        return ""
+    if not kept:
+        return f"{probe}\n"
+    omitted = len(body) - whole
+    lines = [*kept, "", note.format(omitted)] if omitted else kept
+    cited = {int(n) for line in kept for n in _LINK_MARKER.findall(line)}
+    cited_refs = [f"{n:>4}. {url}" for n, url in refs if n in cited]
+    with_refs = [*lines, "", "References", "", *cited_refs]
+    if cited_refs and budget.fits(with_refs):
+        lines = with_refs
+    return "\n".join(lines) + "\n"
+
+
+class CondensedRender:
+    """Render wrapper that extracts main content and enforces an output budget."""
+
+    def __init__(self, render: Render, budget: OutputBudget | None = None) -> None:
+        """Initialize with the wrapped renderer and the per-page budget."""
+        self._render = render
+        self.budget = budget if budget is not None else OutputBudget()
+
+    def __call__(self, payload: bytes) -> str:
+        """Render only the page's main content, condensed to the budget."""
+        return condense_text(self._render(extract_main_content(payload)), self.budget)
+
+
+class RenderCache:
+    """Render wrapper that reuses output for byte-identical payloads (LRU)."""
+
+    def __init__(
+        self,
+        render: Render,
+        identity: str | None = None,
+        max_entries: int = DEFAULT_RENDER_CACHE_ENTRIES,
+    ) -> None:
+        """Initialize with the wrapped renderer and its identity/options string."""
+        self._render = render
+        self._identity = (identity or _render_identity(render)).encode("utf-8")
+        self._max_entries = max_entries
+        self._entries: OrderedDict[bytes, str] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __call__(self, payload: bytes) -> str:
+        """Return cached text for the payload, rendering it on a miss."""
+        key = hashlib.sha256(self._identity + b"\0" + payload).digest()
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+        text = self._render(payload)
+        self._remember(key, text)
+        return text
+
+    def _lookup(self, key: bytes) -> str | None:
+        """Return cached text and count the hit or miss."""
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def _remember(self, key: bytes, text: str) -> None:
+        """Store rendered text, evicting the least recently used entry."""
+        if self._max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = text
+            if len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def summary(self) -> str:
+        """Return the hit/miss counters for the run summary."""
+        return f"render cache: {self.hits} hits, {self.misses} misses"
+
+
+def _render_in_worker(renderer: str, payload: bytes) -> tuple[str, float]:
+    """Render a payload in a pool worker and return the text and busy seconds."""
+    started = time.perf_counter()
+    text = RENDERERS[renderer](payload)
+    return text, time.perf_counter() - started
+
+
+class RenderPool:
+    """Render implementation backed by long-lived worker processes.
+
+    Workers are started once and each renders many pages; payloads and
+    results travel over the executor's pipes as pickled frames. Callers
+    block on their own page only, so renders on other threads overlap
+    with fetching. Lynx still runs once per page inside a worker, since
+    it has no mode for rendering several documents in one process.
+    """
+
+    def __init__(self, renderer: str, workers: int | None = None) -> None:
+        """Start the pool for a registered renderer, one worker per CPU by default."""
+        self.renderer = renderer
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        context = multiprocessing.get_context("spawn")
+        self._executor = ProcessPoolExecutor(self.workers, mp_context=context)
+        self._lock = threading.Lock()
+        self._started: float | None = None
+        self._finished = 0.0
+        self.pages = 0
+        self.busy = 0.0
+
+    def __call__(self, payload: bytes) -> str:
+        """Render a payload on the next free worker."""
+        with self._lock:
+            if self._started is None:
+                self._started = time.monotonic()
+        future = self._executor.submit(_render_in_worker, self.renderer, bytes(payload))
+        text, busy = future.result()
+        with self._lock:
+            self.pages += 1
+            self.busy += busy
+            self._finished = time.monotonic()
+        return text
+
+    def utilisation(self) -> float:
+        """Return the share of worker time spent rendering since the first page."""
+        if self._started is None:
+            return 0.0
+        elapsed = max(self._finished - self._started, 1e-9)
+        return min(1.0, self.busy / (elapsed * self.workers))
+
+    def close(self) -> None:
+        """Stop the worker processes."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self) -> Self:
+        """Return the pool for use in a with block."""
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        """Stop the workers on leaving the with block."""
+        self.close()
+
+    def summary(self) -> str:
+        """Return the worker utilisation for the run summary."""
+        return (
+            f"render pool: {self.workers} workers, {self.pages} pages, "
+            f"{self.utilisation():.0%} utilisation"
+        )
+
+
+def _render_identity(render: Render) -> str:
+    """Return a stable name for a renderer callable."""
+    module = getattr(render, "__module__", "")
+    name = getattr(render, "__qualname__", type(render).__qualname__)
+    return f"{module}.{name}"
+
+
+def _is_tracking_param(name: str) -> bool:
+    """Return True for query parameters that only carry click tracking."""
+    lowered = name.lower()
+    return lowered in _TRACKING_PARAMS or lowered.startswith(_TRACKING_PREFIXES)
+
+
+def canonical_url(url: str) -> str:
+    """Return a key shared by URLs that name the same page.
+
+    The scheme is folded to https, the host lower-cased, default ports,
+    fragments and tracking parameters dropped, and the query sorted.
+    """
+    parts = parse.urlsplit(url)
+    host = (parts.hostname or "").lower()
+    netloc = host if parts.port in (None, 80, 443) else f"{host}:{parts.port}"
+    query = sorted(
+        (name, value)
+        for name, value in parse.parse_qsl(parts.query, keep_blank_values=True)
+        if not _is_tracking_param(name)
+    )
+    return parse.urlunsplit(
+        ("https", netloc, parts.path or "/", parse.urlencode(query), "")
+    )
+
+
+class _KnownRedirect(Exception):
+    """Stops a redirect whose target has already been fetched or is in flight."""
+
+    def __init__(self, key: str) -> None:
+        """Record the canonical key of the known target."""
+        super().__init__(key)
+        self.key = key
+
+
+class _CoalescingRedirectHandler(request.HTTPRedirectHandler):
+    """Redirect handler that refuses to follow redirects to known targets."""
+
+    def __init__(self, is_known: Callable[[str], bool]) -> None:
+        """Initialize with the predicate for already claimed targets."""
+        super().__init__()
+        self._is_known = is_known
+
+    def redirect_request(
+        self,
+        req: request.Request,
+        fp: IO[bytes],
+        code: int,
+        msg: str,
+        headers: HTTPMessage,
+        newurl: str,
+    ) -> request.Request | None:
+        key = canonical_url(parse.urljoin(req.full_url, newurl))
+        if self._is_known(key):
+            fp.close()
+            raise _KnownRedirect(key)
+        return super().redirect_request(req, fp, code, msg, headers, newurl)
+
+
+class CoalescingFetch:
+    """Fetch wrapper that shares one result between URLs for the same page.
+
+    URLs are keyed by canonical_url; a URL whose key, or whose redirect
+    target, is already fetched or in flight waits for and reuses that result.
+    Without an explicit fetch it uses urllib and stops redirect chains as soon
+    as they reach a known target, before any body is downloaded.
+    """
+
+    def __init__(
+        self, fetch: Fetch | None = None, timeout: float = DEFAULT_TIMEOUT
+    ) -> None:
+        """Initialize with the wrapped fetch, or the redirect-aware default."""
+        self._results: dict[str, Future[bytes]] = {}
+        self._adopting: set[str] = set()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._fetch = fetch or self._default_fetch(timeout)
+        self.fetched = 0
+        self.coalesced = 0
+
+    def _default_fetch(self, timeout: float) -> Fetch:
+        """Return a urllib fetch whose redirects consult the claimed targets."""
+        handler = _CoalescingRedirectHandler(self._is_known_target)
+        return partial(
+            _default_fetch, timeout=timeout, opener=request.build_opener(handler)
+        )
+
+    def _is_known_target(self, key: str) -> bool:
+        """Return True if another URL already claimed this redirect target.
+
+        A target whose owner is itself waiting on a redirect is not reused
+        until it finishes, and the caller is marked as adopting under the
+        same lock, so redirect loops between inputs cannot deadlock.
+        """
+        with self._lock:
+            future = self._results.get(key)
+            own_key = getattr(self._local, "key", None)
+            if future is None or key == own_key:
+                return False
+            if not future.done() and key in self._adopting:
+                return False
+            if own_key is not None:
+                self._adopting.add(own_key)
+            return True
+
+    def _claim(self, key: str) -> tuple[Future[bytes], bool]:
+        """Return the shared future for a key and whether this caller owns it."""
+        with self._lock:
+            future = self._results.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = self._results[key] = Future()
+            self.fetched += 1
+            return future, True
+
+    def __call__(self, url: str) -> bytes:
+        """Return the payload for a URL, reusing any result for the same page."""
+        key = canonical_url(url)
+        future, owner = self._claim(key)
+        if not owner:
+            return future.result()
+        self._local.key = key
+        try:
+            payload = self._fetch(url)
+        except _KnownRedirect as exc:
+            return self._adopt(key, future, exc.key)
+        except BaseException as exc:
+            with self._lock:
+                self._adopting.discard(key)
+            future.set_exception(exc)
+            raise
+        self._register_final(payload, future)
+        future.set_result(payload)
+        return payload
+
+    def _adopt(self, key: str, future: Future[bytes], target_key: str) -> bytes:
+        """Resolve a redirected URL with the result of its known target."""
+        with self._lock:
+            target = self._results[target_key]
+            self.coalesced += 1
+            self.fetched -= 1
+        try:
+            payload = target.result()
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        finally:
+            with self._lock:
+                self._adopting.discard(key)
+        future.set_result(payload)
+        return payload
+
+    def _register_final(self, payload: bytes, future: Future[bytes]) -> None:
+        """Let later URLs for the post-redirect target reuse this result."""
+        final_url = getattr(payload, "final_url", "")
+        if final_url:
+            with self._lock:
+                self._results.setdefault(canonical_url(final_url), future)
+
+    def summary(self) -> str:
+        """Return the fetch/coalesce counters for the run summary."""
+        return f"coalescing: {self.fetched} fetched, {self.coalesced} reused"
+
+
 def _fetch_payload(url: str, fetch: Fetch) -> tuple[bytes | None, str | None]:
     """Fetch URL payload or return error message."""
     try:
@@ -76,7 +1704,7 @@ def _fetch_payload(url: str, fetch: Fetch) -> tuple[bytes | None, str | None]:
     except (error.HTTPError, error.URLError) as exc:
         msg = f"Error: failed to fetch '{url}': {exc}"
         return None, msg
-    except FileNotFoundError as exc:
+    except (FileNotFoundError, ValueError) as exc:
         return None, str(exc)
 
 
@@ -92,13 +1720,43 @@ def _render_payload(
         return None, msg
 
 
+def _decode_text(payload: bytes) -> str:
+    """Decode a text payload using the charset from its Content-Type."""
+    charset = _payload_charset(_content_type(payload).encode("latin-1", "replace"))
+    return payload.decode(charset, errors="replace")
+
+
+def _pretty_json(payload: bytes) -> str:
+    """Return indented JSON, or the raw text when the body does not parse."""
+    text = _decode_text(payload)
+    try:
+        document = json.loads(text)
+    except ValueError:
+        return text
+    return json.dumps(document, indent=2, ensure_ascii=False) + "\n"
+
+
+def _render_by_kind(
+    url: str, payload: bytes, render: Render
+) -> tuple[str | None, str | None]:
+    """Pass text and JSON through, reject binaries and render HTML."""
+    kind = _payload_kind(payload)
+    if kind is ContentKind.BINARY:
+        return None, _unsupported_message(url, _content_type(payload))
+    if kind is ContentKind.JSON:
+        return _pretty_json(payload), None
+    if kind is ContentKind.TEXT:
+        return _decode_text(payload), None
+    return _render_payload(url, payload, render)
+
+
 def _browse_url(url: str, fetch: Fetch, render: Render) -> BrowseOutcome:
     """Fetch and render a URL, returning the outcome."""
     payload, fetch_error = _fetch_payload(url, fetch)
     if fetch_error:
         return BrowseOutcome(url, None, fetch_error)
     assert payload is not None
-    text, render_error = _render_payload(url, payload, render)
+    text, render_error = _render_by_kind(url, payload, render)
     if render_error:
         return BrowseOutcome(url, None, render_error)
     return BrowseOutcome(url, text, None)
@@ -124,9 +1782,650 @@ def browse_outcomes(
         yield _outcome_for_raw(raw, fetch, render)
 
 
-def ensure_dependencies() -> None:
+class _CappedBody:
+    """Iterate body chunks up to a byte cap, noting whether the body was cut."""
+
+    def __init__(self, chunks: Iterator[bytes], max_bytes: int) -> None:
+        """Initialize with the chunk source and the cap."""
+        self._chunks = chunks
+        self._remaining = max_bytes
+        self.truncated = False
+
+    def __iter__(self) -> Iterator[bytes]:
+        """Yield chunks, cutting the last one at the cap and closing the source."""
+        try:
+            for chunk in self._chunks:
+                if len(chunk) > self._remaining:
+                    self.truncated = True
+                    yield _retagged(chunk, chunk[: self._remaining])
+                    return
+                self._remaining -= len(chunk)
+                yield chunk
+        finally:
+            close = getattr(self._chunks, "close", None)
+            if close is not None:
+                close()
+
+
+def _retagged(original: bytes, data: bytes) -> bytes:
+    """Carry a payload's Content-Type and final URL over to a slice of it."""
+    if isinstance(original, Payload):
+        return Payload(data, original.content_type, original.final_url)
+    return data
+
+
+@dataclass(frozen=True)
+class StreamOptions:
+    """Fetch/render pair and byte cap used by the streaming mode."""
+
+    fetch_stream: FetchStream = _default_fetch_stream
+    render_stream: RenderStream = _lynx_render_stream
+    max_bytes: int = DEFAULT_MAX_BYTES
+
+
+def _open_stream(
+    url: str, body: _CappedBody
+) -> tuple[tuple[bytes, Iterator[bytes]] | None, str | None]:
+    """Pull the first chunk so fetch errors surface before any output."""
+    chunks = iter(body)
+    try:
+        first = next(chunks, b"")
+    except (error.HTTPError, error.URLError, IncompleteRead, OSError) as exc:
+        return None, f"Error: failed to fetch '{url}': {exc}"
+    except ValueError as exc:
+        return None, str(exc)
+    return (first, chunks), None
+
+
+def _text_render_stream(chunks: Iterable[bytes]) -> Iterator[str]:
+    """Yield the lines of a text body, decoding incrementally."""
+    iterator = iter(chunks)
+    first = next(iterator, b"")
+    charset = _payload_charset(_content_type(first).encode("latin-1", "replace"))
+    decoder = codecs.getincrementaldecoder(charset)(errors="replace")
+    pending = ""
+    for chunk in chain([first], iterator):
+        *lines, pending = (pending + decoder.decode(chunk)).split("\n")
+        yield from (line.rstrip("\r") for line in lines)
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+def _json_render_stream(chunks: Iterable[bytes]) -> Iterator[str]:
+    """Yield pretty-printed JSON lines once the (capped) body is complete."""
+    iterator = iter(chunks)
+    first = next(iterator, b"")
+    payload = Payload(b"".join(chain([first], iterator)), _content_type(first))
+    yield from _pretty_json(payload).splitlines()
+
+
+def _stream_renderer(first: bytes, html_stream: RenderStream) -> RenderStream | None:
+    """Return the stream renderer for a body's kind, or None for binaries."""
+    renderers: dict[ContentKind, RenderStream | None] = {
+        ContentKind.HTML: html_stream,
+        ContentKind.TEXT: _text_render_stream,
+        ContentKind.JSON: _json_render_stream,
+        ContentKind.BINARY: None,
+    }
+    return renderers[_payload_kind(first)]
+
+
+def _stream_lines(
+    url: str, chunks: Iterable[bytes], render_stream: RenderStream, stdout: TextIO
+) -> str | None:
+    """Write rendered lines as they arrive, or return an error message."""
+    try:
+        for line in render_stream(chunks):
+            print(line, file=stdout)
+    except subprocess.CalledProcessError as exc:
+        stderr = (exc.stderr or b"").decode("utf-8", errors="replace")
+        return f"Error: lynx failed while rendering '{url}': {stderr}"
+    except (OSError, HTTPException) as exc:
+        return f"Error: failed to fetch '{url}': {exc}"
+    return None
+
+
+def _stream_url(url: str, options: StreamOptions, stdout: TextIO) -> str | None:
+    """Fetch and render one URL straight through to stdout."""
+    body = _CappedBody(options.fetch_stream(url), options.max_bytes)
+    opened, fetch_error = _open_stream(url, body)
+    if opened is None:
+        return fetch_error
+    first, rest = opened
+    render_stream = _stream_renderer(first, options.render_stream)
+    if render_stream is None:
+        return _unsupported_message(url, _content_type(first))
+    print(f"URL: {url}", file=stdout)
+    chunks = chain([first], rest)
+    render_error = _stream_lines(url, chunks, render_stream, stdout)
+    if body.truncated:
+        print(f"[truncated after {options.max_bytes} bytes]", file=stdout)
+    print(file=stdout)
+    return render_error
+
+
+def _stream_raw(raw: str, options: StreamOptions, stdout: TextIO) -> str | None:
+    """Validate and stream a single raw input line."""
+    try:
+        url = _validate_url(raw)
+    except ValueError as exc:
+        return str(exc)
+    return _stream_url(url, options, stdout)
+
+
+def stream_browse(
+    stream: Iterable[str],
+    stdout: TextIO,
+    stderr: TextIO,
+    options: StreamOptions | None = None,
+) -> int:
+    """Stream each URL's rendered text to stdout and return the exit code."""
+    options = options if options is not None else StreamOptions()
+    exit_code = 0
+    for raw in _iter_clean_lines(stream):
+        stream_error = _stream_raw(raw, options, stdout)
+        if stream_error is not None:
+            print(stream_error, file=stderr)
+            exit_code = 1
+    return exit_code
+
+
+def _timeout_outcome(raw: str, url_timeout: float) -> BrowseOutcome:
+    """Return the outcome for a URL that exceeded its own budget."""
+    msg = f"Error: timed out after {url_timeout:g}s fetching '{raw}'"
+    return BrowseOutcome(raw, None, msg)
+
+
+def _deadline_outcome(raw: str, deadline: float) -> BrowseOutcome:
+    """Return the outcome for a URL cancelled by the global deadline."""
+    msg = f"Error: deadline of {deadline:g}s reached before '{raw}' finished"
+    return BrowseOutcome(raw, None, msg)
+
+
+def robots_crawl_delay(url: str, timeout: float = ROBOTS_TIMEOUT) -> float | None:
+    """Return the robots.txt Crawl-delay for a URL's origin, if one is set."""
+    parts = parse.urlsplit(url)
+    robots_url = f"{parts.scheme}://{parts.netloc}/robots.txt"
+    try:
+        with request.urlopen(robots_url, timeout=timeout) as response:  # nosec B310
+            text = response.read().decode("utf-8", errors="replace")
+    except (OSError, ValueError):
+        return None
+    parser = robotparser.RobotFileParser(robots_url)
+    parser.parse(text.splitlines())
+    delay = parser.crawl_delay("*")
+    return float(delay) if delay is not None else None
+
+
+@dataclass
+class _HostState:
+    """Concurrency gate and start spacing for one host."""
+
+    semaphore: asyncio.Semaphore
+    next_start: float = 0.0
+    delay: asyncio.Task[float] | None = None
+
+
+class HostScheduler:
+    """Per-host politeness: a concurrency limit and minimum start spacing.
+
+    URLs wait for their host's slot before taking a global slot, so a long
+    run of URLs on one host never holds back the other hosts in the list.
+    """
+
+    def __init__(
+        self,
+        per_host: int = DEFAULT_HOST_CONCURRENCY,
+        min_delay: float = 0.0,
+        crawl_delay: Callable[[str], float | None] | None = None,
+    ) -> None:
+        """Initialize limits; crawl_delay looks up a host's robots.txt delay."""
+        self._per_host = max(1, per_host)
+        self._min_delay = min_delay
+        self._crawl_delay = crawl_delay
+        self._hosts: dict[str, _HostState] = {}
+
+    def _host_state(self, host: str) -> _HostState:
+        """Return the state for a host, creating it on first use."""
+        if host not in self._hosts:
+            self._hosts[host] = _HostState(asyncio.Semaphore(self._per_host))
+        return self._hosts[host]
+
+    async def _host_delay(self, url: str, state: _HostState) -> float:
+        """Return the spacing for a host, looking up robots.txt once."""
+        if self._crawl_delay is None:
+            return self._min_delay
+        if state.delay is None:
+            state.delay = asyncio.create_task(self._robots_delay(url))
+        return await asyncio.shield(state.delay)
+
+    async def _robots_delay(self, url: str) -> float:
+        """Return the larger of the configured and robots.txt delays."""
+        assert self._crawl_delay is not None
+        robots = await asyncio.to_thread(self._crawl_delay, url)
+        return max(self._min_delay, robots or 0.0)
+
+    async def _wait_turn(self, url: str, state: _HostState) -> None:
+        """Sleep until the host's next permitted start and book the one after."""
+        delay = await self._host_delay(url, state)
+        now = asyncio.get_running_loop().time()
+        start = max(now, state.next_start)
+        state.next_start = start + delay
+        await asyncio.sleep(start - now)
+
+    @asynccontextmanager
+    async def slot(self, url: str) -> AsyncIterator[None]:
+        """Hold one of the host's slots, entered no sooner than its spacing allows."""
+        state = self._host_state((parse.urlsplit(url).netloc or "").lower())
+        async with state.semaphore:
+            await self._wait_turn(url, state)
+            yield
+
+
+_P = ParamSpec("_P")
+_T = TypeVar("_T")
+
+
+class _DaemonThreadExecutor(Executor):
+    """Executor that runs each call on its own daemon thread.
+
+    A fetch still blocked in ``urlopen`` after its budget or the deadline
+    neither holds a worker slot nor keeps the process alive at exit, as an
+    idle ``ThreadPoolExecutor`` worker would; concurrency is bounded by the
+    caller's semaphore.
+    """
+
+    def submit(
+        self, fn: Callable[_P, _T], /, *args: _P.args, **kwargs: _P.kwargs
+    ) -> Future[_T]:
+        """Start fn on a daemon thread and return its future."""
+        future: Future[_T] = Future()
+
+        def run() -> None:
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as exc:  # noqa: BLE001 - handed to the future
+                future.set_exception(exc)
+            else:
+                future.set_result(result)
+
+        threading.Thread(target=run, daemon=True).start()
+        return future
+
+
+@dataclass(frozen=True)
+class _AsyncRun:
+    """Shared state for one asyncio browse run."""
+
+    fetch: Fetch
+    render: Render
+    url_timeout: float
+    semaphore: asyncio.Semaphore
+    executor: Executor
+    scheduler: HostScheduler | None = None
+
+    def host_slot(self, raw: str) -> AbstractAsyncContextManager[None]:
+        """Return the politeness gate for a URL, or a no-op without a scheduler."""
+        if self.scheduler is None:
+            return nullcontext()
+        return self.scheduler.slot(raw)
+
+
+async def _bounded_outcome(raw: str, run: _AsyncRun) -> BrowseOutcome:
+    """Browse one URL in a worker thread within its per-URL budget."""
+    loop = asyncio.get_running_loop()
+    async with run.host_slot(raw), run.semaphore:
+        work = loop.run_in_executor(
+            run.executor, _outcome_for_raw, raw, run.fetch, run.render
+        )
+        try:
+            return await asyncio.wait_for(work, run.url_timeout)
+        except TimeoutError:
+            return _timeout_outcome(raw, run.url_timeout)
+
+
+async def _await_before(
+    task: asyncio.Task[BrowseOutcome], expires: float | None
+) -> BrowseOutcome | None:
+    """Wait for a task until the global expiry, or None if it did not finish."""
+    remaining = None
+    if expires is not None:
+        remaining = max(0.0, expires - asyncio.get_running_loop().time())
+    done, _ = await asyncio.wait({task}, timeout=remaining)
+    return task.result() if task in done else None
+
+
+async def browse_outcomes_async(
+    stream: Iterable[str],
+    *,
+    fetch: Fetch = _default_fetch,
+    render: Render = _default_render,
+    url_timeout: float = DEFAULT_TIMEOUT,
+    deadline: float | None = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    scheduler: HostScheduler | None = None,
+) -> AsyncIterator[BrowseOutcome]:
+    """Yield outcomes in input order, browsing URLs concurrently under a deadline."""
+    loop = asyncio.get_running_loop()
+    expires = None if deadline is None else loop.time() + deadline
+    executor = _DaemonThreadExecutor()
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    run = _AsyncRun(fetch, render, url_timeout, semaphore, executor, scheduler)
+    tasks = [
+        (raw, asyncio.create_task(_bounded_outcome(raw, run)))
+        for raw in _iter_clean_lines(stream)
+    ]
+    try:
+        for raw, task in tasks:
+            outcome = await _await_before(task, expires)
+            yield outcome or _deadline_outcome(raw, deadline or 0.0)
+    finally:
+        for _, task in tasks:
+            task.cancel()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+class _LinkParser(HTMLParser):
+    """HTML parser that collects absolute http(s) link targets."""
+
+    def __init__(self, base_url: str) -> None:
+        """Initialize with the URL the page was fetched from."""
+        super().__init__()
+        self._base_url = base_url
+        self.links: list[str] = []
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        attr_map = {key: value or "" for key, value in attrs}
+        if tag == "base" and attr_map.get("href"):
+            self._base_url = parse.urljoin(self._base_url, attr_map["href"])
+        elif tag == "a" and attr_map.get("href"):
+            link = parse.urljoin(self._base_url, attr_map["href"].strip())
+            if parse.urlsplit(link).scheme in URL_SCHEMES:
+                self.links.append(link)
+
+
+def extract_links(payload: bytes, base_url: str) -> list[str]:
+    """Return the http(s) links of an already fetched HTML payload."""
+    parser = _LinkParser(base_url)
+    parser.feed(payload.decode(_payload_charset(payload), errors="replace"))
+    parser.close()
+    return parser.links
+
+
+class BloomFilter:
+    """Fixed-size probabilistic set: no false negatives, bounded false positives."""
+
+    def __init__(self, capacity: int, error_rate: float = BLOOM_ERROR_RATE) -> None:
+        """Size the bit array for the expected item count and error rate."""
+        bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self._size = max(8, bits)
+        self._hashes = max(1, round(self._size / max(1, capacity) * math.log(2)))
+        self._bits = bytearray((self._size + 7) // 8)
+
+    def _positions(self, item: str) -> Iterator[int]:
+        """Yield bit positions for an item using double hashing."""
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        step = int.from_bytes(digest[8:], "little") | 1
+        return ((first + index * step) % self._size for index in range(self._hashes))
+
+    def add(self, item: str) -> None:
+        """Record an item."""
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: object) -> bool:
+        """Return True if the item was probably added, False if it never was."""
+        if not isinstance(item, str):
+            return False
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+
+def _seen_set(max_pages: int) -> set[str] | BloomFilter:
+    """Return an exact seen-set for small crawls and a Bloom filter for large ones."""
+    if max_pages < BLOOM_MIN_PAGES:
+        return set()
+    return BloomFilter(max_pages * BLOOM_LINKS_PER_PAGE)
+
+
+def _site(url: str) -> str:
+    """Return the host a URL belongs to, ignoring case and a leading www."""
+    host = (parse.urlsplit(url).hostname or "").lower()
+    return host.removeprefix("www.")
+
+
+@dataclass(frozen=True)
+class CrawlLimits:
+    """Bounds for a same-site crawl."""
+
+    max_depth: int = DEFAULT_CRAWL_DEPTH
+    max_pages: int = DEFAULT_CRAWL_PAGES
+
+
+class _Frontier:
+    """Breadth-first queue of (url, depth) restricted to the seed sites."""
+
+    def __init__(self, seeds: Iterable[str], limits: CrawlLimits) -> None:
+        """Queue the seeds at depth 0."""
+        self._limits = limits
+        self._queue: deque[tuple[str, int]] = deque()
+        self._seen = _seen_set(limits.max_pages)
+        self._sites: set[str] = set()
+        self._started = 0
+        for seed in seeds:
+            self._sites.add(_site(seed))
+            self._offer(seed, 0)
+
+    def _offer(self, url: str, depth: int) -> None:
+        """Queue a URL unless it is too deep, off-site or already seen."""
+        key = canonical_url(url)
+        if depth > self._limits.max_depth or key in self._seen:
+            return
+        if _site(url) not in self._sites:
+            return
+        self._seen.add(key)
+        self._queue.append((url, depth))
+
+    def extend(self, links: Iterable[str], depth: int) -> None:
+        """Queue the links found on a page at the given depth."""
+        for link in links:
+            self._offer(link, depth)
+
+    def pop(self) -> tuple[str, int] | None:
+        """Return the next URL to fetch, or None when empty or at the page limit."""
+        if not self._queue or self._started >= self._limits.max_pages:
+            return None
+        self._started += 1
+        return self._queue.popleft()
+
+
+@dataclass(frozen=True)
+class _CrawlResult:
+    """A crawled page's outcome and the links found on it."""
+
+    outcome: BrowseOutcome
+    depth: int
+    links: tuple[str, ...]
+
+
+def _crawl_page(url: str, depth: int, fetch: Fetch, render: Render) -> _CrawlResult:
+    """Fetch and render one page, extracting links from the same payload."""
+    payload, fetch_error = _fetch_payload(url, fetch)
+    if payload is None:
+        return _CrawlResult(BrowseOutcome(url, None, fetch_error), depth, ())
+    text, render_error = _render_by_kind(url, payload, render)
+    links: tuple[str, ...] = ()
+    if _payload_kind(payload) is ContentKind.HTML:
+        base_url = getattr(payload, "final_url", "") or url
+        links = tuple(extract_links(payload, base_url))
+    return _CrawlResult(BrowseOutcome(url, text, render_error), depth, links)
+
+
+async def _crawl_task(url: str, depth: int, run: _AsyncRun) -> _CrawlResult:
+    """Crawl one page in a worker thread within its per-URL budget."""
+    loop = asyncio.get_running_loop()
+    async with run.host_slot(url), run.semaphore:
+        work = loop.run_in_executor(
+            run.executor, _crawl_page, url, depth, run.fetch, run.render
+        )
+        try:
+            return await asyncio.wait_for(work, run.url_timeout)
+        except TimeoutError:
+            return _CrawlResult(_timeout_outcome(url, run.url_timeout), depth, ())
+
+
+def _valid_seeds(stream: Iterable[str], invalid: list[BrowseOutcome]) -> Iterator[str]:
+    """Yield valid seed URLs, collecting outcomes for the invalid ones."""
+    for raw in _iter_clean_lines(stream):
+        try:
+            yield _validate_url(raw)
+        except ValueError as exc:
+            invalid.append(BrowseOutcome(raw, None, str(exc)))
+
+
+async def crawl_outcomes_async(
+    stream: Iterable[str],
+    *,
+    fetch: Fetch = _default_fetch,
+    render: Render = _default_render,
+    limits: CrawlLimits | None = None,
+    url_timeout: float = DEFAULT_TIMEOUT,
+    deadline: float | None = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    scheduler: HostScheduler | None = None,
+) -> AsyncIterator[BrowseOutcome]:
+    """Yield outcomes for the seed pages and same-site pages they link to.
+
+    At the deadline, pages still in flight are reported as unfinished and
+    queued pages are not started.
+    """
+    loop = asyncio.get_running_loop()
+    expires = None if deadline is None else loop.time() + deadline
+    invalid: list[BrowseOutcome] = []
+    limits = limits if limits is not None else CrawlLimits()
+    frontier = _Frontier(_valid_seeds(stream, invalid), limits)
+    for outcome in invalid:
+        yield outcome
+    workers = max(1, concurrency)
+    executor = _DaemonThreadExecutor()
+    semaphore = asyncio.Semaphore(workers)
+    run = _AsyncRun(fetch, render, url_timeout, semaphore, executor, scheduler)
+    pending: dict[asyncio.Task[_CrawlResult], str] = {}
+    try:
+        while True:
+            while len(pending) < workers and (item := frontier.pop()) is not None:
+                pending[asyncio.create_task(_crawl_task(*item, run))] = item[0]
+            if not pending:
+                return
+            remaining = None if expires is None else max(0.0, expires - loop.time())
+            done, _ = await asyncio.wait(
+                pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                for url in pending.values():
+                    yield _deadline_outcome(url, deadline or 0.0)
+                return
+            for task in done:
+                del pending[task]
+                result = task.result()
+                frontier.extend(result.links, result.depth + 1)
+                yield result.outcome
+    finally:
+        for task in pending:
+            task.cancel()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _text_digest(text: str) -> str:
+    """Return the SHA-256 hex digest of rendered text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class WatchState:
+    """Digest of the last reported text, and the current error, per watched URL."""
+
+    keep_text: bool = False
+    digests: dict[str, str] = field(default_factory=dict)
+    texts: dict[str, str] = field(default_factory=dict)
+    errors: dict[str, str] = field(default_factory=dict)
+
+    def changed(self, outcome: BrowseOutcome) -> BrowseOutcome | None:
+        """Return the outcome to report, or None when nothing changed.
+
+        Errors are reported when they first occur or change; a page that
+        recovers is compared with the text reported before the error. With
+        ``keep_text`` a changed page is reported as a unified diff against
+        the previous text; the first sighting is reported in full.
+        """
+        if outcome.is_error:
+            error = outcome.error or ""
+            if self.errors.get(outcome.url) == error:
+                return None
+            self.errors[outcome.url] = error
+            return outcome
+        self.errors.pop(outcome.url, None)
+        new_text = outcome.output or ""
+        digest = _text_digest(new_text)
+        if self.digests.get(outcome.url) == digest:
+            return None
+        self.digests[outcome.url] = digest
+        if not self.keep_text:
+            return outcome
+        old_text = self.texts.get(outcome.url)
+        self.texts[outcome.url] = new_text
+        if old_text is None:
+            return outcome
+        return replace(outcome, output=_unified_diff(outcome.url, old_text, new_text))
+
+
+def _unified_diff(url: str, old_text: str, new_text: str) -> str:
+    """Return a unified diff between two renderings of a page."""
+    lines = difflib.unified_diff(
+        old_text.splitlines(keepends=True),
+        new_text.splitlines(keepends=True),
+        fromfile=f"{url} (before)",
+        tofile=f"{url} (after)",
+    )
+    return "".join(line if line.endswith("\n") else f"{line}\n" for line in lines)
+
+
+def watch_outcomes(
+    urls: Sequence[str],
+    *,
+    fetch_factory: Callable[[], Fetch],
+    render: Render = _default_render,
+    interval: float,
+    cycles: int | None = None,
+    diff: bool = False,
+    sleep: Callable[[float], None] = time.sleep,
+) -> Iterator[BrowseOutcome]:
+    """Re-browse URLs every interval, yielding only pages whose text changed.
+
+    ``fetch_factory`` is called once per cycle so in-run coalescing never
+    serves a previous cycle's payload.
+    """
+    state = WatchState(keep_text=diff)
+    for cycle in count() if cycles is None else range(cycles):
+        started = time.monotonic()
+        fetch = fetch_factory()
+        for outcome in browse_outcomes(urls, fetch=fetch, render=render):
+            reported = state.changed(outcome)
+            if reported is not None:
+                yield reported
+        if cycles is None or cycle + 1 < cycles:
+            sleep(max(0.0, interval - (time.monotonic() - started)))
+
+
+def ensure_dependencies(binaries: Iterable[str] = ("lynx",)) -> None:
     """Verify required external binaries are available."""
-    for binary in ("lynx",):
+    for binary in binaries:
         if shutil.which(binary) is None:
             msg = f"Required dependency '{binary}' not found in PATH"
             raise FileNotFoundError(msg)
@@ -145,18 +2444,453 @@ def _write_outcome(outcome: BrowseOutcome, stdout: TextIO, stderr: TextIO) -> in
     return 0
 
 
+def _parse_args(argv: Sequence[str]) -> argparse.Namespace:
+    """Parse command-line options."""
+    parser = argparse.ArgumentParser(description="Render stdin URLs as plain text.")
+    parser.add_argument(
+        "--renderer",
+        choices=sorted(RENDERERS),
+        default="lynx",
+        help="HTML renderer: external lynx or the in-process builtin (default: lynx)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        help="cache responses here and revalidate them with conditional requests",
+    )
+    parser.add_argument(
+        "--cache-max-bytes",
+        type=int,
+        default=DEFAULT_CACHE_MAX_BYTES,
+        help="evict least recently used responses beyond this total size",
+    )
+    parser.add_argument(
+        "--render-cache-entries",
+        type=int,
+        default=DEFAULT_RENDER_CACHE_ENTRIES,
+        help="rendered pages kept for identical payloads (0 disables reuse)",
+    )
+    parser.add_argument(
+        "--render-workers",
+        type=int,
+        nargs="?",
+        const=0,
+        metavar="N",
+        help="render in N long-lived worker processes (default N: CPU count), "
+        "fetching further URLs while earlier pages render",
+    )
+    parser.add_argument(
+        "--condensed",
+        action="store_true",
+        help="render only the main content, without navigation or duplicate links",
+    )
+    parser.add_argument(
+        "--budget-bytes",
+        type=int,
+        help="condensed output cap per page in bytes (implies --condensed)",
+    )
+    parser.add_argument(
+        "--budget-lines",
+        type=int,
+        help="condensed output cap per page in lines (implies --condensed)",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="pipe each body into the renderer in chunks and print lines as they come",
+    )
+    parser.add_argument(
+        "--max-bytes",
+        type=int,
+        default=DEFAULT_MAX_BYTES,
+        help="truncate streamed bodies beyond this many bytes",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="spool streamed bodies to disk and resume failed transfers (implies "
+        "--stream)",
+    )
+    parser.add_argument(
+        "--resume-attempts",
+        type=int,
+        default=DEFAULT_RESUME_ATTEMPTS,
+        help="download attempts per URL with --resume",
+    )
+    parser.add_argument(
+        "--url-timeout",
+        type=float,
+        default=DEFAULT_TIMEOUT,
+        help="seconds allowed for each URL (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        help="seconds for the whole run; unfinished URLs are reported as timeouts",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="URLs browsed at once; above 1 (or with --deadline) uses asyncio",
+    )
+    parser.add_argument(
+        "--per-host",
+        type=int,
+        default=DEFAULT_HOST_CONCURRENCY,
+        help="concurrent requests allowed per host (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--host-delay",
+        type=float,
+        default=0.0,
+        help="minimum seconds between request starts on the same host",
+    )
+    parser.add_argument(
+        "--crawl-delay",
+        action="store_true",
+        help="also honour each host's robots.txt Crawl-delay",
+    )
+    parser.add_argument(
+        "--no-coalesce",
+        action="store_true",
+        help="fetch every input URL even when it names an already fetched page",
+    )
+    parser.add_argument(
+        "--archive",
+        type=Path,
+        help="append every fetched response to this WARC-style .warc.gz archive",
+    )
+    parser.add_argument(
+        "--replay",
+        type=Path,
+        help="serve responses from an archive written by --archive; no network",
+    )
+    parser.add_argument(
+        "--crawl",
+        action="store_true",
+        help="also browse same-site pages linked from the input URLs",
+    )
+    parser.add_argument(
+        "--depth",
+        type=int,
+        default=DEFAULT_CRAWL_DEPTH,
+        help="link levels followed from each input URL when crawling",
+    )
+    parser.add_argument(
+        "--max-pages",
+        type=int,
+        default=DEFAULT_CRAWL_PAGES,
+        help="pages fetched in total when crawling",
+    )
+    parser.add_argument(
+        "--watch",
+        type=float,
+        metavar="SECONDS",
+        help="re-fetch the URLs on this interval and print only pages that changed",
+    )
+    parser.add_argument(
+        "--cycles",
+        type=int,
+        help="stop watching after this many cycles (default: run until interrupted)",
+    )
+    parser.add_argument(
+        "--diff",
+        action="store_true",
+        help="print changed pages in watch mode as a unified diff",
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="print a run summary to stderr when done",
+    )
+    args = parser.parse_args(argv)
+    if args.stream or args.resume:
+        mode = "--resume" if args.resume else "--stream"
+        _reject_ignored(parser, args, mode, _STREAM_IGNORES)
+    if args.watch is not None:
+        _reject_ignored(parser, args, "--watch", _WATCH_IGNORES)
+    return args
+
+
+# Options the streaming path bypasses: it pipes each body straight to stdout.
+_STREAM_IGNORES = (
+    "--cache-dir",
+    "--cache-max-bytes",
+    "--render-cache-entries",
+    "--render-workers",
+    "--condensed",
+    "--budget-bytes",
+    "--budget-lines",
+    "--deadline",
+    "--concurrency",
+    "--per-host",
+    "--host-delay",
+    "--crawl-delay",
+    "--archive",
+    "--replay",
+    "--crawl",
+    "--watch",
+    "--stats",
+)
+
+
+# Options the watch loop has no use for; it fetches sequentially through a cache.
+_WATCH_IGNORES = (
+    "--crawl",
+    "--concurrency",
+    "--per-host",
+    "--deadline",
+    "--host-delay",
+    "--crawl-delay",
+    "--archive",
+    "--replay",
+)
+
+
+def _reject_ignored(
+    parser: argparse.ArgumentParser,
+    args: argparse.Namespace,
+    mode: str,
+    flags: Iterable[str],
+) -> None:
+    """Exit with a usage error when options a mode would ignore are given."""
+    dests = {flag: flag.removeprefix("--").replace("-", "_") for flag in flags}
+    ignored = [
+        flag
+        for flag, dest in dests.items()
+        if getattr(args, dest) != parser.get_default(dest)
+    ]
+    if ignored:
+        parser.error(f"{mode} cannot be combined with {', '.join(ignored)}")
+
+
+def _fetch_for_args(args: argparse.Namespace) -> Fetch:
+    """Return the fetch implementation selected by the command-line options."""
+    if args.replay is not None:
+        return ArchiveFetch(args.replay)
+    fetch: Fetch | None = None
+    if args.cache_dir is not None:
+        cache = HttpCache(args.cache_dir, args.cache_max_bytes)
+        fetch = CachingFetch(cache, timeout=args.url_timeout)
+    if args.archive is not None:
+        network = fetch or partial(_default_fetch, timeout=args.url_timeout)
+        fetch = ArchivingFetch(ArchiveWriter(args.archive), network)
+    if fetch is None:
+        if args.no_coalesce:
+            return partial(_default_fetch, timeout=args.url_timeout)
+        return CoalescingFetch(timeout=args.url_timeout)
+    return fetch if args.no_coalesce else CoalescingFetch(fetch)
+
+
+def _watch_fetch_factory(
+    args: argparse.Namespace, cache_root: Path
+) -> Callable[[], Fetch]:
+    """Return a per-cycle fetch factory that revalidates through an HTTP cache."""
+    cache = HttpCache(args.cache_dir or cache_root, args.cache_max_bytes)
+    caching_fetch = CachingFetch(cache, timeout=args.url_timeout)
+    if args.no_coalesce:
+        return lambda: caching_fetch
+    return lambda: CoalescingFetch(caching_fetch)
+
+
+def _render_pool_for_args(args: argparse.Namespace) -> RenderPool | None:
+    """Return a render worker pool when one is requested."""
+    if args.render_workers is None:
+        return None
+    return RenderPool(args.renderer, args.render_workers)
+
+
+def _render_for_args(
+    args: argparse.Namespace, pool: RenderPool | None = None
+) -> RenderCache:
+    """Return the selected renderer wrapped in a content-hash render cache."""
+    render: Render = pool if pool is not None else RENDERERS[args.renderer]
+    identity = f"{args.renderer}:width={DUMP_WIDTH}"
+    budget = OutputBudget(args.budget_bytes, args.budget_lines)
+    if args.condensed or budget != OutputBudget():
+        render = CondensedRender(render, budget)
+        identity += f":condensed:bytes={budget.max_bytes}:lines={budget.max_lines}"
+    return RenderCache(render, identity, args.render_cache_entries)
+
+
+def _stream_options(args: argparse.Namespace) -> StreamOptions:
+    """Return the streaming configuration selected by the command-line options."""
+    options = StreamOptions(
+        fetch_stream=partial(_default_fetch_stream, timeout=args.url_timeout),
+        render_stream=RENDER_STREAMS[args.renderer],
+        max_bytes=args.max_bytes,
+    )
+    if not args.resume:
+        return options
+    fetch_stream = ResumableFetchStream(
+        timeout=args.url_timeout,
+        attempts=args.resume_attempts,
+        max_bytes=args.max_bytes,
+    )
+    return replace(options, fetch_stream=fetch_stream)
+
+
+def _concurrency_for_args(
+    args: argparse.Namespace, pool: RenderPool | None = None
+) -> int:
+    """Return the URLs in flight: enough to keep every render worker busy."""
+    return max(1, args.concurrency, pool.workers if pool is not None else 0)
+
+
+def _uses_async_engine(args: argparse.Namespace, concurrency: int) -> bool:
+    """Return True when concurrency, a deadline or host spacing is requested."""
+    return (
+        concurrency > 1
+        or args.deadline is not None
+        or args.host_delay > 0
+        or args.crawl_delay
+    )
+
+
+def _scheduler_for_args(args: argparse.Namespace) -> HostScheduler:
+    """Return the per-host politeness scheduler selected by the options."""
+    crawl_delay = robots_crawl_delay if args.crawl_delay else None
+    return HostScheduler(args.per_host, args.host_delay, crawl_delay)
+
+
+async def _write_crawl_outcomes(
+    stdin: Iterable[str],
+    args: argparse.Namespace,
+    engine: tuple[Fetch, Render],
+    streams: tuple[TextIO, TextIO],
+    concurrency: int,
+) -> int:
+    """Write crawl outcomes as pages complete."""
+    fetch, render = engine
+    exit_code = 0
+    async for outcome in crawl_outcomes_async(
+        stdin,
+        fetch=fetch,
+        render=render,
+        limits=CrawlLimits(args.depth, args.max_pages),
+        url_timeout=args.url_timeout,
+        deadline=args.deadline,
+        concurrency=concurrency,
+        scheduler=_scheduler_for_args(args),
+    ):
+        exit_code = max(exit_code, _write_outcome(outcome, *streams))
+    return exit_code
+
+
+async def _write_async_outcomes(
+    stdin: Iterable[str],
+    args: argparse.Namespace,
+    engine: tuple[Fetch, Render],
+    streams: tuple[TextIO, TextIO],
+    concurrency: int,
+) -> int:
+    """Write outcomes from the asyncio engine as they complete in order."""
+    fetch, render = engine
+    exit_code = 0
+    async for outcome in browse_outcomes_async(
+        stdin,
+        fetch=fetch,
+        render=render,
+        url_timeout=args.url_timeout,
+        deadline=args.deadline,
+        concurrency=concurrency,
+        scheduler=_scheduler_for_args(args),
+    ):
+        exit_code = max(exit_code, _write_outcome(outcome, *streams))
+    return exit_code
+
+
+def _write_sync_outcomes(
+    stdin: Iterable[str],
+    engine: tuple[Fetch, Render],
+    streams: tuple[TextIO, TextIO],
+) -> int:
+    """Write outcomes from the sequential engine."""
+    fetch, render = engine
+    exit_code = 0
+    for outcome in browse_outcomes(stdin, fetch=fetch, render=render):
+        exit_code = max(exit_code, _write_outcome(outcome, *streams))
+    return exit_code
+
+
+def _write_watch_outcomes(
+    stdin: Iterable[str],
+    args: argparse.Namespace,
+    render: Render,
+    streams: tuple[TextIO, TextIO],
+) -> int:
+    """Write changed pages each watch cycle, using a scratch cache if needed."""
+    urls = list(_iter_clean_lines(stdin))
+    exit_code = 0
+    with tempfile.TemporaryDirectory(prefix="browse-watch-") as scratch:
+        outcomes = watch_outcomes(
+            urls,
+            fetch_factory=_watch_fetch_factory(args, Path(scratch)),
+            render=render,
+            interval=args.watch,
+            cycles=args.cycles,
+            diff=args.diff,
+        )
+        for outcome in outcomes:
+            exit_code = max(exit_code, _write_outcome(outcome, *streams))
+            for stream in streams:
+                stream.flush()
+    return exit_code
+
+
+def _write_summary(components: Iterable[object], stderr: TextIO) -> None:
+    """Write the run summary line of each component that keeps counters."""
+    for component in components:
+        summary = getattr(component, "summary", None)
+        if summary is not None:
+            print(summary(), file=stderr)
+
+
+def _run_engine(
+    stdin: Iterable[str],
+    args: argparse.Namespace,
+    render: Render,
+    streams: tuple[TextIO, TextIO],
+    pool: RenderPool | None = None,
+) -> tuple[int, tuple[object, ...]]:
+    """Run the selected browse engine; return its exit code and components."""
+    if args.watch is not None:
+        return _write_watch_outcomes(stdin, args, render, streams), (render,)
+    engine = (_fetch_for_args(args), render)
+    concurrency = _concurrency_for_args(args, pool)
+    if args.crawl:
+        exit_code = asyncio.run(
+            _write_crawl_outcomes(stdin, args, engine, streams, concurrency)
+        )
+    elif _uses_async_engine(args, concurrency):
+        exit_code = asyncio.run(
+            _write_async_outcomes(stdin, args, engine, streams, concurrency)
+        )
+    else:
+        exit_code = _write_sync_outcomes(stdin, engine, streams)
+    return exit_code, engine
+
+
 def main(
     stdin: Iterable[str] = sys.stdin,
     stdout: TextIO = sys.stdout,
     stderr: TextIO = sys.stderr,
+    argv: Sequence[str] = (),
 ) -> int:
-    """Render stdin URLs to plain text via lynx."""
-    ensure_dependencies()
-    exit_code = 0
-    for outcome in browse_outcomes(stdin):
-        exit_code = max(exit_code, _write_outcome(outcome, stdout, stderr))
+    """Render stdin URLs to plain text via lynx or the builtin renderer."""
+    args = _parse_args(argv)
+    ensure_dependencies(RENDERER_BINARIES[args.renderer])
+    if args.stream or args.resume:
+        return stream_browse(stdin, stdout, stderr, _stream_options(args))
+    pool = _render_pool_for_args(args)
+    with pool if pool is not None else nullcontext():
+        render = _render_for_args(args, pool)
+        exit_code, components = _run_engine(stdin, args, render, (stdout, stderr), pool)
+    if args.stats:
+        _write_summary([*components, pool], stderr)
     return exit_code
 
 
 if __name__ == "__main__":
-    sys.exit(main())
+    sys.exit(main(argv=sys.argv[1:]))
@@ -6,16 +6,48 @@
 #   "pydantic",
 #   "defusedxml",
 #   "tenacity",
+#   "numpy",
 # ]
 # ///
 from __future__ import annotations
-from dataclasses import dataclass, asdict
-from typing import Iterable, TypedDict
+from dataclasses import dataclass, asdict, field
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Collection,
+    Iterable,
+    Iterator,
+    Mapping,
+    Protocol,
+    TypedDict,
+)
 from datetime import date
 from collections import Counter
-from statistics import mean, stdev
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from statistics import median
 from itertools import groupby
+from operator import attrgetter
 from enum import StrEnum
+import asyncio
+import hashlib
+import heapq
+import io
+import json
+import math
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+from xml.etree.ElementTree import Element
+
+import numpy as np
+from numpy.typing import NDArray
+from defusedxml.ElementTree import iterparse  # type: ignore[import-untyped]
 
 
 class WeatherCode(StrEnum):
@@ -146,12 +178,34 @@ def map_bom_text(text: str) -> WeatherCode:
     return WeatherCode.UNKNOWN
 
 
+# Scales the median absolute deviation to a normal standard deviation.
+MAD_TO_SIGMA = 1.4826
+
+
+class RobustEstimator(StrEnum):
+    """How temperatures are averaged once enough sources report.
+
+    ``SIGMA_CLIP`` drops values beyond ``sigma_threshold`` deviations,
+    ``MEDIAN_MAD`` keeps values within ``mad_threshold`` scaled MADs of the
+    median, and ``TRIMMED_MEAN`` drops ``trim_fraction`` from each end,
+    rounded up but always leaving one value. Below ``min_count_for_outlier``
+    sources every estimator returns the plain mean.
+    """
+
+    SIGMA_CLIP = "sigma_clip"
+    MEDIAN_MAD = "median_mad"
+    TRIMMED_MEAN = "trimmed_mean"
+
+
 @dataclass(frozen=True)
 class ConsensusPolicy:
     """Configuration for statistical aggregation and filtering."""
 
     sigma_threshold: float = 1.5
     min_count_for_outlier: int = 3
+    estimator: RobustEstimator = RobustEstimator.SIGMA_CLIP
+    mad_threshold: float = 3.0
+    trim_fraction: float = 0.2
     prognosis_ranking: tuple[WeatherCode, ...] = (
         WeatherCode.STORM,
         WeatherCode.SNOW,
@@ -160,6 +214,13 @@ class ConsensusPolicy:
         WeatherCode.CLEAR,
     )
 
+    def __post_init__(self) -> None:
+        """Reject a trim that would leave no values."""
+        if not 0 <= self.trim_fraction < 0.5:
+            raise ValueError(
+                f"trim_fraction must be in [0, 0.5), got {self.trim_fraction}"
+            )
+
 
 def _prognosis_ranking(policy: ConsensusPolicy | None) -> tuple[WeatherCode, ...]:
     """Return the configured or default prognosis severity ranking."""
@@ -193,48 +254,67 @@ def _group_by_date(data: Iterable[DailyData]) -> dict[str, tuple[DailyData, ...]
     return {str(k): tuple(g) for k, g in groupby(sorted_data, key=lambda x: x.date)}
 
 
-def _calculate_mean_with_filter(
-    values: tuple[float, ...], mu: float, sigma: float, threshold: float
+def _welford(vals: Iterable[float]) -> tuple[int, float, float]:
+    """Return the count, mean and sum of squared deviations in one pass."""
+    count, mu, m2 = 0, 0.0, 0.0
+    for count, v in enumerate(vals, start=1):
+        delta = v - mu
+        mu += delta / count
+        m2 += delta * (v - mu)
+    return count, mu, m2
+
+
+def _sigma_clip(
+    vals: Iterable[float], base: float, m2: float, count: int, policy: ConsensusPolicy
 ) -> float:
-    """Calculate mean of values within sigma threshold."""
-    filtered = tuple(v for v in values if abs(v - mu) <= threshold * sigma)
-    return mean(filtered) if filtered else mu
+    """Return the mean of values within sigma_threshold sigma of base."""
+    if count < policy.min_count_for_outlier or m2 <= 0:
+        return base
+    bound = policy.sigma_threshold * math.sqrt(m2 / (count - 1))
+    kept = [v for v in vals if abs(v - base) <= bound]
+    return math.fsum(kept) / len(kept) if kept else base
 
 
-def _mean_or_none(vals: tuple[float, ...]) -> float | None:
-    """Return mean of values, or None if empty."""
-    return mean(vals) if vals else None
+def _sigma_clipped_mean(vals: tuple[float, ...], policy: ConsensusPolicy) -> float:
+    """Mean with values beyond sigma_threshold standard deviations removed."""
+    count, base, m2 = _welford(vals)
+    return _sigma_clip(vals, base, m2, count, policy)
 
 
-def _skip_outlier_filter(
-    vals: tuple[float, ...], base: float | None, policy: ConsensusPolicy
-) -> bool:
-    """Return True if outlier filtering should be skipped."""
-    return base is None or len(vals) < policy.min_count_for_outlier
+def _median_mad_mean(vals: tuple[float, ...], policy: ConsensusPolicy) -> float:
+    """Mean of values within mad_threshold scaled MADs of the median."""
+    if len(vals) < policy.min_count_for_outlier:
+        return math.fsum(vals) / len(vals)
+    mid = median(vals)
+    bound = policy.mad_threshold * MAD_TO_SIGMA * median(abs(v - mid) for v in vals)
+    kept = [v for v in vals if abs(v - mid) <= bound]
+    return math.fsum(kept) / len(kept) if kept else mid
 
 
-def _filtered_or_base(
-    vals: tuple[float, ...], base: float | None, policy: ConsensusPolicy
-) -> float | None:
-    """Apply outlier filtering if variance exists, else return base mean."""
-    if base is None:
-        return None
-    if (sigma := stdev(vals)) == 0:
-        return base
-    return _calculate_mean_with_filter(vals, base, sigma, policy.sigma_threshold)
+def _trimmed_mean(vals: tuple[float, ...], policy: ConsensusPolicy) -> float:
+    """Mean after dropping trim_fraction (rounded up) of the values from each end."""
+    cut = (
+        min(math.ceil(len(vals) * policy.trim_fraction), (len(vals) - 1) // 2)
+        if len(vals) >= policy.min_count_for_outlier
+        else 0
+    )
+    kept = sorted(vals)[cut : len(vals) - cut]
+    return math.fsum(kept) / len(kept)
+
+
+_ESTIMATORS = {
+    RobustEstimator.SIGMA_CLIP: _sigma_clipped_mean,
+    RobustEstimator.MEDIAN_MAD: _median_mad_mean,
+    RobustEstimator.TRIMMED_MEAN: _trimmed_mean,
+}
 
 
 def _compute_robust_mean(
     values: Iterable[float], policy: ConsensusPolicy
 ) -> float | None:
-    """Compute mean excluding outliers > 1.5 sigma if count sufficient."""
+    """Compute the policy's robust mean, or None when there are no values."""
     vals = tuple(values)
-    base = _mean_or_none(vals)
-    return (
-        base
-        if _skip_outlier_filter(vals, base, policy)
-        else _filtered_or_base(vals, base, policy)
-    )
+    return _ESTIMATORS[policy.estimator](vals, policy) if vals else None
 
 
 def _compute_wind_range(
@@ -258,18 +338,24 @@ def _max_count_candidates(counts: Counter[WeatherCode]) -> tuple[WeatherCode, ..
     return tuple(p for p, c in counts.items() if c == max_count)
 
 
-def _compute_prognosis(
-    records: Iterable[DailyData], policy: ConsensusPolicy
+def _prognosis_from_counts(
+    counts: Counter[WeatherCode], policy: ConsensusPolicy
 ) -> WeatherCode | None:
-    """Compute prognosis mode with severity tie-breaking."""
-    prognoses = (r.prognosis for r in records if r.prognosis is not None)
-    counts = Counter(prognoses)
+    """Return the prognosis mode with severity tie-breaking, or None."""
     if not counts:
         return None
     candidates = _max_count_candidates(counts)
     return candidates[0] if len(candidates) == 1 else pick_worst(candidates, policy)
 
 
+def _compute_prognosis(
+    records: Iterable[DailyData], policy: ConsensusPolicy
+) -> WeatherCode | None:
+    """Compute prognosis mode with severity tie-breaking."""
+    prognoses = (r.prognosis for r in records if r.prognosis is not None)
+    return _prognosis_from_counts(Counter(prognoses), policy)
+
+
 def _compute_rain_prob(records: Iterable[DailyData]) -> float | None:
     """Compute max rain probability across records."""
     probs = (r.rain_prob for r in records if r.rain_prob is not None)
@@ -393,13 +479,1165 @@ def _consensus_iter(
             yield cf
 
 
+class ConsensusEngine(StrEnum):
+    """Implementation used to compute consensus forecasts.
+
+    Both produce the same forecasts; ``COLUMNAR`` vectorizes each window over
+    NumPy arrays, so its means can differ from ``statistics.mean`` only by
+    floating-point rounding.
+    """
+
+    PYTHON = "python"
+    COLUMNAR = "columnar"
+
+
+_NUMERIC_FIELDS = ("min_temp", "max_temp", "min_wind", "max_wind", "rain_prob")
+_MIN_TEMP, _MAX_TEMP, _MIN_WIND, _MAX_WIND, _RAIN_PROB = range(len(_NUMERIC_FIELDS))
+
+
+@dataclass(frozen=True)
+class _Columns:
+    """DailyData packed as dates x sources x fields arrays (NaN / -1 if missing)."""
+
+    dates: tuple[date, ...]
+    records: tuple[tuple[DailyData, ...], ...]
+    values: NDArray[np.float64]
+    directions: tuple[str, ...]
+    direction_codes: NDArray[np.intp]
+    prognoses: tuple[WeatherCode, ...]
+    prognosis_codes: NDArray[np.intp]
+    valid: NDArray[np.bool_]
+
+
+def _category_codes(
+    flat: list[DailyData], categories: tuple[str, ...], field: str
+) -> NDArray[np.intp]:
+    """Return the category index of a field per record, -1 if missing."""
+    index: dict[str | None, int] = {c: i for i, c in enumerate(categories)}
+    codes = (index.get(getattr(r, field), -1) for r in flat)
+    return np.fromiter(codes, dtype=np.intp, count=len(flat))
+
+
+def _numeric_values(flat: list[DailyData]) -> NDArray[np.float64]:
+    """Return the numeric fields per (record, field), NaN if missing."""
+    row = attrgetter(*_NUMERIC_FIELDS)
+    values = np.array([row(r) for r in flat], dtype=np.float64)
+    return values.reshape(len(flat), len(_NUMERIC_FIELDS))
+
+
+def _spread(
+    flat: NDArray[Any],
+    slots: tuple[NDArray[np.intp], NDArray[np.intp]],
+    shape: tuple[int, int],
+    fill: float,
+) -> NDArray[Any]:
+    """Place per-record rows into a dates x sources array padded with fill."""
+    spread = np.full(shape + flat.shape[1:], fill, dtype=flat.dtype)
+    spread[slots] = flat
+    return spread
+
+
+def _pack_columns(window: ForecastWindow, data: Iterable[DailyData]) -> _Columns:
+    """Pack the records for the window's dates into columnar arrays."""
+    dates = tuple(dict.fromkeys(window.dates))
+    grouped = _group_by_date(data)
+    records = tuple(grouped.get(str(d), ()) for d in dates)
+    flat = [r for group in records for r in group]
+    directions = tuple(sorted({r.direction for r in flat if r.direction is not None}))
+    prognoses = tuple(dict.fromkeys(r.prognosis for r in flat if r.prognosis))
+    sizes = np.fromiter(map(len, records), dtype=np.intp, count=len(records))
+    rows = np.repeat(np.arange(len(records)), sizes)
+    starts = np.repeat(np.cumsum(sizes) - sizes, sizes)
+    slots = (rows, np.arange(len(flat)) - starts)
+    shape = (len(dates), int(sizes.max(initial=0)))
+    values = _spread(_numeric_values(flat), slots, shape, np.nan)
+    direction_codes = _spread(
+        _category_codes(flat, directions, "direction"), slots, shape, -1
+    )
+    prognosis_codes = _spread(
+        _category_codes(flat, prognoses, "prognosis"), slots, shape, -1
+    )
+    valid = (
+        ~np.isnan(values).all(axis=2) | (direction_codes >= 0) | (prognosis_codes >= 0)
+    )
+    return _Columns(
+        dates=dates,
+        records=records,
+        values=values,
+        directions=directions,
+        direction_codes=direction_codes,
+        prognoses=prognoses,
+        prognosis_codes=prognosis_codes,
+        valid=valid,
+    )
+
+
+def _sigma_clipped_means(
+    values: NDArray[np.float64], policy: ConsensusPolicy
+) -> NDArray[np.float64]:
+    """Vectorized _sigma_clipped_mean over the source axis (axis 1)."""
+    present = ~np.isnan(values)
+    count = present.sum(axis=1)
+    filled = np.where(present, values, 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        base = filled.sum(axis=1) / count
+        deviation = np.where(present, values - base[:, None], 0.0)
+        sigma = np.sqrt((deviation**2).sum(axis=1) / (count - 1))
+        keep = present & (np.abs(deviation) <= policy.sigma_threshold * sigma[:, None])
+        kept = keep.sum(axis=1)
+        clipped = np.where(keep, values, 0.0).sum(axis=1) / kept
+    use_clipped = (count >= policy.min_count_for_outlier) & (sigma > 0) & (kept > 0)
+    return np.where(use_clipped, clipped, base)
+
+
+def _sorted_medians(
+    ordered: NDArray[np.float64], count: NDArray[np.intp]
+) -> NDArray[np.float64]:
+    """Return medians of NaN-last sorted rows holding count values each."""
+    low = np.take_along_axis(ordered, np.maximum(count - 1, 0)[:, None] // 2, axis=1)
+    high = np.take_along_axis(ordered, count[:, None] // 2, axis=1)
+    return ((low + high) / 2)[:, 0]
+
+
+def _median_mad_means(
+    values: NDArray[np.float64], policy: ConsensusPolicy
+) -> NDArray[np.float64]:
+    """Vectorized _median_mad_mean over the source axis (axis 1)."""
+    present = ~np.isnan(values)
+    count = present.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        base = np.where(present, values, 0.0).sum(axis=1) / count
+        mid = _sorted_medians(np.sort(values, axis=1), count)
+        deviation = np.abs(values - mid[:, None])
+        mad = _sorted_medians(np.sort(deviation, axis=1), count)
+        keep = present & (
+            deviation <= policy.mad_threshold * MAD_TO_SIGMA * mad[:, None]
+        )
+        kept = keep.sum(axis=1)
+        clipped = np.where(keep, values, 0.0).sum(axis=1) / kept
+    use_clipped = count >= policy.min_count_for_outlier
+    return np.where(use_clipped, np.where(kept > 0, clipped, mid), base)
+
+
+def _trimmed_means(
+    values: NDArray[np.float64], policy: ConsensusPolicy
+) -> NDArray[np.float64]:
+    """Vectorized _trimmed_mean over the source axis (axis 1)."""
+    count = (~np.isnan(values)).sum(axis=1)
+    trimmed = np.ceil(count * policy.trim_fraction).astype(np.intp)
+    cut = np.where(
+        count >= policy.min_count_for_outlier,
+        np.minimum(trimmed, (count - 1) // 2),
+        0,
+    )
+    rank = np.arange(values.shape[1]).reshape(1, -1, *([1] * (values.ndim - 2)))
+    keep = (rank >= cut[:, None]) & (rank < (count - cut)[:, None])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(keep, np.sort(values, axis=1), 0.0).sum(axis=1) / keep.sum(
+            axis=1
+        )
+
+
+_VECTOR_ESTIMATORS = {
+    RobustEstimator.SIGMA_CLIP: _sigma_clipped_means,
+    RobustEstimator.MEDIAN_MAD: _median_mad_means,
+    RobustEstimator.TRIMMED_MEAN: _trimmed_means,
+}
+
+
+def _robust_means(
+    values: NDArray[np.float64], policy: ConsensusPolicy
+) -> NDArray[np.float64]:
+    """Vectorized _compute_robust_mean over the source axis (axis 1)."""
+    if values.shape[1] == 0:
+        return np.full(values.shape[:1] + values.shape[2:], np.nan)
+    return _VECTOR_ESTIMATORS[policy.estimator](values, policy)
+
+
+def _extreme(
+    values: NDArray[np.float64], reduce: np.ufunc, fill: float
+) -> NDArray[np.float64]:
+    """Reduce over the source axis ignoring NaN; NaN where nothing is present."""
+    present = ~np.isnan(values)
+    result = reduce.reduce(np.where(present, values, fill), axis=1)
+    return np.where(present.any(axis=1), result, np.nan)
+
+
+def _category_presence(codes: NDArray[np.intp], size: int) -> NDArray[np.int64]:
+    """Return per-date counts of each category code."""
+    counts = np.zeros((codes.shape[0], size + 1), dtype=np.int64)
+    rows = np.broadcast_to(np.arange(codes.shape[0])[:, None], codes.shape)
+    np.add.at(counts, (rows, np.where(codes >= 0, codes, size)), 1)
+    return counts[:, :size]
+
+
+def _prognosis_modes(
+    columns: _Columns, policy: ConsensusPolicy
+) -> list[WeatherCode | None]:
+    """Vectorized _compute_prognosis: mode with severity tie-breaking."""
+    counts = _category_presence(columns.prognosis_codes, len(columns.prognoses))
+    if not columns.prognoses:
+        return [None] * len(columns.dates)
+    ranking = _prognosis_ranking(policy)
+    severity = np.array(
+        [ranking.index(p) if p in ranking else len(ranking) for p in columns.prognoses]
+    )
+    top = counts.max(axis=1)
+    candidates = (counts == top[:, None]) & (top[:, None] > 0)
+    tied = candidates.sum(axis=1)
+    ranked = np.where(candidates, severity, len(ranking) + 1).argmin(axis=1)
+    ranked_ok = severity[ranked] < len(ranking)
+    single = candidates.argmax(axis=1)
+    modes: list[WeatherCode | None] = []
+    for d in range(len(columns.dates)):
+        if top[d] == 0:
+            modes.append(None)
+        elif tied[d] == 1:
+            modes.append(columns.prognoses[single[d]])
+        else:
+            modes.append(
+                columns.prognoses[ranked[d]] if ranked_ok[d] else WeatherCode.UNKNOWN
+            )
+    return modes
+
+
+def _optional(value: np.floating) -> float | None:
+    """Convert a NaN-for-missing array scalar to an optional float."""
+    return None if np.isnan(value) else float(value)
+
+
+def _columnar_by_date(
+    window: ForecastWindow,
+    data: Iterable[DailyData],
+    policy: ConsensusPolicy,
+    location_name: str,
+) -> dict[date, ConsensusForecast]:
+    """Compute every date's consensus in vectorized passes over packed columns."""
+    columns = _pack_columns(window, data)
+    temps = _robust_means(columns.values[:, :, [_MIN_TEMP, _MAX_TEMP]], policy)
+    min_wind = _extreme(columns.values[:, :, _MIN_WIND], np.minimum, np.inf)
+    max_wind = _extreme(columns.values[:, :, _MAX_WIND], np.maximum, -np.inf)
+    rain = _extreme(columns.values[:, :, _RAIN_PROB], np.maximum, -np.inf)
+    seen = _category_presence(columns.direction_codes, len(columns.directions)) > 0
+    modes = _prognosis_modes(columns, policy)
+    forecasts = {}
+    for d, day in enumerate(columns.dates):
+        group = columns.records[d]
+        sources = sorted(r.source for r, ok in zip(group, columns.valid[d]) if ok)
+        if not sources:
+            continue
+        directions = [c for c, hit in zip(columns.directions, seen[d]) if hit]
+        forecasts[day] = ConsensusForecast(
+            location=location_name,
+            date=str(day),
+            min_temp=_optional(temps[d, 0]),
+            max_temp=_optional(temps[d, 1]),
+            min_wind_kmh=_optional(min_wind[d]),
+            max_wind_kmh=_optional(max_wind[d]),
+            wind_direction=directions or None,
+            prognosis=modes[d],
+            rain_prob=_optional(rain[d]),
+            sources=sources,
+        )
+    return forecasts
+
+
+def _columnar_consensus(
+    window: ForecastWindow,
+    data: Iterable[DailyData],
+    policy: ConsensusPolicy,
+    location_name: str,
+) -> Iterable[ConsensusForecast]:
+    """Yield consensus forecasts for the window from the columnar engine."""
+    by_date = _columnar_by_date(window, data, policy, location_name)
+    return (by_date[d] for d in window.dates if d in by_date)
+
+
+_ENGINES = {
+    ConsensusEngine.PYTHON: _consensus_iter,
+    ConsensusEngine.COLUMNAR: _columnar_consensus,
+}
+
+
 def calculate_consensus(
     window: ForecastWindow,
     data: Iterable[DailyData],
     policy: ConsensusPolicy,
     location_name: str = "Unknown",
+    engine: ConsensusEngine = ConsensusEngine.PYTHON,
 ) -> list[ConsensusForecast]:
     """Orchestrate the consensus calculation for the forecast window."""
     if not data:
         return []
-    return list(_consensus_iter(window, data, policy, location_name))
+    return list(_ENGINES[engine](window, data, policy, location_name))
+
+
+LocationForecasts = tuple[str, list[ConsensusForecast]]
+
+
+def _consensus_shard(
+    window: ForecastWindow,
+    policy: ConsensusPolicy,
+    engine: ConsensusEngine,
+    shard: tuple[tuple[str, tuple[DailyData, ...]], ...],
+) -> list[LocationForecasts]:
+    """Compute consensus for every location in one shard (runs in a worker)."""
+    return [
+        (name, calculate_consensus(window, data, policy, name, engine))
+        for name, data in shard
+    ]
+
+
+def _shard_size(locations: int, workers: int) -> int:
+    """Return locations per shard: about four shards per worker."""
+    return max(1, -(-locations // (workers * 4)))
+
+
+def calculate_consensus_bulk(
+    locations: Mapping[str, Iterable[DailyData]],
+    window: ForecastWindow,
+    policy: ConsensusPolicy,
+    engine: ConsensusEngine = ConsensusEngine.PYTHON,
+    workers: int | None = None,
+) -> Iterator[LocationForecasts]:
+    """Yield (location, forecasts) pairs as shards finish across a process pool."""
+    items = tuple((name, tuple(data)) for name, data in locations.items())
+    if not items:
+        return
+    workers = workers or os.cpu_count() or 1
+    size = _shard_size(len(items), workers)
+    shards = (items[i : i + size] for i in range(0, len(items), size))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(_consensus_shard, window, policy, engine, shard)
+            for shard in shards
+        ]
+        for future in as_completed(futures):
+            yield from future.result()
+
+
+@dataclass
+class _RunningStats:
+    """Welford running mean/variance of one field, keeping values for clipping."""
+
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    values: list[float] = field(default_factory=list)
+
+    def add(self, value: float) -> None:
+        """Fold one value into the running statistics."""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.values.append(value)
+
+    def robust_mean(self, policy: ConsensusPolicy) -> float | None:
+        """Return the policy's robust mean, as _compute_robust_mean does."""
+        if self.count == 0:
+            return None
+        if policy.estimator is not RobustEstimator.SIGMA_CLIP:
+            return _ESTIMATORS[policy.estimator](tuple(self.values), policy)
+        return _sigma_clip(self.values, self.mean, self.m2, self.count, policy)
+
+
+def _optional_min(current: float | None, value: float | None) -> float | None:
+    """Return the smaller of two optional values."""
+    if value is None:
+        return current
+    return value if current is None else min(current, value)
+
+
+def _optional_max(current: float | None, value: float | None) -> float | None:
+    """Return the larger of two optional values."""
+    if value is None:
+        return current
+    return value if current is None else max(current, value)
+
+
+@dataclass
+class _DateAccumulator:
+    """Running aggregates for one date."""
+
+    min_temp: _RunningStats = field(default_factory=_RunningStats)
+    max_temp: _RunningStats = field(default_factory=_RunningStats)
+    min_wind: float | None = None
+    max_wind: float | None = None
+    rain_prob: float | None = None
+    directions: set[str] = field(default_factory=set)
+    prognoses: Counter[WeatherCode] = field(default_factory=Counter)
+    sources: list[str] = field(default_factory=list)
+
+    def add(self, record: DailyData) -> None:
+        """Fold one record into the date's aggregates."""
+        if record.min_temp is not None:
+            self.min_temp.add(record.min_temp)
+        if record.max_temp is not None:
+            self.max_temp.add(record.max_temp)
+        self.min_wind = _optional_min(self.min_wind, record.min_wind)
+        self.max_wind = _optional_max(self.max_wind, record.max_wind)
+        self.rain_prob = _optional_max(self.rain_prob, record.rain_prob)
+        if record.direction is not None:
+            self.directions.add(record.direction)
+        if record.prognosis is not None:
+            self.prognoses[record.prognosis] += 1
+        if record.is_valid:
+            self.sources.append(record.source)
+
+    def forecast(
+        self, date_str: str, location_name: str, policy: ConsensusPolicy
+    ) -> ConsensusForecast | None:
+        """Return the date's consensus so far, or None without valid sources."""
+        if not self.sources:
+            return None
+        return ConsensusForecast(
+            location=location_name,
+            date=date_str,
+            min_temp=self.min_temp.robust_mean(policy),
+            max_temp=self.max_temp.robust_mean(policy),
+            min_wind_kmh=self.min_wind,
+            max_wind_kmh=self.max_wind,
+            wind_direction=sorted(self.directions) or None,
+            prognosis=_prognosis_from_counts(self.prognoses, policy),
+            rain_prob=self.rain_prob,
+            sources=sorted(self.sources),
+        )
+
+
+class ConsensusAccumulator:
+    """Online consensus that folds in records as each provider reports.
+
+    Records may arrive in any order; records outside the window are
+    ignored. ``forecasts()`` can be called at any moment: results are
+    provisional until every expected source has been marked complete.
+    """
+
+    def __init__(
+        self,
+        window: ForecastWindow,
+        policy: ConsensusPolicy,
+        location_name: str = "Unknown",
+        expected_sources: Iterable[str] = (),
+    ) -> None:
+        """Initialize empty per-date aggregates for the window."""
+        self.window = window
+        self.policy = policy
+        self.location_name = location_name
+        self._dates = {str(d): _DateAccumulator() for d in window.dates}
+        self._pending = set(expected_sources)
+
+    def add(self, record: DailyData) -> None:
+        """Fold one record into its date's aggregates."""
+        accumulator = self._dates.get(str(record.date))
+        if accumulator is not None:
+            accumulator.add(record)
+
+    def extend(self, records: Iterable[DailyData]) -> None:
+        """Fold a provider's records into the aggregates."""
+        for record in records:
+            self.add(record)
+
+    def complete(self, source: str) -> None:
+        """Mark a provider as finished, whether or not it returned data."""
+        self._pending.discard(source)
+
+    @property
+    def is_final(self) -> bool:
+        """Return True once every expected source has completed."""
+        return not self._pending
+
+    def forecast(self, day: date) -> ConsensusForecast | None:
+        """Return the current consensus for one date."""
+        accumulator = self._dates.get(str(day))
+        if accumulator is None:
+            return None
+        return accumulator.forecast(str(day), self.location_name, self.policy)
+
+    def forecasts(self) -> list[ConsensusForecast]:
+        """Return the current consensus for every window date with data."""
+        results = (self.forecast(d) for d in self.window.dates)
+        return [cf for cf in results if cf is not None]
+
+
+StoreKey = tuple[str, date]
+
+
+class ConsensusStore:
+    """Cached per-(location, date) consensus updated one provider refresh at a time.
+
+    Replacing a source's records recomputes only the dates whose records
+    changed; those (location, date) keys are queued as dirty so output can
+    update just the affected rows.
+    """
+
+    def __init__(self, window: ForecastWindow, policy: ConsensusPolicy) -> None:
+        """Initialize an empty store for a shared window and policy."""
+        self.window = window
+        self.policy = policy
+        self._in_window = set(window.dates)
+        self._records: dict[StoreKey, dict[str, tuple[DailyData, ...]]] = {}
+        self._forecasts: dict[StoreKey, ConsensusForecast] = {}
+        self._source_dates: dict[tuple[str, str], set[date]] = {}
+        self._dirty: dict[StoreKey, None] = {}
+
+    def _source_by_date(
+        self, records: Iterable[DailyData]
+    ) -> dict[date, tuple[DailyData, ...]]:
+        """Group one source's records by date, keeping only window dates."""
+        grouped: dict[date, list[DailyData]] = {}
+        for r in records:
+            if r.date in self._in_window:
+                grouped.setdefault(r.date, []).append(r)
+        return {d: tuple(rs) for d, rs in grouped.items()}
+
+    def replace_source(
+        self, location: str, source: str, records: Iterable[DailyData]
+    ) -> list[date]:
+        """Replace a source's records for a location; return the changed dates."""
+        new = self._source_by_date(records)
+        old_dates = self._source_dates.get((location, source), set())
+        changed = [
+            d
+            for d in self.window.dates
+            if d in old_dates | new.keys()
+            and self._records.get((location, d), {}).get(source) != new.get(d)
+        ]
+        for d in changed:
+            self._set_source(location, d, source, new.get(d))
+            self._recompute((location, d))
+        self._source_dates[(location, source)] = set(new)
+        return changed
+
+    def _set_source(
+        self,
+        location: str,
+        day: date,
+        source: str,
+        records: tuple[DailyData, ...] | None,
+    ) -> None:
+        """Store or drop one source's records for a (location, date)."""
+        by_source = self._records.setdefault((location, day), {})
+        if records is None:
+            by_source.pop(source, None)
+        else:
+            by_source[source] = records
+
+    def _recompute(self, key: StoreKey) -> None:
+        """Rebuild the consensus for one (location, date) and mark it dirty."""
+        location, day = key
+        records = tuple(r for rs in self._records[key].values() for r in rs)
+        forecast = _build_single_consensus(str(day), records, self.policy, location)
+        if forecast is None:
+            self._forecasts.pop(key, None)
+        else:
+            self._forecasts[key] = forecast
+        self._dirty[key] = None
+
+    def forecast(self, location: str, day: date) -> ConsensusForecast | None:
+        """Return the cached consensus for one (location, date)."""
+        return self._forecasts.get((location, day))
+
+    def forecasts(self, location: str) -> list[ConsensusForecast]:
+        """Return the cached consensus for a location in window order."""
+        results = (self.forecast(location, d) for d in self.window.dates)
+        return [cf for cf in results if cf is not None]
+
+    @property
+    def dirty(self) -> list[StoreKey]:
+        """Return the (location, date) keys changed since the last take."""
+        return list(self._dirty)
+
+    def take_dirty(self) -> list[StoreKey]:
+        """Return and clear the dirty (location, date) keys."""
+        dirty, self._dirty = list(self._dirty), {}
+        return dirty
+
+
+PROVIDER_BUDGET = 12.0
+GLOBAL_DEADLINE = 20.0
+MIN_ATTEMPT_BUDGET = 0.5
+MAX_ATTEMPTS = 3
+BACKOFF_BASE = 0.5
+
+
+@dataclass(frozen=True)
+class LocationInfo:
+    """A resolved location."""
+
+    name: str
+    lat: float
+    lon: float
+    state: str
+    timezone: str
+
+
+@dataclass(frozen=True)
+class ProviderCapabilities:
+    """What a provider can supply."""
+
+    is_forecast: bool
+    max_horizon_days: int
+
+
+class WeatherProvider(Protocol):
+    """A weather source fetched within a time budget."""
+
+    name: str
+    capabilities: ProviderCapabilities
+
+    async def fetch(
+        self, loc: LocationInfo, window: ForecastWindow, remaining_budget: float
+    ) -> list[DailyData]:
+        """Fetch daily records for the window, finishing within the budget."""
+        ...
+
+
+@dataclass(frozen=True)
+class RunnerPolicy:
+    """Time limits and retry schedule for provider fetches."""
+
+    provider_budget: float = PROVIDER_BUDGET
+    deadline: float = GLOBAL_DEADLINE
+    min_attempt_budget: float = MIN_ATTEMPT_BUDGET
+    max_attempts: int = MAX_ATTEMPTS
+    backoff_base: float = BACKOFF_BASE
+
+
+def _log(message: str) -> None:
+    """Write a diagnostic line to stderr."""
+    print(message, file=sys.stderr)
+
+
+class ProviderRunner:
+    """Run providers concurrently under per-provider budgets and a global deadline.
+
+    Each attempt gets ``min(provider budget left, deadline left)``; failed
+    attempts back off exponentially with jitter, and retrying stops once
+    less than ``min_attempt_budget`` would remain. At the deadline pending
+    providers are cancelled and whatever has arrived is returned.
+    """
+
+    def __init__(
+        self,
+        providers: Iterable[WeatherProvider],
+        policy: RunnerPolicy | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        jitter: Callable[[], float] = random.random,
+    ) -> None:
+        """Initialize with the providers, limits, clock and jitter source."""
+        self.providers = tuple(providers)
+        self.policy = policy or RunnerPolicy()
+        self._clock = clock
+        self._jitter = jitter
+
+    def _backoff(self, attempt: int) -> float:
+        """Return the delay before the next attempt: base * 2^n, +/-50% jitter."""
+        return self.policy.backoff_base * 2**attempt * (0.5 + self._jitter())
+
+    async def _attempt(
+        self,
+        provider: WeatherProvider,
+        loc: LocationInfo,
+        window: ForecastWindow,
+        remaining: float,
+    ) -> list[DailyData]:
+        """Run one fetch attempt, cut off when its budget runs out."""
+        return await asyncio.wait_for(provider.fetch(loc, window, remaining), remaining)
+
+    async def _run_provider(
+        self,
+        provider: WeatherProvider,
+        loc: LocationInfo,
+        window: ForecastWindow,
+        deadline_at: float,
+    ) -> list[DailyData]:
+        """Fetch from one provider with retries inside its budget."""
+        budget_end = min(self._clock() + self.policy.provider_budget, deadline_at)
+        for attempt in range(self.policy.max_attempts):
+            remaining = budget_end - self._clock()
+            if remaining < self.policy.min_attempt_budget:
+                break
+            try:
+                return await self._attempt(provider, loc, window, remaining)
+            except Exception as exc:  # noqa: BLE001 - logged, provider skipped
+                _log(f"{provider.name}: attempt {attempt + 1} failed: {exc!r}")
+            if attempt + 1 == self.policy.max_attempts:
+                break
+            delay = self._backoff(attempt)
+            if budget_end - self._clock() - delay < self.policy.min_attempt_budget:
+                break
+            await asyncio.sleep(delay)
+        _log(f"{provider.name}: giving up")
+        return []
+
+    async def run(self, loc: LocationInfo, window: ForecastWindow) -> list[DailyData]:
+        """Return the records of every provider that finished by the deadline."""
+        deadline_at = self._clock() + self.policy.deadline
+        tasks = {
+            asyncio.create_task(self._run_provider(p, loc, window, deadline_at)): p
+            for p in self.providers
+        }
+        if not tasks:
+            return []
+        done, pending = await asyncio.wait(tasks, timeout=self.policy.deadline)
+        for task in pending:
+            task.cancel()
+            _log(f"{tasks[task].name}: cancelled at the global deadline")
+        await asyncio.gather(*pending, return_exceptions=True)
+        return [r for task in done for r in task.result()]
+
+
+async def run_consensus(
+    runner: ProviderRunner,
+    loc: LocationInfo,
+    window: ForecastWindow,
+    policy: ConsensusPolicy,
+) -> list[ConsensusForecast]:
+    """Fetch from every provider in time and return the consensus forecasts."""
+    records = await runner.run(loc, window)
+    return calculate_consensus(window, records, policy, loc.name)
+
+
+DEFAULT_CACHE_TTL = 3600.0
+DEFAULT_MAX_STALE = 6 * 3600.0
+# Roughly each source's model/product update cadence, in seconds.
+PROVIDER_TTLS = {
+    "OpenMeteo": 3600.0,
+    "Meteostat": 3 * 3600.0,
+    "Wttr": 3600.0,
+    "BOM": 4 * 3600.0,
+}
+_UNSAFE_KEY_CHARS = re.compile(r"[^A-Za-z0-9.-]+")
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    """Write data to a path via a uniquely named temporary file and rename."""
+    with tempfile.NamedTemporaryFile(
+        dir=path.parent, prefix=f"{path.name}.", suffix=".tmp", delete=False
+    ) as tmp:
+        tmp.write(data)
+    os.replace(tmp.name, path)
+
+
+def _record_to_json(record: DailyData) -> dict[str, object | None]:
+    """Return a JSON-serializable dict for a record."""
+    return asdict(record) | {"date": record.date.isoformat()}
+
+
+def _record_from_json(payload: dict[str, Any]) -> DailyData:
+    """Rebuild a record from its JSON dict."""
+    prognosis = payload["prognosis"]
+    return DailyData(
+        **payload
+        | {
+            "date": date.fromisoformat(payload["date"]),
+            "prognosis": WeatherCode(prognosis) if prognosis else None,
+        }
+    )
+
+
+class ProviderCache:
+    """On-disk provider responses keyed by (provider, rounded lat/lon, dates)."""
+
+    def __init__(
+        self,
+        root: Path,
+        ttls: Mapping[str, float] = PROVIDER_TTLS,
+        max_stale: float = DEFAULT_MAX_STALE,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """Initialize with the cache directory, per-provider TTLs and clock."""
+        self.root = root
+        self.ttls = ttls
+        self.max_stale = max_stale
+        self.clock = clock
+
+    def ttl(self, provider: str) -> float:
+        """Return the freshness lifetime for a provider's responses."""
+        return self.ttls.get(provider, DEFAULT_CACHE_TTL)
+
+    def path(self, provider: str, loc: LocationInfo, window: ForecastWindow) -> Path:
+        """Return the cache file for a provider, location and window dates."""
+        dates = hashlib.sha256(",".join(map(str, window.dates)).encode())
+        key = f"{provider}_{loc.lat:.2f}_{loc.lon:.2f}_{dates.hexdigest()[:16]}"
+        return self.root / f"{_UNSAFE_KEY_CHARS.sub('-', key)}.json"
+
+    def load(
+        self, provider: str, loc: LocationInfo, window: ForecastWindow
+    ) -> tuple[list[DailyData], float] | None:
+        """Return cached records and their age, or None if missing or unreadable."""
+        try:
+            entry = json.loads(self.path(provider, loc, window).read_text())
+            records = [_record_from_json(r) for r in entry["records"]]
+            return records, self.clock() - entry["stored_at"]
+        except (FileNotFoundError, KeyError, TypeError, ValueError):
+            return None
+
+    def store(
+        self,
+        provider: str,
+        loc: LocationInfo,
+        window: ForecastWindow,
+        records: Iterable[DailyData],
+    ) -> None:
+        """Write records atomically with the current time."""
+        path = self.path(provider, loc, window)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        entry = {
+            "stored_at": self.clock(),
+            "records": [_record_to_json(r) for r in records],
+        }
+        _write_atomic(path, json.dumps(entry).encode())
+
+
+class CachedProvider:
+    """WeatherProvider wrapper serving fresh or stale-while-revalidate responses.
+
+    Fresh entries are returned without a fetch. Entries past their TTL but
+    within ``max_stale`` are returned immediately while a background task
+    refreshes them; older or missing entries are fetched inline.
+    """
+
+    def __init__(
+        self,
+        provider: WeatherProvider,
+        cache: ProviderCache,
+        refresh_budget: float = PROVIDER_BUDGET,
+    ) -> None:
+        """Initialize with the wrapped provider and its cache."""
+        self.provider = provider
+        self.cache = cache
+        self.refresh_budget = refresh_budget
+        self._refreshing: dict[Path, asyncio.Task[None]] = {}
+
+    @property
+    def name(self) -> str:
+        """Return the wrapped provider's name."""
+        return self.provider.name
+
+    @property
+    def capabilities(self) -> ProviderCapabilities:
+        """Return the wrapped provider's capabilities."""
+        return self.provider.capabilities
+
+    async def fetch(
+        self, loc: LocationInfo, window: ForecastWindow, remaining_budget: float
+    ) -> list[DailyData]:
+        """Return cached records when usable, fetching only when required."""
+        cached = self.cache.load(self.name, loc, window)
+        ttl = self.cache.ttl(self.name)
+        if cached is not None and cached[1] <= ttl + self.cache.max_stale:
+            records, age = cached
+            if age > ttl:
+                self._revalidate(loc, window)
+            return records
+        records = await self.provider.fetch(loc, window, remaining_budget)
+        if records:
+            self.cache.store(self.name, loc, window, records)
+        return records
+
+    def _revalidate(self, loc: LocationInfo, window: ForecastWindow) -> None:
+        """Start one background refresh per cache entry."""
+        key = self.cache.path(self.name, loc, window)
+        if key not in self._refreshing:
+            task = asyncio.create_task(self._refresh(loc, window))
+            self._refreshing[key] = task
+            task.add_done_callback(lambda _: self._refreshing.pop(key, None))
+
+    async def _refresh(self, loc: LocationInfo, window: ForecastWindow) -> None:
+        """Fetch and store fresh records, logging failures."""
+        try:
+            records = await asyncio.wait_for(
+                self.provider.fetch(loc, window, self.refresh_budget),
+                self.refresh_budget,
+            )
+        except Exception as exc:  # noqa: BLE001 - stale data stays in place
+            _log(f"{self.name}: background refresh failed: {exc!r}")
+            return
+        if records:
+            self.cache.store(self.name, loc, window, records)
+
+    async def drain(self, timeout: float | None = None) -> None:
+        """Wait for outstanding background refreshes before the loop closes."""
+        if self._refreshing:
+            await asyncio.wait(list(self._refreshing.values()), timeout=timeout)
+
+
+EARTH_RADIUS_KM = 6371.0088
+STATION_RADIUS_KM = 50.0
+
+
+@dataclass(frozen=True)
+class BomStation:
+    """A BOM observation/forecast station from the station catalogue."""
+
+    station_id: str
+    name: str
+    lat: float
+    lon: float
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Return the great-circle distance between two points in kilometres."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlam = math.radians(lon2 - lon1)
+    a = (
+        math.sin(dphi / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(dlam / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _unit_vectors(
+    lats: NDArray[np.float64], lons: NDArray[np.float64]
+) -> NDArray[np.float64]:
+    """Return (n, 3) unit-sphere coordinates for latitudes/longitudes in degrees."""
+    phi, lam = np.radians(lats), np.radians(lons)
+    return np.column_stack(
+        (np.cos(phi) * np.cos(lam), np.cos(phi) * np.sin(lam), np.sin(phi))
+    )
+
+
+def _chord_for_km(km: float) -> float:
+    """Return the unit-sphere chord length spanning a surface distance."""
+    if km >= math.pi * EARTH_RADIUS_KM:
+        return math.inf
+    return 2 * math.sin(km / EARTH_RADIUS_KM / 2)
+
+
+def _catalogue_digest(stations: Iterable[BomStation]) -> str:
+    """Return a digest identifying a station catalogue's contents."""
+    digest = hashlib.sha256()
+    for s in stations:
+        digest.update(f"{s.station_id}\0{s.name}\0{s.lat!r}\0{s.lon!r}\n".encode())
+    return digest.hexdigest()
+
+
+def _kd_build(points: NDArray[np.float64]) -> tuple[NDArray[np.intp], NDArray[np.int8]]:
+    """Return the implicit KD-tree order and per-node split axes for points.
+
+    The subtree over ``order[lo:hi]`` has its node at ``mid = (lo + hi) // 2``;
+    ``order[lo:mid]`` and ``order[mid + 1:hi]`` are its children.
+    """
+    order = np.arange(len(points))
+    axes = np.zeros(len(points), dtype=np.int8)
+    stack = [(0, len(points))]
+    while stack:
+        lo, hi = stack.pop()
+        if hi - lo <= 0:
+            continue
+        span = order[lo:hi]
+        axis = int(np.argmax(np.ptp(points[span], axis=0)))
+        mid = (hi - lo) // 2
+        order[lo:hi] = span[np.argpartition(points[span, axis], mid)]
+        axes[lo + mid] = axis
+        stack += [(lo, lo + mid), (lo + mid + 1, hi)]
+    return order, axes
+
+
+class StationIndex:
+    """KD-tree over station positions on the unit sphere.
+
+    Straight-line (chord) distance between unit vectors grows monotonically
+    with great-circle distance, so nearest-neighbour search in 3-D gives the
+    haversine ordering without trigonometry per node. Queries visit
+    O(log n) nodes for typical catalogues instead of scanning every station.
+    """
+
+    def __init__(
+        self,
+        stations: Iterable[BomStation],
+        _tree: tuple[NDArray[np.intp], NDArray[np.int8]] | None = None,
+    ) -> None:
+        """Build the index (or adopt a persisted tree) for the stations."""
+        self.stations = tuple(stations)
+        lats = np.array([s.lat for s in self.stations], dtype=np.float64)
+        lons = np.array([s.lon for s in self.stations], dtype=np.float64)
+        points = _unit_vectors(lats, lons).reshape(-1, 3)
+        order, self._axes = _tree if _tree is not None else _kd_build(points)
+        self._order = order
+        self._points = points[order]
+
+    def __len__(self) -> int:
+        """Return the number of indexed stations."""
+        return len(self.stations)
+
+    def _search(
+        self, target: NDArray[np.float64], k: int, radius: float
+    ) -> list[tuple[float, int]]:
+        """Return up to k (squared chord, tree slot) pairs within the chord radius."""
+        best: list[tuple[float, int]] = []  # max-heap via negated distances
+        bound = radius * radius
+        stack = [(0, len(self._points))]
+        while stack:
+            lo, hi = stack.pop()
+            if hi <= lo:
+                continue
+            mid = (lo + hi) // 2
+            point = self._points[mid]
+            delta = target - point
+            dist = float(delta @ delta)
+            if dist <= bound:
+                heapq.heappush(best, (-dist, mid))
+                if len(best) > k:
+                    heapq.heappop(best)
+                if len(best) == k:
+                    bound = -best[0][0]
+            axis = self._axes[mid]
+            gap = float(target[axis] - point[axis])
+            near, far = (
+                ((mid + 1, hi), (lo, mid)) if gap > 0 else ((lo, mid), (mid + 1, hi))
+            )
+            if gap * gap <= bound:
+                stack.append(far)
+            stack.append(near)
+        return sorted((-d, slot) for d, slot in best)
+
+    def nearest(
+        self, lat: float, lon: float, k: int = 1, radius_km: float = math.inf
+    ) -> list[tuple[BomStation, float]]:
+        """Return up to k stations within radius_km, nearest first, with distances.
+
+        Ties in distance are broken by station id so selection is deterministic.
+        """
+        if k <= 0 or not self.stations:
+            return []
+        target = _unit_vectors(np.array([lat]), np.array([lon]))[0]
+        hits = self._search(target, k, _chord_for_km(radius_km))
+        found = [self.stations[self._order[slot]] for _, slot in hits]
+        ranked = sorted(
+            ((s, haversine_km(lat, lon, s.lat, s.lon)) for s in found),
+            key=lambda hit: (hit[1], hit[0].station_id),
+        )
+        return [(s, km) for s, km in ranked if km <= radius_km]
+
+    def within(
+        self, lat: float, lon: float, radius_km: float
+    ) -> list[tuple[BomStation, float]]:
+        """Return every station within radius_km, nearest first."""
+        return self.nearest(lat, lon, len(self.stations), radius_km)
+
+    def select(
+        self, lat: float, lon: float, radius_km: float = STATION_RADIUS_KM
+    ) -> BomStation | None:
+        """Return the nearest station within radius_km, if any."""
+        hits = self.nearest(lat, lon, 1, radius_km)
+        return hits[0][0] if hits else None
+
+    def save(self, path: Path) -> None:
+        """Persist the built tree and its catalogue atomically to an ``.npz`` file."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        buffer = io.BytesIO()
+        np.savez(
+            buffer,
+            digest=np.array(_catalogue_digest(self.stations)),
+            ids=np.array([s.station_id for s in self.stations], dtype=str),
+            names=np.array([s.name for s in self.stations], dtype=str),
+            lats=np.array([s.lat for s in self.stations], dtype=np.float64),
+            lons=np.array([s.lon for s in self.stations], dtype=np.float64),
+            order=self._order,
+            axes=self._axes,
+        )
+        _write_atomic(path, buffer.getvalue())
+
+    @classmethod
+    def load(cls, path: Path) -> StationIndex:
+        """Load an index saved by `save` without rebuilding the tree."""
+        with np.load(path, allow_pickle=False) as saved:
+            stations = [
+                BomStation(str(i), str(n), float(la), float(lo))
+                for i, n, la, lo in zip(
+                    saved["ids"],
+                    saved["names"],
+                    saved["lats"],
+                    saved["lons"],
+                    strict=True,
+                )
+            ]
+            return cls(stations, _tree=(saved["order"], saved["axes"]))
+
+    @classmethod
+    def cached(cls, stations: Iterable[BomStation], path: Path) -> StationIndex:
+        """Load the index from path if it matches the catalogue, else build and save it."""
+        stations = tuple(stations)
+        try:
+            with np.load(path, allow_pickle=False) as saved:
+                fresh = str(saved["digest"]) == _catalogue_digest(stations)
+        except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile):
+            fresh = False
+        if fresh:
+            return cls.load(path)
+        index = cls(stations)
+        index.save(path)
+        return index
+
+
+_BOM_PERCENT = re.compile(r"(\d+(?:\.\d+)?)\s*%")
+
+
+def _bom_number(text: str | None) -> float | None:
+    """Parse a numeric BOM element value, allowing a trailing percent sign."""
+    if not text:
+        return None
+    match = _BOM_PERCENT.fullmatch(text.strip())
+    try:
+        return float(match.group(1) if match else text)
+    except ValueError:
+        return None
+
+
+def _bom_period_record(period: Element, source: str) -> DailyData | None:
+    """Build a record from one ``forecast-period`` element, if it has a date."""
+    start = period.get("start-time-local")
+    if not start:
+        return None
+    values = {child.get("type"): child.text for child in period}
+    precis = values.get("precis")
+    return DailyData(
+        date=date.fromisoformat(start[:10]),
+        source=source,
+        min_temp=_bom_number(values.get("air_temperature_minimum")),
+        max_temp=_bom_number(values.get("air_temperature_maximum")),
+        min_wind=None,
+        max_wind=None,
+        direction=None,
+        prognosis=map_bom_text(precis) if precis else None,
+        rain_prob=_bom_number(values.get("probability_of_precipitation")),
+    )
+
+
+def iter_bom_forecast(
+    xml_source: str | Path | BinaryIO,
+    areas: Collection[str],
+    source: str = "BOM",
+) -> Iterator[DailyData]:
+    """Yield records for the target areas of a BOM state forecast product.
+
+    ``areas`` holds area AAC codes (e.g. ``VIC_PT042``) or descriptions
+    (e.g. ``Melbourne``). The product is parsed with ``defusedxml``'s
+    ``iterparse``; each element is detached from its parent once handled,
+    so memory stays bounded by one forecast period whatever the product size.
+    """
+    stack: list[Element] = []
+    in_target = False
+    for event, elem in iterparse(xml_source, events=("start", "end")):
+        if event == "start":
+            if elem.tag == "area":
+                in_target = elem.get("aac") in areas or elem.get("description") in areas
+            stack.append(elem)
+            continue
+        stack.pop()
+        if not stack:
+            break
+        parent = stack[-1]
+        if in_target and parent.tag == "forecast-period":
+            continue  # kept until the whole period is read
+        if in_target and elem.tag == "forecast-period":
+            record = _bom_period_record(elem, source)
+            if record is not None and record.is_valid:
+                yield record
+        elif elem.tag == "area":
+            in_target = False
+        parent.remove(elem)
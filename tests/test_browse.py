@@ -1,13 +1,94 @@
 from __future__ import annotations
 
+import asyncio
+import gzip
 import io
+import os
 import subprocess
+import sys
+import threading
+import time
+from collections.abc import AsyncIterator, Iterator
+from email.message import Message
+from http.client import IncompleteRead
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import pairwise
+from pathlib import Path
+from typing import ClassVar
+from urllib import error
 
 import pytest
 
 import browse
 
 
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class _DocsHandler(BaseHTTPRequestHandler):
+    body = b"<p>docs</p>"
+    etag = '"v1"'
+    cache_control = "max-age=60"
+    content_type = "text/html"
+    requests: ClassVar[list[dict[str, str]]] = []
+
+    def do_GET(self) -> None:
+        type(self).requests.append({"path": self.path, **dict(self.headers)})
+        if self.path == "/robots.txt":
+            self.send_response(200)
+            self.end_headers()
+            self.wfile.write(b"User-agent: *\nCrawl-delay: 3\n")
+            return
+        if self.path == "/short":
+            self.send_response(302)
+            self.send_header("Location", "/docs?utm_source=short")
+            self.end_headers()
+            return
+        if self.headers.get("If-None-Match") == self.etag:
+            self.send_response(304)
+            self.send_header("ETag", self.etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", self.etag)
+        self.send_header("Cache-Control", self.cache_control)
+        self.send_header("Content-Type", self.content_type)
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, *_: object) -> None:
+        return
+
+
+@pytest.fixture()
+def docs_server() -> Iterator[str]:
+    _DocsHandler.requests = []
+    _DocsHandler.body = b"<p>docs</p>"
+    _DocsHandler.content_type = "text/html"
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _DocsHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/docs"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture()
+def clock() -> _Clock:
+    return _Clock()
+
+
+@pytest.fixture()
+def caching_fetch(tmp_path: Path, clock: _Clock) -> browse.CachingFetch:
+    return browse.CachingFetch(browse.HttpCache(tmp_path, clock=clock))
+
+
 def test__browse_outcomes__invalid_scheme__fail() -> None:
     outcomes = list(browse.browse_outcomes(["ftp://example.com"]))
     assert outcomes[0].is_error
@@ -41,8 +122,8 @@ def test__main__writes_errors__fail(monkeypatch: pytest.MonkeyPatch) -> None:
     stderr = io.StringIO()
     outcome = browse.BrowseOutcome("https://example.com", None, "ouch")
 
-    monkeypatch.setattr(browse, "ensure_dependencies", lambda: None)
-    monkeypatch.setattr(browse, "browse_outcomes", lambda _: iter([outcome]))
+    monkeypatch.setattr(browse, "ensure_dependencies", lambda *_: None)
+    monkeypatch.setattr(browse, "browse_outcomes", lambda _, **__: iter([outcome]))
 
     exit_code = browse.main(stdin=[], stdout=stdout, stderr=stderr)
     assert exit_code == 1
@@ -73,8 +154,8 @@ def test__main__writes_success__success(monkeypatch: pytest.MonkeyPatch) -> None
     body = "data\n"
     outcome = browse.BrowseOutcome("https://example.com", body, None)
 
-    monkeypatch.setattr(browse, "ensure_dependencies", lambda: None)
-    monkeypatch.setattr(browse, "browse_outcomes", lambda _: iter([outcome]))
+    monkeypatch.setattr(browse, "ensure_dependencies", lambda *_: None)
+    monkeypatch.setattr(browse, "browse_outcomes", lambda _, **__: iter([outcome]))
 
     exit_code = browse.main(stdin=[], stdout=stdout, stderr=stderr)
     written = stdout.getvalue()
@@ -83,3 +164,1020 @@ def test__main__writes_success__success(monkeypatch: pytest.MonkeyPatch) -> None
     assert "URL: https://example.com" in written
     assert body in written
     assert stderr.getvalue() == ""
+
+
+def test__builtin_render__paragraphs_and_links__success() -> None:
+    html = b"<h1>Title</h1><p>Hello <a href='https://example.com/a'>there</a></p>"
+    text = browse._builtin_render(html)
+    assert text.startswith("Title\n\n   Hello [1]there\n")
+    assert text.endswith("References\n\n   1. https://example.com/a\n")
+
+
+def test__builtin_render__lists__success() -> None:
+    html = b"<ul><li>one<ol><li>first</li><li>second</li></ol></li></ul>"
+    lines = browse._builtin_render(html).splitlines()
+    assert lines == ["     * one", "        1. first", "        2. second"]
+
+
+def test__builtin_render__skips_scripts_and_wraps__success() -> None:
+    html = b"<script>hidden()</script><p>" + b"word " * 40 + b"</p>"
+    lines = browse._builtin_render(html).splitlines()
+    assert "hidden" not in "".join(lines)
+    assert len(lines) > 1
+    assert all(len(line) <= browse.DUMP_WIDTH for line in lines)
+
+
+def test__builtin_render__declared_charset__success() -> None:
+    html = b'<meta charset="iso-8859-1"><p>caf\xe9</p>'
+    assert "caf\u00e9" in browse._builtin_render(html)
+
+
+def test__main__builtin_renderer__skips_lynx_check__success(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    checked: list[tuple[str, ...]] = []
+    monkeypatch.setattr(browse, "ensure_dependencies", checked.append)
+    exit_code = browse.main(
+        stdin=[],
+        stdout=io.StringIO(),
+        stderr=io.StringIO(),
+        argv=["--renderer", "builtin"],
+    )
+    assert exit_code == 0
+    assert checked == [()]
+
+
+def test__caching_fetch__fresh_hit__success(
+    docs_server: str, caching_fetch: browse.CachingFetch
+) -> None:
+    assert caching_fetch(docs_server) == b"<p>docs</p>"
+    assert caching_fetch(docs_server) == b"<p>docs</p>"
+    assert len(_DocsHandler.requests) == 1
+
+
+def test__caching_fetch__stale_revalidates_304__success(
+    docs_server: str, caching_fetch: browse.CachingFetch, clock: _Clock
+) -> None:
+    caching_fetch(docs_server)
+    clock.now += 61
+    assert caching_fetch(docs_server) == b"<p>docs</p>"
+    assert len(_DocsHandler.requests) == 2
+    assert _DocsHandler.requests[1].get("If-None-Match") == '"v1"'
+
+
+def test__caching_fetch__no_store__success(
+    docs_server: str, caching_fetch: browse.CachingFetch, tmp_path: Path
+) -> None:
+    _DocsHandler.cache_control = "no-store"
+    try:
+        caching_fetch(docs_server)
+    finally:
+        _DocsHandler.cache_control = "max-age=60"
+    assert list(tmp_path.iterdir()) == []
+
+
+def test__http_cache__evicts_least_recently_used__success(
+    tmp_path: Path, clock: _Clock
+) -> None:
+    cache = browse.HttpCache(tmp_path, max_bytes=10, clock=clock)
+    headers = Message()
+    headers["Cache-Control"] = "max-age=60"
+    cache.store("https://a.example", b"123456", headers)
+    os.utime(next(tmp_path.glob("*.body")), (0, 0))
+    cache.store("https://b.example", b"abcdef", headers)
+    assert cache.lookup("https://a.example") is None
+    assert cache.lookup("https://b.example") is not None
+
+
+def test__http_cache__refresh_updates_validators__success(
+    tmp_path: Path, clock: _Clock
+) -> None:
+    cache = browse.HttpCache(tmp_path, clock=clock)
+    headers = Message()
+    headers["Last-Modified"] = "Mon, 01 Jan 2024 00:00:00 GMT"
+    cache.store("https://a.example", b"body", headers)
+    entry = cache.lookup("https://a.example")
+    assert entry is not None
+    not_modified = Message()
+    not_modified["Last-Modified"] = "Tue, 02 Jan 2024 00:00:00 GMT"
+    cache.refresh(entry, not_modified)
+    refreshed = cache.lookup("https://a.example")
+    assert refreshed is not None
+    assert refreshed.last_modified == "Tue, 02 Jan 2024 00:00:00 GMT"
+
+
+def test__http_cache__concurrent_writes_same_key__success(
+    tmp_path: Path, clock: _Clock
+) -> None:
+    cache = browse.HttpCache(tmp_path, clock=clock)
+    headers = Message()
+    headers["Cache-Control"] = "max-age=60"
+    errors: list[BaseException] = []
+
+    def write(n: int) -> None:
+        try:
+            for _ in range(50):
+                cache.store("https://a.example", str(n).encode() * 100, headers)
+        except BaseException as exc:  # noqa: BLE001 - collected for the assert
+            errors.append(exc)
+
+    threads = [threading.Thread(target=write, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert not list(tmp_path.glob("*.tmp"))
+    assert len(cache.body("https://a.example")) == 100
+
+
+def test__render_cache__identical_payload__success() -> None:
+    calls: list[bytes] = []
+
+    def fake_render(payload: bytes) -> str:
+        calls.append(payload)
+        return "text\n"
+
+    render = browse.RenderCache(fake_render, "fake")
+    assert [render(b"<p>a</p>"), render(b"<p>a</p>")] == ["text\n", "text\n"]
+    assert (len(calls), render.hits, render.misses) == (1, 1, 1)
+
+
+def test__render_cache__lru_eviction__success() -> None:
+    render = browse.RenderCache(lambda payload: payload.decode(), "echo", 2)
+    for payload in (b"a", b"b", b"a", b"c", b"b"):
+        render(payload)
+    assert (render.hits, render.misses) == (1, 4)
+
+
+def test__main__stats_summary__success(monkeypatch: pytest.MonkeyPatch) -> None:
+    stderr = io.StringIO()
+    monkeypatch.setattr(browse, "ensure_dependencies", lambda *_: None)
+    monkeypatch.setattr(browse, "_default_fetch", lambda _, **__: b"<p>same</p>")
+    stdin = ["https://a.example", "https://mirror.example"]
+    argv = ["--renderer", "builtin", "--stats"]
+    browse.main(stdin=stdin, stdout=io.StringIO(), stderr=stderr, argv=argv)
+    assert "render cache: 1 hits, 1 misses" in stderr.getvalue()
+
+
+def _chunked(payload: bytes, size: int) -> Iterator[bytes]:
+    for start in range(0, len(payload), size):
+        yield payload[start : start + size]
+
+
+def test__builtin_render_stream__matches_full_render__success() -> None:
+    html = b"<h1>T</h1><ul><li>a</li></ul><p>x <a href='/y'>y</a></p><pre> p\n q</pre>"
+    streamed = list(browse._builtin_render_stream(_chunked(html, 7)))
+    assert "\n".join(streamed) + "\n" == browse._builtin_render(html)
+
+
+def test__builtin_render_stream__yields_before_body_ends__success() -> None:
+    pulled: list[int] = []
+
+    def endless_paragraphs() -> Iterator[bytes]:
+        for index in range(10_000):
+            pulled.append(index)
+            yield b"<p>" + b"x" * 4096 + b"</p>"
+
+    first = next(browse._builtin_render_stream(endless_paragraphs()))
+    assert first.strip().startswith("x")
+    assert len(pulled) < 10
+
+
+def test__stream_browse__truncates_at_max_bytes__success() -> None:
+    stdout = io.StringIO()
+    options = browse.StreamOptions(
+        fetch_stream=lambda _: _chunked(b"<p>abcdef</p><p>ghij</p>", 4),
+        render_stream=browse._builtin_render_stream,
+        max_bytes=10,
+    )
+    exit_code = browse.stream_browse(
+        ["https://example.com"], stdout, io.StringIO(), options
+    )
+    written = stdout.getvalue()
+    assert exit_code == 0
+    assert "abcdef" in written and "ghij" not in written
+    assert "[truncated after 10 bytes]" in written
+
+
+def test__stream_browse__fetch_error__fail() -> None:
+    def failing_stream(url: str) -> Iterator[bytes]:
+        raise error.URLError("offline")
+        yield b""
+
+    stdout, stderr = io.StringIO(), io.StringIO()
+    options = browse.StreamOptions(fetch_stream=failing_stream)
+    exit_code = browse.stream_browse(["https://example.com"], stdout, stderr, options)
+    assert exit_code == 1
+    assert stdout.getvalue() == ""
+    assert "offline" in stderr.getvalue()
+
+
+def test__stream_browse__dropped_mid_body__fail() -> None:
+    def dropping_stream(url: str) -> Iterator[bytes]:
+        if "dropped" not in url:
+            yield b"<p>next</p>"
+            return
+        yield b"<p>start</p>"
+        raise IncompleteRead(b"", 100)
+
+    stdout, stderr = io.StringIO(), io.StringIO()
+    options = browse.StreamOptions(
+        fetch_stream=dropping_stream, render_stream=browse._builtin_render_stream
+    )
+    exit_code = browse.stream_browse(
+        ["https://example.com/dropped", "https://example.com/next"],
+        stdout,
+        stderr,
+        options,
+    )
+    assert exit_code == 1
+    assert stderr.getvalue().startswith(
+        "Error: failed to fetch 'https://example.com/dropped': IncompleteRead"
+    )
+    assert "next" in stdout.getvalue()
+
+
+def test__main__stream_uses_url_timeout__success(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    timeouts: list[float] = []
+
+    def fake_urlopen(url: str, timeout: float) -> object:
+        timeouts.append(timeout)
+        raise error.URLError("offline")
+
+    monkeypatch.setattr(browse.request, "urlopen", fake_urlopen)
+    exit_code = browse.main(
+        stdin=["https://example.com"],
+        stdout=io.StringIO(),
+        stderr=io.StringIO(),
+        argv=["--stream", "--renderer", "builtin", "--url-timeout", "2.5"],
+    )
+    assert exit_code == 1
+    assert timeouts == [2.5]
+
+
+@pytest.mark.parametrize(
+    "content_type,head,expected",
+    [
+        ("text/html; charset=utf-8", b"<html>", browse.ContentKind.HTML),
+        ("text/plain", b"just text", browse.ContentKind.TEXT),
+        ("application/problem+json", b"{}", browse.ContentKind.JSON),
+        ("", b"  [1, 2]", browse.ContentKind.JSON),
+        ("image/png", b"", browse.ContentKind.BINARY),
+        ("text/html", b"%PDF-1.7", browse.ContentKind.BINARY),
+        ("application/octet-stream", b"<p>hi</p>", browse.ContentKind.HTML),
+    ],
+)
+def test__content_kind__success(
+    content_type: str, head: bytes, expected: browse.ContentKind
+) -> None:
+    assert browse.content_kind(content_type, head) is expected
+
+
+def test__browse_outcomes__json_pretty_printed__success() -> None:
+    def fake_fetch(_: str) -> bytes:
+        return browse.Payload(b'{"a": [1, 2]}', "application/json")
+
+    def fail_render(_: bytes) -> str:
+        raise AssertionError("renderer must not run for JSON")
+
+    outcome = next(
+        browse.browse_outcomes(
+            ["https://api.example"], fetch=fake_fetch, render=fail_render
+        )
+    )
+    assert outcome.output == '{\n  "a": [\n    1,\n    2\n  ]\n}\n'
+
+
+def test__browse_outcomes__plain_text_passthrough__success() -> None:
+    def fake_fetch(_: str) -> bytes:
+        return browse.Payload(
+            "caf\u00e9 <b>".encode("latin-1"), "text/plain; charset=latin-1"
+        )
+
+    outcome = next(browse.browse_outcomes(["https://t.example"], fetch=fake_fetch))
+    assert outcome.output == "caf\u00e9 <b>"
+
+
+def test__default_fetch__binary_content_type__fail(docs_server: str) -> None:
+    _DocsHandler.content_type = "application/pdf"
+    _DocsHandler.body = b"%PDF-1.7" + b"\0" * 100_000
+    outcome = next(browse.browse_outcomes([docs_server]))
+    assert (
+        outcome.error
+        == f"Error: unsupported content type 'application/pdf' for '{docs_server}'"
+    )
+
+
+def test__stream_browse__sniffed_binary__fail() -> None:
+    stdout, stderr = io.StringIO(), io.StringIO()
+    options = browse.StreamOptions(
+        fetch_stream=lambda _: iter([browse.Payload(b"\x89PNG\r\n", "text/html")])
+    )
+    exit_code = browse.stream_browse(["https://img.example"], stdout, stderr, options)
+    assert exit_code == 1
+    assert stdout.getvalue() == ""
+    assert "unsupported binary content (served as text/html)" in stderr.getvalue()
+
+
+@pytest.fixture()
+def release() -> Iterator[threading.Event]:
+    event = threading.Event()
+    yield event
+    event.set()
+
+
+def _gated_fetch(release: threading.Event) -> browse.Fetch:
+    def fetch(url: str) -> bytes:
+        if "slow" in url:
+            release.wait(5)
+        return b"<p>ok</p>"
+
+    return fetch
+
+
+def _collect(**kwargs: object) -> list[browse.BrowseOutcome]:
+    async def gather() -> list[browse.BrowseOutcome]:
+        return [o async for o in browse.browse_outcomes_async(**kwargs)]  # type: ignore[arg-type]
+
+    return asyncio.run(gather())
+
+
+def test__browse_outcomes_async__per_url_timeout__fail(
+    release: threading.Event,
+) -> None:
+    outcomes = _collect(
+        stream=["https://slow.example", "https://fast.example"],
+        fetch=_gated_fetch(release),
+        render=lambda _: "ok\n",
+        url_timeout=0.1,
+    )
+    assert [o.url for o in outcomes] == ["https://slow.example", "https://fast.example"]
+    assert (
+        outcomes[0].error
+        == "Error: timed out after 0.1s fetching 'https://slow.example'"
+    )
+    assert outcomes[1].output == "ok\n"
+
+
+def test__browse_outcomes_async__global_deadline__fail(
+    release: threading.Event,
+) -> None:
+    started = time.monotonic()
+    outcomes = _collect(
+        stream=[
+            "https://fast.example",
+            "https://slow.example/1",
+            "https://slow.example/2",
+        ],
+        fetch=_gated_fetch(release),
+        render=lambda _: "ok\n",
+        deadline=0.2,
+        concurrency=1,
+    )
+    assert time.monotonic() - started < 1.0
+    assert not outcomes[0].is_error
+    assert [o.error for o in outcomes[1:]] == [
+        f"Error: deadline of 0.2s reached before '{url}' finished"
+        for url in ("https://slow.example/1", "https://slow.example/2")
+    ]
+
+
+def test__browse_outcomes_async__timed_out_fetch_frees_slot__success(
+    release: threading.Event,
+) -> None:
+    outcomes = _collect(
+        stream=["https://slow.example", "https://fast.example"],
+        fetch=_gated_fetch(release),
+        render=lambda _: "ok\n",
+        url_timeout=0.2,
+        concurrency=1,
+    )
+    assert outcomes[0].is_error
+    assert outcomes[1].output == "ok\n"
+
+
+def test__main__deadline_bounds_process_exit__success(tmp_path: Path) -> None:
+    script = tmp_path / "blocked.py"
+    script.write_text(
+        "import sys, time\n"
+        f"sys.path.insert(0, {str(Path(browse.__file__).parent)!r})\n"
+        "import browse\n"
+        "browse._default_fetch = lambda url, **_: time.sleep(30)\n"
+        "sys.exit(browse.main(stdin=['https://blackhole.example/'], "
+        "argv=['--renderer', 'builtin', '--deadline', '0.2']))\n"
+    )
+    started = time.monotonic()
+    result = subprocess.run(
+        [sys.executable, str(script)],
+        capture_output=True,
+        text=True,
+        timeout=20,
+        check=False,
+    )
+    assert time.monotonic() - started < 5
+    assert result.returncode == 1
+    assert "deadline of 0.2s reached" in result.stderr
+
+
+@pytest.mark.parametrize(
+    "url,expected",
+    [
+        ("http://Example.com", "https://example.com/"),
+        ("https://example.com:443/a#frag", "https://example.com/a"),
+        ("https://example.com/a?utm_source=x&b=2&a=1", "https://example.com/a?a=1&b=2"),
+        ("https://example.com:8443/a?fbclid=1", "https://example.com:8443/a"),
+    ],
+)
+def test__canonical_url__success(url: str, expected: str) -> None:
+    assert browse.canonical_url(url) == expected
+
+
+def test__coalescing_fetch__same_page_urls__success() -> None:
+    calls: list[str] = []
+
+    def fake_fetch(url: str) -> bytes:
+        calls.append(url)
+        return browse.Payload(b"<p>page</p>", "text/html", "https://example.com/final")
+
+    fetch = browse.CoalescingFetch(fake_fetch)
+    urls = [
+        "https://example.com/a",
+        "http://example.com/a?utm_medium=mail",
+        "https://example.com/final",
+    ]
+    outcomes = list(browse.browse_outcomes(urls, fetch=fetch, render=lambda _: "t"))
+    assert calls == ["https://example.com/a"]
+    assert [o.url for o in outcomes] == urls
+    assert (fetch.fetched, fetch.coalesced) == (1, 2)
+
+
+def test__coalescing_fetch__redirect_to_fetched_target__success(
+    docs_server: str,
+) -> None:
+    fetch = browse.CoalescingFetch()
+    short_url = docs_server.replace("/docs", "/short")
+    assert fetch(docs_server) == b"<p>docs</p>"
+    assert fetch(short_url) == b"<p>docs</p>"
+    assert [r["path"] for r in _DocsHandler.requests] == ["/docs", "/short"]
+
+
+def test__coalescing_fetch__inputs_redirecting_to_each_other__success() -> None:
+    both_started = threading.Barrier(2)
+    both_checked = threading.Barrier(2)
+    targets = {"https://a.example/": "https://b.example/"}
+    targets["https://b.example/"] = "https://a.example/"
+
+    def redirecting_fetch(url: str) -> bytes:
+        both_started.wait(timeout=5)
+        target = targets[url]
+        known = fetch._is_known_target(browse.canonical_url(target))
+        both_checked.wait(timeout=5)
+        if known:
+            raise browse._KnownRedirect(browse.canonical_url(target))
+        return b"<p>page</p>"
+
+    fetch = browse.CoalescingFetch(redirecting_fetch)
+    results: list[bytes] = []
+    threads = [
+        threading.Thread(target=lambda u=url: results.append(fetch(u)), daemon=True)
+        for url in targets
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+    assert results == [b"<p>page</p>"] * 2
+
+
+def _timed_fetch(starts: dict[str, float], hold: float) -> browse.Fetch:
+    def fetch(url: str) -> bytes:
+        starts[url] = time.monotonic()
+        time.sleep(hold)
+        return b"<p>ok</p>"
+
+    return fetch
+
+
+def test__host_scheduler__min_delay_spacing__success() -> None:
+    starts: dict[str, float] = {}
+    urls = [f"https://docs.example/{n}" for n in range(3)]
+    _collect(
+        stream=urls,
+        fetch=_timed_fetch(starts, 0.0),
+        render=lambda _: "ok",
+        scheduler=browse.HostScheduler(per_host=3, min_delay=0.05),
+    )
+    times = [starts[url] for url in urls]
+    assert all(b - a >= 0.045 for a, b in pairwise(times))
+
+
+def test__host_scheduler__other_hosts_not_blocked__success() -> None:
+    starts: dict[str, float] = {}
+    urls = [*(f"https://busy.example/{n}" for n in range(4)), "https://quiet.example/"]
+    _collect(
+        stream=urls,
+        fetch=_timed_fetch(starts, 0.05),
+        render=lambda _: "ok",
+        concurrency=2,
+        scheduler=browse.HostScheduler(per_host=1),
+    )
+    assert starts["https://quiet.example/"] < starts["https://busy.example/1"]
+
+
+def test__robots_crawl_delay__success(docs_server: str) -> None:
+    assert browse.robots_crawl_delay(docs_server) == 3.0
+
+
+_SITE_PAGES = {
+    "https://site.example/": (
+        "<a href='/a'>a</a><a href='https://www.site.example/b#top'>b</a>"
+        "<a href='https://other.example/'>off</a><a href='mailto:x@y'>mail</a>"
+    ),
+    "https://site.example/a": "<a href='/'>home</a><a href='/a/deep'>deep</a>",
+    "https://www.site.example/b#top": "<a href='/a'>a</a>",
+    "https://site.example/a/deep": "<a href='/a/deeper'>deeper</a>",
+}
+
+
+def _site_fetch(calls: list[str]) -> browse.Fetch:
+    def fetch(url: str) -> bytes:
+        calls.append(url)
+        return browse.Payload(_SITE_PAGES[url].encode(), "text/html", url)
+
+    return fetch
+
+
+def _crawl(limits: browse.CrawlLimits, calls: list[str]) -> list[browse.BrowseOutcome]:
+    async def gather() -> list[browse.BrowseOutcome]:
+        crawl = browse.crawl_outcomes_async(
+            ["https://site.example/", "ftp://site.example/"],
+            fetch=_site_fetch(calls),
+            render=lambda _: "page\n",
+            limits=limits,
+            concurrency=2,
+        )
+        return [o async for o in crawl]
+
+    return asyncio.run(gather())
+
+
+def test__extract_links__resolves_relative_http_links__success() -> None:
+    links = browse.extract_links(
+        _SITE_PAGES["https://site.example/"].encode(), "https://site.example/"
+    )
+    assert links == [
+        "https://site.example/a",
+        "https://www.site.example/b#top",
+        "https://other.example/",
+    ]
+
+
+def test__crawl_outcomes_async__depth_limit_same_site__success() -> None:
+    calls: list[str] = []
+    outcomes = _crawl(browse.CrawlLimits(max_depth=1), calls)
+    assert outcomes[0].error == (
+        "Error: unsupported URL 'ftp://site.example/'. Provide an http(s) URL."
+    )
+    assert sorted(calls) == [
+        "https://site.example/",
+        "https://site.example/a",
+        "https://www.site.example/b#top",
+    ]
+    assert all(o.output == "page\n" for o in outcomes[1:])
+
+
+def test__crawl_outcomes_async__page_limit__success() -> None:
+    calls: list[str] = []
+    _crawl(browse.CrawlLimits(max_depth=5, max_pages=2), calls)
+    assert len(calls) == 2
+
+
+def test__crawl_outcomes_async__global_deadline__fail() -> None:
+    calls: list[str] = []
+    site_fetch = _site_fetch(calls)
+
+    def slow_fetch(url: str) -> bytes:
+        if url != "https://site.example/":
+            time.sleep(5)
+        return site_fetch(url)
+
+    async def gather() -> list[browse.BrowseOutcome]:
+        crawl = browse.crawl_outcomes_async(
+            ["https://site.example/"],
+            fetch=slow_fetch,
+            render=lambda _: "page\n",
+            deadline=0.3,
+            concurrency=2,
+        )
+        return [o async for o in crawl]
+
+    started = time.monotonic()
+    outcomes = asyncio.run(gather())
+    assert time.monotonic() - started < 2
+    assert outcomes[0].output == "page\n"
+    assert sorted(o.error or "" for o in outcomes[1:]) == [
+        f"Error: deadline of 0.3s reached before '{url}' finished"
+        for url in ["https://site.example/a", "https://www.site.example/b#top"]
+    ]
+
+
+def test__bloom_filter__membership__success() -> None:
+    seen = browse.BloomFilter(1_000)
+    urls = [f"https://site.example/{n}" for n in range(1_000)]
+    for url in urls:
+        seen.add(url)
+    assert all(url in seen for url in urls)
+    misses = sum(f"https://other.example/{n}" in seen for n in range(1_000))
+    assert misses < 20
+
+
+def test__watch_outcomes__reports_changes_as_diff__success() -> None:
+    bodies = iter(["one\ntwo\n", "one\ntwo\n", "one\nthree\n"])
+    pauses: list[float] = []
+    outcomes = list(
+        browse.watch_outcomes(
+            ["https://status.example/"],
+            fetch_factory=lambda: lambda _: b"<p>status</p>",
+            render=lambda _: next(bodies),
+            interval=30.0,
+            cycles=3,
+            diff=True,
+            sleep=pauses.append,
+        )
+    )
+    expected_diff = (
+        "--- https://status.example/ (before)\n"
+        "+++ https://status.example/ (after)\n"
+        "@@ -1,2 +1,2 @@\n"
+        " one\n"
+        "-two\n"
+        "+three\n"
+    )
+    assert len(pauses) == 2
+    assert [o.output for o in outcomes] == ["one\ntwo\n", expected_diff]
+
+
+def test__watch_outcomes__recovery_after_error_is_unchanged__success() -> None:
+    bodies = iter([b"<p>one</p>", None, b"<p>one</p>", b"<p>two</p>"])
+
+    def fetch_factory() -> browse.Fetch:
+        body = next(bodies)
+
+        def fetch(url: str) -> bytes:
+            if body is None:
+                raise error.URLError("offline")
+            return body
+
+        return fetch
+
+    outcomes = list(
+        browse.watch_outcomes(
+            ["https://status.example/"],
+            fetch_factory=fetch_factory,
+            render=lambda payload: payload.decode(),
+            interval=0.0,
+            cycles=4,
+            diff=True,
+            sleep=lambda _: None,
+        )
+    )
+    assert [(o.output, o.is_error) for o in outcomes] == [
+        ("<p>one</p>", False),
+        (None, True),
+        (
+            "--- https://status.example/ (before)\n"
+            "+++ https://status.example/ (after)\n"
+            "@@ -1 +1 @@\n"
+            "-<p>one</p>\n"
+            "+<p>two</p>\n",
+            False,
+        ),
+    ]
+
+
+def test__main__watch_revalidates_unchanged_page__success(
+    docs_server: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(_DocsHandler, "cache_control", "no-cache")
+    stdout = io.StringIO()
+    argv = ["--renderer", "builtin", "--watch", "0", "--cycles", "2"]
+    exit_code = browse.main([docs_server], stdout, io.StringIO(), argv)
+    assert exit_code == 0
+    assert stdout.getvalue().count("URL: ") == 1
+    assert _DocsHandler.requests[1]["If-None-Match"] == '"v1"'
+
+
+@pytest.mark.parametrize(
+    "extra",
+    [
+        ["--crawl"],
+        ["--concurrency", "4"],
+        ["--per-host", "4"],
+        ["--crawl", "--deadline", "5"],
+    ],
+)
+def test__main__watch_rejects_ignored_options__fail(
+    extra: list[str], capsys: pytest.CaptureFixture[str]
+) -> None:
+    argv = ["--renderer", "builtin", "--watch", "1", *extra]
+    with pytest.raises(SystemExit) as exc_info:
+        browse.main([], io.StringIO(), io.StringIO(), argv)
+    assert exc_info.value.code == 2
+    flags = " ".join(e for e in extra if e.startswith("--"))
+    assert f"--watch cannot be combined with {flags.replace(' ', ', ')}" in (
+        capsys.readouterr().err
+    )
+
+
+@pytest.mark.parametrize(
+    "argv",
+    [
+        ["--stream", "--replay", "run.warc.gz"],
+        ["--resume", "--condensed"],
+        ["--stream", "--concurrency", "4"],
+    ],
+)
+def test__main__stream_rejects_ignored_options__fail(
+    argv: list[str], capsys: pytest.CaptureFixture[str]
+) -> None:
+    with pytest.raises(SystemExit) as exc_info:
+        browse.main([], io.StringIO(), io.StringIO(), ["--renderer", "builtin", *argv])
+    assert exc_info.value.code == 2
+    assert f"{argv[0]} cannot be combined with {argv[1]}" in capsys.readouterr().err
+
+
+def test__archive__replays_payload_and_headers__success(tmp_path: Path) -> None:
+    archive = tmp_path / "run.warc.gz"
+    pages = {
+        "https://example.com/a": browse.Payload(
+            b"<p>a</p>",
+            "text/html; charset=utf-8",
+            "https://example.com/a/",
+            (("Content-Type", "text/html; charset=utf-8"), ("ETag", '"a1"')),
+        ),
+        "https://example.com/b": browse.Payload(b'{"b": 1}', "application/json"),
+    }
+    recording = browse.ArchivingFetch(browse.ArchiveWriter(archive), pages.__getitem__)
+    for url in pages:
+        recording(url)
+
+    replay = browse.ArchiveFetch(archive)
+    first = replay("http://example.com/a/?utm_source=feed")
+    assert first == b"<p>a</p>"
+    assert isinstance(first, browse.Payload)
+    assert (first.content_type, first.final_url) == (
+        "text/html; charset=utf-8",
+        "https://example.com/a/",
+    )
+    assert ("ETag", '"a1"') in first.headers
+    second = replay("https://example.com/b")
+    assert isinstance(second, browse.Payload)
+    assert (second, second.content_type) == (b'{"b": 1}', "application/json")
+    assert gzip.decompress(archive.read_bytes()).count(b"WARC/1.1\r\n") == 2
+
+
+def test__archive_fetch__missing_url__fail(tmp_path: Path) -> None:
+    archive = tmp_path / "run.warc.gz"
+    browse.ArchiveWriter(archive).append("https://example.com/", b"<p>x</p>")
+    outcomes = list(
+        browse.browse_outcomes(
+            ["https://example.com/", "https://example.com/missing"],
+            fetch=browse.ArchiveFetch(archive),
+            render=lambda _: "x\n",
+        )
+    )
+    assert outcomes[0].output == "x\n"
+    assert outcomes[1].error == (
+        f"Error: 'https://example.com/missing' is not in archive '{archive}'"
+    )
+
+
+_CHROME_PAGE = b"""<html><body>
+<header><a href="/">Home</a></header><nav><a href="/a">A</a></nav>
+<main><h1>Title</h1><p>Body <a href="/x">x</a> and again <a href="/x">x</a>.</p>
+<div class="share-buttons"><a href="/tw">tw</a></div><p>Second para.</p></main>
+<footer>(c) <a href="/legal">legal</a></footer></body></html>"""
+
+
+def test__condensed_render__main_content_dedupes_links__success() -> None:
+    render = browse.CondensedRender(browse._builtin_render)
+    assert render(_CHROME_PAGE) == (
+        "Title\n\n"
+        "   Body [1]x and again [1]x.\n\n"
+        "   Second para.\n\n"
+        "References\n\n"
+        "   1. /x\n"
+    )
+
+
+@pytest.mark.parametrize(
+    "page",
+    [
+        b'<body><p>Intro</p><img class="social-icon" src="t.png"><p>Rest</p></body>',
+        b'<body class="page has-sidebar"><p>Intro</p><p>Rest</p></body>',
+        b'<div role="main" class="content with-sidebar"><p>Intro</p><p>Rest</p></div>',
+    ],
+)
+def test__condensed_render__chrome_names_keep_content__success(page: bytes) -> None:
+    render = browse.CondensedRender(browse._builtin_render)
+    assert render(page) == "   Intro\n\n   Rest\n"
+
+
+@pytest.mark.parametrize(
+    "page, expected",
+    [
+        (
+            b'<ul><li class="menu-item">Home<li>X</ul><main><p>Article</p></main>',
+            "   Article\n",
+        ),
+        (b'<p class="share">Share<p>Article</p>', "   Article\n"),
+        (
+            b'<div><ul><li class="nav-link">Home</div><p>Article</p>',
+            "   Article\n",
+        ),
+    ],
+)
+def test__condensed_render__unclosed_chrome_ends_skip__success(
+    page: bytes, expected: str
+) -> None:
+    render = browse.CondensedRender(browse._builtin_render)
+    assert render(page) == expected
+
+
+def test__condense_text__budget_cuts_at_paragraph__success() -> None:
+    text = "\n".join(
+        [
+            "Heading",
+            "",
+            "   first [1]link",
+            "",
+            "   second [2]link",
+            *["   continued"] * 4,
+            "",
+            "References",
+            "",
+            "   1. https://a.example/",
+            "   2. https://b.example/",
+        ]
+    )
+    condensed = browse.condense_text(text, browse.OutputBudget(max_lines=10))
+    assert condensed == (
+        "Heading\n\n"
+        "   first [1]link\n\n"
+        "[condensed: 6 more lines omitted]\n\n"
+        "References\n\n"
+        "   1. https://a.example/\n"
+    )
+    assert len(browse.condense_text(text, browse.OutputBudget(max_bytes=60))) <= 60
+
+
+@pytest.mark.parametrize(
+    "budget, expected",
+    [
+        (browse.OutputBudget(max_lines=2), "[condensed: 3 more lines omitted]\n"),
+        (
+            browse.OutputBudget(max_bytes=60),
+            "   one two three four\n\n[condensed: 3 more lines omitted]\n",
+        ),
+        (browse.OutputBudget(max_bytes=30), ""),
+    ],
+)
+def test__condense_text__note_counts_against_budget__success(
+    budget: browse.OutputBudget, expected: str
+) -> None:
+    text = "   one two three four five six seven eight nine ten\n\n   tail"
+    condensed = browse.condense_text(text, budget)
+    assert condensed == expected
+    assert budget.fits(condensed.splitlines())
+
+
+class _FlakyRangeHandler(BaseHTTPRequestHandler):
+    body = b"<p>" + b"resumable " * 20_000 + b"</p>"
+    etag = '"big-1"'
+    requests: ClassVar[list[dict[str, str]]] = []
+
+    def do_GET(self) -> None:
+        type(self).requests.append(dict(self.headers))
+        range_header = self.headers.get("Range", "")
+        if range_header and self.headers.get("If-Range") == self.etag:
+            start = int(range_header.removeprefix("bytes=").rstrip("-"))
+            self.send_response(206)
+            self.send_header(
+                "Content-Range", f"bytes {start}-{len(self.body) - 1}/{len(self.body)}"
+            )
+            self._send_body(self.body[start:], complete=True)
+            return
+        self.send_response(200)
+        self._send_body(self.body, complete=len(type(self).requests) > 1)
+
+    def _send_body(self, data: bytes, complete: bool) -> None:
+        self.send_header("ETag", self.etag)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data if complete else data[: len(data) // 2])
+        self.close_connection = True
+
+    def log_message(self, *_: object) -> None:
+        return
+
+
+@pytest.fixture()
+def flaky_server() -> Iterator[str]:
+    _FlakyRangeHandler.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FlakyRangeHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/big"
+    server.shutdown()
+    server.server_close()
+
+
+def test__resumable_fetch_stream__resumes_with_range__success(
+    flaky_server: str,
+) -> None:
+    fetch_stream = browse.ResumableFetchStream(backoff=0.0)
+    chunks = list(fetch_stream(flaky_server))
+    assert b"".join(chunks) == _FlakyRangeHandler.body
+    assert isinstance(chunks[0], browse.Payload)
+    assert chunks[0].content_type == "text/html"
+    resumed = _FlakyRangeHandler.requests[1]
+    half = len(_FlakyRangeHandler.body) // 2
+    assert (resumed["Range"], resumed["If-Range"]) == (f"bytes={half}-", '"big-1"')
+    assert fetch_stream.resumed == 1
+
+
+def test__main__resume_renders_from_spool__success(flaky_server: str) -> None:
+    stdout = io.StringIO()
+    argv = ["--renderer", "builtin", "--resume", "--resume-attempts", "2"]
+    exit_code = browse.main([flaky_server], stdout, io.StringIO(), argv)
+    assert exit_code == 0
+    assert stdout.getvalue().startswith(f"URL: {flaky_server}\n   resumable")
+    assert stdout.getvalue().rstrip().endswith("resumable")
+
+
+class _DroppingHandler(_FlakyRangeHandler):
+    def do_GET(self) -> None:
+        type(self).requests.append(dict(self.headers))
+        self.send_response(200)
+        self._send_body(self.body, complete=False)
+
+
+def test__main__resume_every_attempt_fails__fail(docs_server: str) -> None:
+    _DroppingHandler.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _DroppingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/big"
+    stdout, stderr = io.StringIO(), io.StringIO()
+    argv = ["--renderer", "builtin", "--resume", "--resume-attempts", "2"]
+    try:
+        exit_code = browse.main([url, docs_server], stdout, stderr, argv)
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert exit_code == 1
+    assert len(_DroppingHandler.requests) == 2
+    assert stderr.getvalue().startswith(f"Error: failed to fetch '{url}': ")
+    assert stdout.getvalue() == f"URL: {docs_server}\n   docs\n\n"
+
+
+def test__main__bare_render_workers_uses_async_engine__success(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    seen: dict[str, object] = {}
+
+    async def fake_outcomes(
+        _: object, **kwargs: object
+    ) -> AsyncIterator[browse.BrowseOutcome]:
+        seen.update(kwargs)
+        yield browse.BrowseOutcome("https://example.com", "text\n", None)
+
+    monkeypatch.setattr(browse, "ensure_dependencies", lambda *_: None)
+    monkeypatch.setattr(browse.os, "cpu_count", lambda: 4)
+    monkeypatch.setattr(browse, "browse_outcomes_async", fake_outcomes)
+
+    exit_code = browse.main(
+        stdin=[], stdout=io.StringIO(), stderr=io.StringIO(), argv=["--render-workers"]
+    )
+    assert exit_code == 0
+    assert seen["concurrency"] == 4
+
+
+def test__render_pool__matches_in_process_render__success() -> None:
+    pages = [
+        f"<p>page {n} with <a href='/{n}'>a link</a></p>".encode() for n in range(4)
+    ]
+    with browse.RenderPool("builtin", workers=2) as pool:
+        rendered = list(
+            browse.browse_outcomes(
+                [f"https://pool.example/{n}" for n in range(4)],
+                fetch=lambda url: pages[int(url.rsplit("/", 1)[1])],
+                render=pool,
+            )
+        )
+    assert [o.output for o in rendered] == [browse._builtin_render(p) for p in pages]
+    assert pool.summary().startswith("render pool: 2 workers, 4 pages, ")
+    assert 0.0 < pool.utilisation() <= 1.0
@@ -1,9 +1,15 @@
 #!/usr/bin/env python3
+import asyncio
+import io
+import random
 import sys
+import time
+import tracemalloc
 import pytest
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import date, timedelta
-from typing import List, Optional, Iterable
+from typing import Any, List, Optional, Iterable
 
 # --- Setup Import Path for Script ---
 SCRIPT_DIR = Path(__file__).parent.parent
@@ -372,3 +378,574 @@ def test__consensus__grouping_determinism__success(
         str(base_date),
         str(base_date + timedelta(days=1)),
     )
+
+
+# --- ConsensusEngine Tests: Columnar Engine ---
+
+
+def _random_daily_list(base: date, seed: int) -> list[get_weather.DailyData]:
+    """Create seeded mixed data with gaps, ties and outliers over 14 days."""
+    rng = random.Random(seed)
+
+    def maybe(value: Any) -> Any:
+        return None if rng.random() < 0.25 else value
+
+    return [
+        mk_daily(
+            base + timedelta(days=rng.randrange(14)),
+            src=rng.choice(["A", "B", "C", "D"]),
+            min_t=maybe(rng.choice([10.0, 12.5, 11.0, 40.0])),
+            max_t=maybe(rng.uniform(20, 35) if rng.random() > 0.1 else 90.0),
+            min_w=maybe(rng.uniform(0, 10)),
+            max_w=maybe(rng.uniform(10, 40)),
+            w_dir=maybe(rng.choice(["N", "SW", "E", "NE"])),
+            prog=maybe(rng.choice(["CLEAR", "RAIN", "STORM", "CLOUDY", "UNKNOWN"])),
+            rain_p=maybe(rng.uniform(0, 100)),
+        )
+        for _ in range(rng.randrange(1, 80))
+    ]
+
+
+@pytest.mark.parametrize("estimator", list(get_weather.RobustEstimator))
+@pytest.mark.parametrize("seed", range(20))
+def test__consensus__columnar_engine_matches_python__success(
+    window_stub: ForecastWindowStub,
+    base_date: date,
+    seed: int,
+    estimator: get_weather.RobustEstimator,  # type: ignore
+) -> None:
+    """Ensure the columnar engine produces the same forecasts as the Python path."""
+    data = _random_daily_list(base_date, seed)
+    policy = get_weather.ConsensusPolicy(estimator=estimator)
+    expected = get_weather.calculate_consensus(window_stub, data, policy, "X")
+    actual = get_weather.calculate_consensus(
+        window_stub, data, policy, "X", engine=get_weather.ConsensusEngine.COLUMNAR
+    )
+    assert [vars(f) for f in actual] == [
+        {k: pytest.approx(v) if isinstance(v, float) else v for k, v in vars(f).items()}
+        for f in expected
+    ]
+
+
+def test__consensus__columnar_engine_sources_from_any_field__success(
+    window_stub: ForecastWindowStub, base_date: date
+) -> None:
+    """Ensure a record counts as a source when any one field is present."""
+    data = [
+        mk_empty_daily(base_date, "Empty"),
+        mk_daily(base_date, "Dir", None, None, None, None, "N", None, None),
+        mk_daily(base_date, "Prog", None, None, None, None, None, "RAIN", None),
+        mk_daily(base_date, "Rain", None, None, None, None, None, None, 40.0),
+    ]
+    actual = get_weather.calculate_consensus(
+        window_stub,
+        data,
+        get_weather.ConsensusPolicy(),
+        "X",
+        engine=get_weather.ConsensusEngine.COLUMNAR,
+    )
+    assert [f.sources for f in actual] == [["Dir", "Prog", "Rain"]]
+
+
+@pytest.mark.parametrize(
+    "estimator, max_temps, expected",
+    [
+        ("sigma_clip", [20, 21, 22, 23, 40], 21.5),
+        ("median_mad", [20, 21, 22, 23, 40], 21.5),
+        ("trimmed_mean", [20, 21, 22, 23, 40], 22.0),
+        ("median_mad", [20, 20, 20, 35], 20.0),
+        ("trimmed_mean", [20, 26], 23.0),
+        ("trimmed_mean", [20, 21, 40], 21.0),
+        ("trimmed_mean", [20, 21, 22, 40], 21.5),
+    ],
+)
+def test__consensus__robust_estimators__success(
+    window_stub: ForecastWindowStub,
+    base_date: date,
+    estimator: str,
+    max_temps: list[float],
+    expected: float,
+) -> None:
+    """Ensure each estimator gives its robust mean in every consensus path."""
+    policy = get_weather.ConsensusPolicy(
+        estimator=get_weather.RobustEstimator(estimator)
+    )
+    data = [mk_daily(base_date, f"S{n}", max_t=t) for n, t in enumerate(max_temps)]
+    result = get_weather.calculate_consensus(window_stub, data, policy, "X")
+    assert result[0].max_temp == pytest.approx(expected)
+    columnar = get_weather.calculate_consensus(
+        window_stub, data, policy, "X", engine=get_weather.ConsensusEngine.COLUMNAR
+    )
+    assert columnar[0].max_temp == pytest.approx(expected)
+    accumulator = get_weather.ConsensusAccumulator(window_stub, policy, "X")
+    accumulator.extend(data)
+    assert accumulator.forecasts()[0].max_temp == pytest.approx(expected)
+
+
+@pytest.mark.parametrize(
+    "max_temps, expected",
+    [([20, 21, 40], 21.0), ([20, 21, 40, 41], 30.5)],
+)
+def test__consensus__trim_keeps_middle_values__success(
+    window_stub: ForecastWindowStub,
+    base_date: date,
+    max_temps: list[float],
+    expected: float,
+) -> None:
+    """Ensure a large trim_fraction still leaves at least one value."""
+    policy = get_weather.ConsensusPolicy(
+        estimator=get_weather.RobustEstimator.TRIMMED_MEAN, trim_fraction=0.45
+    )
+    data = [mk_daily(base_date, f"S{n}", max_t=t) for n, t in enumerate(max_temps)]
+    for engine in get_weather.ConsensusEngine:
+        result = get_weather.calculate_consensus(
+            window_stub, data, policy, "X", engine=engine
+        )
+        assert result[0].max_temp == pytest.approx(expected)
+
+
+def test__welford__count_mean_and_m2__success() -> None:
+    """Ensure one Welford pass yields the count, mean and squared deviations."""
+    count, mean, m2 = get_weather._welford((2.0, 4.0, 4.0, 4.0, 5.0, 5.0, 7.0, 9.0))
+    assert (count, mean, m2) == (8, pytest.approx(5.0), pytest.approx(32.0))
+
+
+def test__consensus_policy__invalid_trim__failure() -> None:
+    """Ensure a trim that would discard every value is rejected."""
+    with pytest.raises(ValueError, match="trim_fraction"):
+        get_weather.ConsensusPolicy(trim_fraction=0.5)
+
+
+def test__consensus_bulk__per_location_results__success(
+    window_stub: ForecastWindowStub, base_date: date
+) -> None:
+    """Ensure the bulk API returns each location's own consensus."""
+    policy = get_weather.ConsensusPolicy()
+    locations = {f"Loc{n}": _random_daily_list(base_date, seed=n) for n in range(9)}
+    results = dict(
+        get_weather.calculate_consensus_bulk(locations, window_stub, policy, workers=2)
+    )
+    assert results == {
+        name: get_weather.calculate_consensus(window_stub, data, policy, name)
+        for name, data in locations.items()
+    }
+
+
+def test__consensus_accumulator__provisional_then_final__success(
+    window_stub: ForecastWindowStub, base_date: date
+) -> None:
+    """Ensure records folded in any order converge on calculate_consensus."""
+    policy = get_weather.ConsensusPolicy()
+    data = _random_daily_list(base_date, seed=7)
+    random.Random(1).shuffle(data)
+    acc = get_weather.ConsensusAccumulator(
+        window_stub, policy, "X", expected_sources=["fast", "slow"]
+    )
+    half = len(data) // 2
+    acc.extend(data[:half])
+    acc.complete("fast")
+    assert not acc.is_final
+    assert sum(len(f.sources) for f in acc.forecasts()) <= half
+    acc.extend(data[half:])
+    acc.complete("slow")
+    assert acc.is_final
+    expected = get_weather.calculate_consensus(window_stub, data, policy, "X")
+    assert [vars(f) for f in acc.forecasts()] == [
+        {k: pytest.approx(v) if isinstance(v, float) else v for k, v in vars(f).items()}
+        for f in expected
+    ]
+
+
+def test__consensus_store__recomputes_only_changed_dates__success(
+    window_stub: ForecastWindowStub, base_date: date
+) -> None:
+    """Ensure a source refresh dirties only the dates whose records changed."""
+    policy = get_weather.ConsensusPolicy()
+    store = get_weather.ConsensusStore(window_stub, policy)
+    bom = mk_daily_list(base_date, {"src": "BOM"}, {"src": "BOM", "offset": 1})
+    meteo = mk_daily_list(
+        base_date, {"src": "OM", "max_t": 32}, {"src": "OM", "offset": 2}
+    )
+    store.replace_source("Aspendale", "BOM", bom)
+    store.replace_source("Aspendale", "OM", meteo)
+    assert len(store.take_dirty()) == 3
+
+    refreshed = [meteo[0], mk_daily(base_date + timedelta(days=3), "OM")]
+    assert store.replace_source("Aspendale", "OM", refreshed) == [
+        base_date + timedelta(days=2),
+        base_date + timedelta(days=3),
+    ]
+    assert store.take_dirty() == [
+        ("Aspendale", base_date + timedelta(days=2)),
+        ("Aspendale", base_date + timedelta(days=3)),
+    ]
+    assert store.replace_source("Aspendale", "OM", refreshed) == []
+    assert store.forecasts("Aspendale") == get_weather.calculate_consensus(
+        window_stub, bom + refreshed, policy, "Aspendale"
+    )
+
+
+# --- ProviderRunner Tests: Budgets, Retries & Deadline ---
+
+
+class StubProvider:
+    """Local provider that injects latency and failures before returning data."""
+
+    capabilities = get_weather.ProviderCapabilities(
+        is_forecast=True, max_horizon_days=7
+    )
+
+    def __init__(
+        self,
+        name: str,
+        records: list[get_weather.DailyData],
+        latency: float = 0.0,
+        failures: int = 0,
+    ) -> None:
+        self.name = name
+        self.records = records
+        self.latency = latency
+        self.failures = failures
+        self.budgets: list[float] = []
+
+    async def fetch(self, loc, window, remaining_budget: float):  # type: ignore
+        self.budgets.append(remaining_budget)
+        await asyncio.sleep(self.latency)
+        if len(self.budgets) <= self.failures:
+            raise ConnectionError(f"{self.name} flaked")
+        return self.records
+
+
+@pytest.fixture
+def location() -> get_weather.LocationInfo:  # type: ignore
+    return get_weather.LocationInfo(
+        "Aspendale, VIC", -38.03, 145.1, "VIC", "Australia/Melbourne"
+    )
+
+
+def _runner(*providers: StubProvider, **limits: float) -> get_weather.ProviderRunner:  # type: ignore
+    policy = get_weather.RunnerPolicy(
+        **{"min_attempt_budget": 0.05, "backoff_base": 0.01, **limits}  # type: ignore
+    )
+    return get_weather.ProviderRunner(providers, policy, jitter=lambda: 0.5)
+
+
+def test__provider_runner__retries_and_budget_cutoff__success(
+    window_stub: ForecastWindowStub,
+    base_date: date,
+    location: get_weather.LocationInfo,  # type: ignore
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    """Ensure flaky providers are retried and a hung provider is cut at its budget."""
+    fast = StubProvider("fast", mk_daily_list(base_date, {"src": "fast"}))
+    flaky = StubProvider(
+        "flaky", mk_daily_list(base_date, {"src": "flaky"}), failures=2
+    )
+    hung = StubProvider("hung", mk_daily_list(base_date, {"src": "hung"}), latency=5)
+    runner = _runner(fast, flaky, hung, provider_budget=0.3, deadline=2.0)
+    started = time.monotonic()
+    forecasts = asyncio.run(
+        get_weather.run_consensus(
+            runner, location, window_stub, get_weather.ConsensusPolicy()
+        )
+    )
+    assert time.monotonic() - started < 1.0
+    assert forecasts[0].sources == ["fast", "flaky"]
+    assert len(flaky.budgets) == 3
+    assert len(hung.budgets) < 3
+    assert "hung: giving up" in capsys.readouterr().err
+
+
+def test__provider_runner__global_deadline_partial__success(
+    window_stub: ForecastWindowStub,
+    base_date: date,
+    location: get_weather.LocationInfo,  # type: ignore
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    """Ensure the global deadline cancels slow providers and keeps partials."""
+    fast = StubProvider("fast", mk_daily_list(base_date, {"src": "fast"}))
+    slow = StubProvider("slow", mk_daily_list(base_date, {"src": "slow"}), latency=5)
+    runner = _runner(fast, slow, provider_budget=10.0, deadline=0.2)
+    started = time.monotonic()
+    records = asyncio.run(runner.run(location, window_stub))
+    assert time.monotonic() - started < 0.5
+    assert [r.source for r in records] == ["fast"]
+    assert "slow: cancelled at the global deadline" in capsys.readouterr().err
+
+
+def test__provider_runner__stops_when_budget_below_minimum__success(
+    window_stub: ForecastWindowStub,
+    location: get_weather.LocationInfo,  # type: ignore
+) -> None:
+    """Ensure no attempt starts once the remaining budget is under the minimum."""
+    broken = StubProvider("broken", [], failures=99)
+    runner = _runner(broken, provider_budget=0.3, backoff_base=0.2, max_attempts=5)
+    assert asyncio.run(runner.run(location, window_stub)) == []
+    assert len(broken.budgets) == 2
+    assert all(b >= 0.05 for b in broken.budgets)
+
+
+def test__provider_runner__no_backoff_after_last_attempt__success(
+    window_stub: ForecastWindowStub,
+    location: get_weather.LocationInfo,  # type: ignore
+) -> None:
+    """Ensure the runner gives up at once when the final attempt fails."""
+    broken = StubProvider("broken", [], failures=99)
+    runner = _runner(broken, provider_budget=10.0, backoff_base=1.0, max_attempts=1)
+    started = time.monotonic()
+    assert asyncio.run(runner.run(location, window_stub)) == []
+    assert time.monotonic() - started < 0.5
+    assert len(broken.budgets) == 1
+
+
+def test__cached_provider__fresh_stale_and_expired__success(
+    tmp_path: Path,
+    window_stub: ForecastWindowStub,
+    base_date: date,
+    location: get_weather.LocationInfo,  # type: ignore
+) -> None:
+    """Ensure fresh hits skip the fetch and stale hits revalidate in the background."""
+    now = [1_000.0]
+    cache = get_weather.ProviderCache(
+        tmp_path, ttls={"BOM": 60.0}, max_stale=600.0, clock=lambda: now[0]
+    )
+    stub = StubProvider("BOM", mk_daily_list(base_date, {"src": "BOM", "prog": "RAIN"}))
+    provider = get_weather.CachedProvider(stub, cache)
+
+    async def fetch_and_drain() -> list[get_weather.DailyData]:
+        records = await provider.fetch(location, window_stub, 5.0)
+        await provider.drain()
+        return records
+
+    first = asyncio.run(fetch_and_drain())
+    now[0] += 30
+    assert asyncio.run(fetch_and_drain()) == first
+    assert len(stub.budgets) == 1
+
+    stub.records = mk_daily_list(base_date, {"src": "BOM", "max_t": 35})
+    now[0] += 60
+    assert asyncio.run(fetch_and_drain()) == first
+    assert len(stub.budgets) == 2
+    assert asyncio.run(fetch_and_drain()) == stub.records
+
+    now[0] += 1_000
+    stub.records = []
+    assert asyncio.run(fetch_and_drain()) == []
+    assert len(stub.budgets) == 3
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        "[]",
+        '{"records": []}',
+        '{"stored_at": "yesterday", "records": []}',
+        '{"stored_at": 0, "records": [{"date": "2025-12-25"}]}',
+        '{"stored_at": 0, "records": [{"date": "not a date"}]}',
+    ],
+)
+def test__provider_cache__malformed_entry_is_a_miss__success(
+    tmp_path: Path,
+    window_stub: ForecastWindowStub,
+    base_date: date,
+    location: get_weather.LocationInfo,  # type: ignore
+    content: str,
+) -> None:
+    """Ensure an unreadable cache entry is refetched instead of raising."""
+    cache = get_weather.ProviderCache(tmp_path, ttls={"BOM": 60.0})
+    cache.path("BOM", location, window_stub).write_text(content)
+    stub = StubProvider("BOM", mk_daily_list(base_date, {"src": "BOM"}))
+    provider = get_weather.CachedProvider(stub, cache)
+    assert asyncio.run(provider.fetch(location, window_stub, 5.0)) == stub.records
+    assert len(stub.budgets) == 1
+    assert cache.load("BOM", location, window_stub) is not None
+
+
+def test__cached_provider__empty_results_not_stored__success(
+    tmp_path: Path,
+    window_stub: ForecastWindowStub,
+    base_date: date,
+    location: get_weather.LocationInfo,  # type: ignore
+) -> None:
+    """Ensure empty fetches neither create nor overwrite cache entries."""
+    now = [1_000.0]
+    cache = get_weather.ProviderCache(
+        tmp_path, ttls={"BOM": 60.0}, max_stale=600.0, clock=lambda: now[0]
+    )
+    stub = StubProvider("BOM", [])
+    provider = get_weather.CachedProvider(stub, cache)
+    assert asyncio.run(provider.fetch(location, window_stub, 5.0)) == []
+    assert cache.load("BOM", location, window_stub) is None
+
+    stub.records = mk_daily_list(base_date, {"src": "BOM"})
+    kept = asyncio.run(provider.fetch(location, window_stub, 5.0))
+    stub.records = []
+    now[0] += 120
+
+    async def fetch_and_drain() -> list[get_weather.DailyData]:
+        records = await provider.fetch(location, window_stub, 5.0)
+        await provider.drain()
+        return records
+
+    assert asyncio.run(fetch_and_drain()) == kept
+    assert len(stub.budgets) == 3
+    assert cache.load("BOM", location, window_stub) == (kept, 120.0)
+
+
+def test__provider_cache__same_length_windows_are_distinct__success(
+    tmp_path: Path,
+    window_stub: ForecastWindowStub,
+    base_date: date,
+    location: get_weather.LocationInfo,  # type: ignore
+) -> None:
+    """Ensure windows of equal length starting on different days do not share entries."""
+    cache = get_weather.ProviderCache(tmp_path)
+    later = ForecastWindowStub(d + timedelta(days=1) for d in window_stub.dates)
+    records = mk_daily_list(base_date, {"src": "BOM"})
+    cache.store("BOM", location, window_stub, records)
+    paths = {cache.path("BOM", location, w) for w in (window_stub, later)}
+    assert len(paths) == 2
+    assert cache.load("BOM", location, later) is None
+    loaded = cache.load("BOM", location, window_stub)
+    assert loaded is not None and loaded[0] == records
+
+
+def test__provider_cache__concurrent_stores_same_key__success(
+    tmp_path: Path,
+    window_stub: ForecastWindowStub,
+    base_date: date,
+    location: get_weather.LocationInfo,  # type: ignore
+) -> None:
+    """Ensure concurrent writers of one entry do not share a temporary file."""
+    cache = get_weather.ProviderCache(tmp_path)
+    records = mk_daily_list(base_date, {"src": "BOM"})
+
+    def store(_: int) -> None:
+        for _ in range(50):
+            cache.store("BOM", location, window_stub, records)
+
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(store, range(8)))
+    assert not list(tmp_path.glob("*.tmp"))
+    loaded = cache.load("BOM", location, window_stub)
+    assert loaded is not None and loaded[0] == records
+
+
+def _random_stations(count: int, seed: int) -> list[get_weather.BomStation]:
+    rng = random.Random(seed)
+    return [
+        get_weather.BomStation(
+            f"{n:06d}", f"Station {n}", rng.uniform(-44, -10), rng.uniform(112, 154)
+        )
+        for n in range(count)
+    ]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test__station_index__matches_linear_scan__success(seed: int) -> None:
+    """Ensure KD-tree queries agree with a haversine scan over every station."""
+    stations = _random_stations(500, seed)
+    index = get_weather.StationIndex(stations)
+    rng = random.Random(seed + 100)
+    for _ in range(50):
+        lat, lon = rng.uniform(-44, -10), rng.uniform(112, 154)
+        scan = sorted(
+            (get_weather.haversine_km(lat, lon, s.lat, s.lon), s.station_id)
+            for s in stations
+        )
+        nearest = index.nearest(lat, lon, k=5)
+        assert [s.station_id for s, _ in nearest] == [sid for _, sid in scan[:5]]
+        within = index.within(lat, lon, 150.0)
+        assert [s.station_id for s, _ in within] == [
+            sid for km, sid in scan if km <= 150.0
+        ]
+        selected = index.select(lat, lon)
+        expected = scan[0][1] if scan[0][0] <= get_weather.STATION_RADIUS_KM else None
+        assert (selected.station_id if selected else None) == expected
+
+
+def test__station_index__cache_file_round_trip__success(tmp_path: Path) -> None:
+    """Ensure the persisted index is reused and rebuilt when the catalogue changes."""
+    stations = _random_stations(200, 7)
+    path = tmp_path / "stations.npz"
+    built = get_weather.StationIndex.cached(stations, path)
+    loaded = get_weather.StationIndex.load(path)
+    assert loaded.stations == built.stations
+    assert loaded.nearest(-38.0, 145.1, k=3) == built.nearest(-38.0, 145.1, k=3)
+
+    changed = stations[:-1]
+    rebuilt = get_weather.StationIndex.cached(changed, path)
+    assert len(rebuilt) == len(get_weather.StationIndex.load(path)) == 199
+    assert get_weather.StationIndex([]).select(-38.0, 145.1) is None
+
+
+@pytest.mark.parametrize("damage", ["empty", "truncated"])
+def test__station_index__damaged_cache_file_is_rebuilt__success(
+    tmp_path: Path, damage: str
+) -> None:
+    """Ensure an empty or truncated index file is rebuilt instead of raising."""
+    stations = _random_stations(50, 3)
+    path = tmp_path / "stations.npz"
+    get_weather.StationIndex(stations).save(path)
+    data = path.read_bytes()
+    path.write_bytes(b"" if damage == "empty" else data[: len(data) // 2])
+    rebuilt = get_weather.StationIndex.cached(stations, path)
+    assert rebuilt.stations == get_weather.StationIndex.load(path).stations
+
+
+def _bom_area(aac: str, description: str, base: date, days: int) -> str:
+    periods = "".join(
+        f'<forecast-period index="{i}" '
+        f'start-time-local="{base + timedelta(days=i)}T05:00:00+11:00">'
+        f'<element type="forecast_icon_code">3</element>'
+        f'<element type="air_temperature_minimum" units="Celsius">{14 + i}</element>'
+        f'<element type="air_temperature_maximum" units="Celsius">{25 + i}</element>'
+        f'<text type="precis">{"Showers." if i % 2 else "Mostly sunny."}</text>'
+        f'<text type="probability_of_precipitation">{10 * i}%</text>'
+        "</forecast-period>"
+        for i in range(days)
+    )
+    return f'<area aac="{aac}" description="{description}" type="location">{periods}</area>'
+
+
+def _bom_product(areas: Iterable[str]) -> bytes:
+    return (
+        '<?xml version="1.0"?><product version="1.7"><amoc><identifier>IDV10753'
+        "</identifier></amoc><forecast>" + "".join(areas) + "</forecast></product>"
+    ).encode()
+
+
+def test__bom_forecast__streams_target_areas__success(
+    tmp_path: Path, base_date: date
+) -> None:
+    """Ensure only target areas are parsed and the tree is released as it streams."""
+    areas = [
+        _bom_area(f"VIC_PT{n:03d}", f"Town {n}", base_date, 7) for n in range(3000)
+    ]
+    areas.insert(1500, _bom_area("VIC_PT999", "Aspendale", base_date, 3))
+    path = tmp_path / "IDV10753.xml"
+    path.write_bytes(_bom_product(areas))
+
+    records = list(get_weather.iter_bom_forecast(path, {"Aspendale", "VIC_PT000"}))
+    assert [(r.date, r.max_temp) for r in records[7:]] == [
+        (base_date + timedelta(days=i), 25.0 + i) for i in range(3)
+    ]
+    first = records[1]
+    assert (first.min_temp, first.prognosis, first.rain_prob) == (
+        15.0,
+        get_weather.WeatherCode.RAIN,
+        10.0,
+    )
+
+    tracemalloc.start()
+    assert list(get_weather.iter_bom_forecast(path, {"nowhere"})) == []
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert peak < path.stat().st_size / 10
+
+
+def test__bom_forecast__rejects_entity_expansion__failure() -> None:
+    """Ensure defusedxml guards the parser against entity bombs."""
+    bomb = b'<!DOCTYPE p [<!ENTITY a "aaaa">]><product>&a;</product>'
+    with pytest.raises(Exception, match="Entities are forbidden|EntitiesForbidden"):
+        list(get_weather.iter_bom_forecast(io.BytesIO(bomb), {"x"}))